@@ -23,6 +23,7 @@ if css_path.exists():
 # ─── Auth Guard ──────────────────────────────────────────────
 from utils.auth import require_auth, sidebar_user_info, get_current_user, client_banner, init_session
 from utils.database import init_db, get_client_count
+from utils.template_bundles import warm_bundles
 
 init_session()
 init_db()
@@ -296,3 +297,6 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+
+# Préchargement des cas types, une fois la page affichée
+warm_bundles()
@@ -0,0 +1,138 @@
+"""
+Temps d'import au démarrage de chaque page.
+Pour app.py et chaque page, les imports de premier niveau du script sont
+rejoués dans un interpréteur neuf avec `python -X importtime` ; la sortie
+est agrégée par paquet. Les imports différés (utils.lazy, imports dans les
+fonctions) ne sont donc pas comptés : c'est le coût avant le premier rendu.
+
+Code de sortie 1 si une page charge un paquet de DEFERRED_PACKAGES (moteurs
+numpy, pandas, fpdf) dès ses imports, ou dépasse les seuils demandés.
+
+Exemples :
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --max-ms 800
+    python -m benchmarks.import_time --repeat 5 --json import_time.json
+    python -m benchmarks.import_time --baseline import_time.json --max-regression 20
+"""
+
+import argparse
+import ast
+import json
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# "import time:   self |   cumulative |   package" (indentation = profondeur)
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+# Paquets lourds qu'aucune page ne doit charger avant son premier rendu
+DEFERRED_PACKAGES = ("numpy", "pandas", "fpdf")
+
+
+def page_scripts() -> list[Path]:
+    return [APP_DIR / "app.py"] + sorted((APP_DIR / "pages").glob("*.py"))
+
+
+def top_level_imports(script: Path) -> str:
+    """Instructions d'import exécutées au chargement du script (hors fonctions)."""
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Agrège une sortie `-X importtime`.
+
+    Returns:
+        {"total_ms": cumul des imports de premier niveau,
+         "packages": {paquet racine: temps propre en ms}}
+    """
+    total_us = 0
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+        packages[name.split(".")[0]] += int(self_us)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "packages": {name: round(us / 1000, 1) for name, us in packages.items()},
+    }
+
+
+def measure(script: Path) -> dict:
+    code = f"import sys\nsys.path.insert(0, {str(APP_DIR)!r})\n{top_level_imports(script)}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script.name} : {proc.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(proc.stderr)
+
+
+def run(repeat: int = 3) -> dict[str, dict]:
+    """Mesure chaque page `repeat` fois (médiane, interpréteurs neufs)."""
+    results = {}
+    for script in page_scripts():
+        runs = [measure(script) for _ in range(repeat)]
+        median = statistics.median(r["total_ms"] for r in runs)
+        best = min(runs, key=lambda r: abs(r["total_ms"] - median))
+        results[script.name] = {"total_ms": median, "packages": best["packages"]}
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Temps d'import au démarrage des pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Mesures par page (médiane)")
+    parser.add_argument("--top", type=int, default=4, help="Paquets les plus coûteux affichés")
+    parser.add_argument("--json", metavar="PATH", help="Enregistre les résultats")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare à un résultat enregistré")
+    parser.add_argument("--max-regression", type=float, metavar="PCT",
+                        help="Code de sortie 1 si une page dépasse la référence de plus de PCT %%")
+    parser.add_argument("--max-ms", type=float, metavar="MS",
+                        help="Code de sortie 1 si une page dépasse MS ms d'imports")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+
+    regressions, too_slow, eager = [], [], []
+    for page, data in results.items():
+        if args.max_ms is not None and data["total_ms"] > args.max_ms:
+            too_slow.append(page)
+        heavy = [name for name in DEFERRED_PACKAGES if name in data["packages"]]
+        if heavy:
+            eager.append(f"{page} ({', '.join(heavy)})")
+        heaviest = sorted(data["packages"].items(), key=lambda kv: -kv[1])[:args.top]
+        line = f"{page:<26} {data['total_ms']:>8.1f} ms"
+        if page in baseline:
+            before = baseline[page]["total_ms"]
+            delta = (data["total_ms"] - before) / before * 100 if before else 0.0
+            line += f"  ({delta:+.0f}% vs {before:.1f} ms)"
+            if args.max_regression is not None and delta > args.max_regression:
+                regressions.append(page)
+        print(line + "   " + ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    if regressions:
+        print(f"Régression au-delà de {args.max_regression}% : {', '.join(regressions)}", file=sys.stderr)
+    if too_slow:
+        print(f"Au-delà de {args.max_ms:.0f} ms : {', '.join(too_slow)}", file=sys.stderr)
+    if eager:
+        print(f"Paquets lourds importés au chargement : {', '.join(eager)}", file=sys.stderr)
+    return 1 if regressions or too_slow or eager else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
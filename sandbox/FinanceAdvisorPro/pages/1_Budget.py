@@ -4,7 +4,6 @@ Module Budget — Gestion budgétaire
 
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 from pathlib import Path
 
 css_path = Path(__file__).parent.parent / "assets" / "style.css"
@@ -14,6 +13,14 @@ if css_path.exists():
 from utils.auth import require_auth, sidebar_user_info, client_banner
 from utils.database import init_db
 from utils.simulation_manager import simulation_save_section, get_loaded_params
+from utils.template_bundles import bundle_call
+from utils.constants import PILIER_3A_SALARIE
+from utils.lazy import lazy_import
+
+# Moteurs (numpy) chargés au premier calcul, après l'affichage de l'en-tête
+budget = lazy_import("utils.budget")
+cashflow = lazy_import("utils.cashflow")
+swiss_tax = lazy_import("utils.swiss_tax")
 
 # Auth Guard 
 require_auth()
@@ -25,6 +32,19 @@ client = st.session_state.get("current_client")
 client_salaire_net = round(client.get("salaire_annuel", 0) * 0.87 / 12) if client else 6_200
 client_budget = (client or {}).get("_budget", {})
 
+# Impôts mensuels estimés depuis le profil du client (si le budget ne les fixe pas)
+client_impots = 850
+if client and client.get("salaire_annuel"):
+    client_impots = round(bundle_call(
+        swiss_tax.calcul_impot_total,
+        revenu_brut=client["salaire_annuel"],
+        canton=client.get("canton", "Vaud (VD)"),
+        commune=client.get("commune") or None,
+        marie=client.get("situation_familiale") == "Marié·e",
+        enfants=client.get("enfants", 0),
+        deduction_3a=PILIER_3A_SALARIE,
+    )["impot_total"] / 12)
+
 # Loaded simulation override 
 loaded = get_loaded_params("budget")
 if loaded:
@@ -54,8 +74,6 @@ with col2:
 with col3:
     revenus_annexes = st.number_input("Autres revenus (CHF)", 0, 20_000, 0, 100, key="autres_rev")
 
-revenu_total = salaire_net + bonus_mensuel + revenus_annexes
-
 # Charges Fixes 
 st.markdown("---")
 st.markdown("### Charges fixes mensuelles")
@@ -66,7 +84,7 @@ with col1:
 with col2:
     assurance_maladie = st.number_input("Assurance maladie", 0, 2_000, client_budget.get("assurance_maladie", 380), 10, key="lamal")
 with col3:
-    impots_mensuels = st.number_input("Impôts (mensuel)", 0, 10_000, client_budget.get("impots_mensuels", 850), 50, key="impots")
+    impots_mensuels = st.number_input("Impôts (mensuel)", 0, 10_000, client_budget.get("impots_mensuels", client_impots), 50, key="impots")
 with col4:
     transport = st.number_input("Transport (AG, auto)", 0, 3_000, client_budget.get("transport", 300), 25, key="transport")
 
@@ -80,8 +98,6 @@ with col7:
 with col8:
     charges_autres = st.number_input("Autres charges fixes", 0, 5_000, 0, 50, key="charges_autres")
 
-total_charges_fixes = loyer + assurance_maladie + impots_mensuels + transport + assurances_autres + telecom + prevoyance_3a + charges_autres
-
 # Dépenses Variables 
 st.markdown("---")
 st.markdown("### Dépenses variables mensuelles")
@@ -106,14 +122,27 @@ with col7:
 with col8:
     depenses_autres = st.number_input("Autres dépenses", 0, 5_000, 100, 25, key="dep_autres")
 
-total_variables = alimentation + restaurants + loisirs + habillement + sante + cadeaux + vacances + depenses_autres
-
 # Bilan 
 st.markdown("---")
 
-total_depenses = total_charges_fixes + total_variables
-solde = revenu_total - total_depenses
-taux_epargne = round((solde / revenu_total) * 100, 1) if revenu_total > 0 else 0
+budget_params = {
+    "salaire_net": salaire_net, "bonus_mensuel": bonus_mensuel, "revenus_annexes": revenus_annexes,
+    "loyer": loyer, "assurance_maladie": assurance_maladie, "impots_mensuels": impots_mensuels,
+    "transport": transport, "assurances_autres": assurances_autres, "telecom": telecom,
+    "prevoyance_3a": prevoyance_3a, "charges_autres": charges_autres,
+    "alimentation": alimentation, "restaurants": restaurants, "loisirs": loisirs,
+    "habillement": habillement, "sante": sante, "cadeaux": cadeaux,
+    "vacances": vacances, "depenses_autres": depenses_autres,
+}
+analyse = bundle_call(budget.analyse_budget, budget_params)
+
+revenu_total = analyse["revenu_total"]
+total_charges_fixes = analyse["total_charges_fixes"]
+total_variables = analyse["total_variables"]
+total_depenses = analyse["total_depenses"]
+solde = analyse["solde"]
+taux_epargne = analyse["taux_epargne"]
+alertes = analyse["alertes"]
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -245,38 +274,27 @@ with col_right:
 st.markdown("---")
 st.markdown("### Comparaison avec les moyennes suisses")
 
-comparaison_data = {
-    "Catégorie": ["Logement", "Assurance maladie", "Alimentation", "Transport", "Impôts", "Loisirs", "Épargne"],
-    "Vous (%)": [
-        round(loyer / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(assurance_maladie / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(alimentation / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(transport / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(impots_mensuels / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(loisirs / revenu_total * 100, 1) if revenu_total > 0 else 0,
-        round(max(solde, 0) / revenu_total * 100, 1) if revenu_total > 0 else 0,
-    ],
-    "Moyenne CH (%)": [33, 7, 11, 8, 12, 6, 12],
-}
-
-df = pd.DataFrame(comparaison_data)
+comparaison = analyse["comparaison"]
+categories_comp = list(comparaison)
+vous_pct = [c["client_pct"] for c in comparaison.values()]
+moyenne_pct = [c["moyenne_pct"] for c in comparaison.values()]
 
 fig3 = go.Figure()
 fig3.add_trace(go.Bar(
     name="Vous",
-    x=df["Catégorie"],
-    y=df["Vous (%)"],
+    x=categories_comp,
+    y=vous_pct,
     marker_color="#6C63FF",
-    text=[f"{v}%" for v in df["Vous (%)"]],
+    text=[f"{v}%" for v in vous_pct],
     textposition='outside',
     textfont=dict(color='white', size=11),
 ))
 fig3.add_trace(go.Bar(
     name="Moyenne suisse",
-    x=df["Catégorie"],
-    y=df["Moyenne CH (%)"],
+    x=categories_comp,
+    y=moyenne_pct,
     marker_color="#3B82F6",
-    text=[f"{v}%" for v in df["Moyenne CH (%)"]],
+    text=[f"{v:g}%" for v in moyenne_pct],
     textposition='outside',
     textfont=dict(color='#A0A3B1', size=11),
     opacity=0.6,
@@ -302,8 +320,8 @@ st.markdown("---")
 st.markdown("### Analyse personnalisée")
 
 if revenu_total > 0:
-    pct_logement = loyer / revenu_total * 100
-    if pct_logement > 33:
+    pct_logement = comparaison["Logement"]["client_pct"]
+    if alertes["logement"]:
         st.markdown(
             f"""
             <div class="suggestion-haute">
@@ -314,7 +332,7 @@ if revenu_total > 0:
             unsafe_allow_html=True,
         )
 
-    if taux_epargne < 10:
+    if alertes["epargne_faible"]:
         st.markdown(
             """
             <div class="suggestion-haute">
@@ -324,7 +342,7 @@ if revenu_total > 0:
             """,
             unsafe_allow_html=True,
         )
-    elif taux_epargne >= 20:
+    elif alertes["epargne_excellente"]:
         st.markdown(
             """
             <div class="suggestion-info">
@@ -335,7 +353,7 @@ if revenu_total > 0:
             unsafe_allow_html=True,
         )
 
-    if prevoyance_3a < 588:
+    if alertes["pilier_3a"]:
         st.markdown(
             f"""
             <div class="suggestion-moyenne">
@@ -346,16 +364,95 @@ if revenu_total > 0:
             unsafe_allow_html=True,
         )
 
+# Plan de vie 
+st.markdown("---")
+st.markdown("### Plan de vie — projection sur 40 ans")
+
+profil = client or {}
+col1, col2, col3 = st.columns(3)
+with col1:
+    age_plan = st.number_input("Âge actuel", 18, 75, int(profil.get("age") or 40), key="plan_age")
+with col2:
+    age_retraite_plan = st.number_input("Âge de la retraite", 58, 70, 65, key="plan_retraite")
+with col3:
+    epargne_plan = st.number_input("Épargne actuelle (CHF)", 0, 10_000_000, 0, 5_000, key="plan_epargne")
+
+plan = cashflow.projection_cashflow(
+    salaire_annuel=profil.get("salaire_annuel") or round(salaire_net * 12 / 0.87),
+    age_actuel=age_plan,
+    depenses_annuelles=(total_depenses - impots_mensuels - prevoyance_3a) * 12,
+    canton=profil.get("canton", "Vaud (VD)"),
+    commune=profil.get("commune") or None,
+    marie=profil.get("situation_familiale") == "Marié·e",
+    enfants=profil.get("enfants", 0),
+    capital_lpp=profil.get("capital_lpp", 0),
+    capital_3a=profil.get("capital_3a", 0),
+    epargne_initiale=epargne_plan,
+    versement_3a_annuel=prevoyance_3a * 12,
+    croissance_salaire=[h["croissance_salaire"] for h in cashflow.SCENARIOS_CASHFLOW.values()],
+    rendement_placements=[h["rendement_placements"] for h in cashflow.SCENARIOS_CASHFLOW.values()],
+    inflation=[h["inflation"] for h in cashflow.SCENARIOS_CASHFLOW.values()],
+    age_retraite=age_retraite_plan,
+)
+
+scenario_colors = ["#FFB347", "#6C63FF", "#00D4AA"]
+kpi_cols = st.columns(len(cashflow.SCENARIOS_CASHFLOW))
+for i, (nom, hypotheses) in enumerate(cashflow.SCENARIOS_CASHFLOW.items()):
+    with kpi_cols[i]:
+        st.markdown(
+            f"""
+            <div class="kpi-card">
+                <div class="kpi-value">CHF {plan['patrimoine_retraite'][i]:,.0f}</div>
+                <div class="kpi-label">{nom} · patrimoine à {age_retraite_plan} ans</div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+        st.caption(
+            f"Salaires +{hypotheses['croissance_salaire']:.1%}/an · rendement {hypotheses['rendement_placements']:.0%} "
+            f"· inflation {hypotheses['inflation']:.1%}"
+        )
+
+fig4 = go.Figure()
+for i, nom in enumerate(cashflow.SCENARIOS_CASHFLOW):
+    fig4.add_trace(go.Scatter(
+        x=plan["ages"], y=plan["patrimoine_total"][i],
+        name=nom, mode="lines",
+        line=dict(color=scenario_colors[i], width=3 if nom == "Central" else 2),
+        hovertemplate=f"<b>{nom}</b><br>%{{x}} ans<br>CHF %{{y:,.0f}}<extra></extra>",
+    ))
+fig4.add_vline(x=age_retraite_plan, line=dict(color="#A0A3B1", dash="dot"))
+fig4.update_layout(
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    margin=dict(t=30, b=20, l=20, r=20),
+    height=380,
+    xaxis=dict(showgrid=False, color='#A0A3B1', title="Âge"),
+    yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)', color='#A0A3B1',
+               title="Patrimoine total (CHF)"),
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1,
+                font=dict(color='#A0A3B1')),
+)
+st.plotly_chart(fig4, use_container_width=True, config={"displayModeBar": False})
+
+for nom, age_epuisement in zip(cashflow.SCENARIOS_CASHFLOW, plan["age_epuisement"]):
+    if age_epuisement is not None:
+        st.markdown(
+            f"""
+            <div class="suggestion-haute">
+                <b> Scénario {nom} : épargne épuisée à {age_epuisement} ans</b><br>
+                <span style="color: #A0A3B1;">Les dépenses dépassent les rentes à la retraite. Augmentez l'épargne ou réduisez les dépenses.</span>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+st.caption(
+    "Patrimoine total = placements + LPP + 3a. Impôts recalculés chaque année ; "
+    "à la retraite, le LPP est converti en rente et le 3a retiré (impôt sur le retrait non déduit)."
+)
+
 # Sauvegarde 
-budget_params = {
-    "salaire_net": salaire_net, "bonus_mensuel": bonus_mensuel, "revenus_annexes": revenus_annexes,
-    "loyer": loyer, "assurance_maladie": assurance_maladie, "impots_mensuels": impots_mensuels,
-    "transport": transport, "assurances_autres": assurances_autres, "telecom": telecom,
-    "prevoyance_3a": prevoyance_3a, "charges_autres": charges_autres,
-    "alimentation": alimentation, "restaurants": restaurants, "loisirs": loisirs,
-    "habillement": habillement, "sante": sante, "cadeaux": cadeaux,
-    "vacances": vacances, "depenses_autres": depenses_autres,
-}
 budget_results = {
     "revenu_total": revenu_total, "total_charges_fixes": total_charges_fixes,
     "total_variables": total_variables, "total_depenses": total_depenses,
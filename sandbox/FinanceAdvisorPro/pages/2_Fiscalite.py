@@ -4,13 +4,17 @@ Module Fiscalité — Simulateur fiscal suisse
 
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.swiss_tax import calcul_impot_total, comparaison_cantonale, suggestions_optimisation
 from utils.constants import CANTONS_ROMANDS, PILIER_3A_SALARIE
+from utils.lazy import lazy_import
+
+# Moteurs fiscaux : chargés au premier calcul
+swiss_tax = lazy_import("utils.swiss_tax")
+lpp_buyback = lazy_import("utils.lpp_buyback")
+relocation = lazy_import("utils.relocation")
 
 css_path = Path(__file__).parent.parent / "assets" / "style.css"
 if css_path.exists():
@@ -19,6 +23,7 @@ if css_path.exists():
 from utils.auth import require_auth, sidebar_user_info, client_banner
 from utils.database import init_db
 from utils.simulation_manager import simulation_save_section, get_loaded_params
+from utils.template_bundles import bundle_call
 
 require_auth()
 sidebar_user_info()
@@ -74,15 +79,21 @@ with col6:
         key="ded_3a",
     )
 
-with st.expander(" Déductions supplémentaires"):
-    col_a, col_b = st.columns(2)
+with st.expander(" Déductions supplémentaires et fortune"):
+    col_a, col_b, col_c = st.columns(3)
     with col_a:
         rachat_lpp = st.number_input("Rachat LPP (CHF)", 0, 200_000, 0, 1_000, key="rachat_lpp")
     with col_b:
         frais_effectifs = st.number_input("Frais effectifs (CHF)", 0, 50_000, 0, 500, key="frais_eff")
+    with col_c:
+        fortune = st.number_input(
+            "Fortune nette (CHF)", 0, 50_000_000, 0, 10_000, key="fortune",
+            help="Hors 2ème et 3ème pilier (exonérés). Soumise à l'impôt sur la fortune après franchise cantonale.",
+        )
 
 # Calcul 
-result = calcul_impot_total(
+result = bundle_call(
+    swiss_tax.calcul_impot_total,
     revenu_brut=revenu_brut,
     canton=canton,
     commune=commune_val,
@@ -91,6 +102,7 @@ result = calcul_impot_total(
     deduction_3a=deduction_3a,
     deduction_rachat_lpp=rachat_lpp,
     deduction_frais_effectifs=frais_effectifs,
+    fortune=fortune,
 )
 
 # Résultats 
@@ -152,12 +164,18 @@ col_left, col_right = st.columns(2)
 with col_left:
     st.markdown("### Décomposition de l'impôt")
 
+    pie_labels = ["Fédéral", "Cantonal", "Communal"]
+    pie_values = [result["impot_federal"], result["impot_cantonal"], result["impot_communal"]]
+    if result["impot_fortune"] > 0:
+        pie_labels.append("Fortune")
+        pie_values.append(result["impot_fortune"])
+
     fig = go.Figure(data=[go.Pie(
-        labels=["Fédéral", "Cantonal", "Communal"],
-        values=[result["impot_federal"], result["impot_cantonal"], result["impot_communal"]],
+        labels=pie_labels,
+        values=pie_values,
         hole=0.55,
         marker=dict(
-            colors=["#6C63FF", "#3B82F6", "#00D4AA"],
+            colors=["#6C63FF", "#3B82F6", "#00D4AA", "#FFB347"],
             line=dict(color='#0E1117', width=2),
         ),
         textinfo='label+percent',
@@ -180,6 +198,12 @@ with col_left:
     )
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
 
+    if fortune > 0:
+        st.caption(
+            f"Impôt sur la fortune : CHF {result['impot_fortune']:,.0f} "
+            f"(fortune imposable CHF {result['fortune_imposable']:,.0f} après franchise)"
+        )
+
 with col_right:
     st.markdown("### Détail des déductions")
 
@@ -206,7 +230,7 @@ with col_right:
 st.markdown("---")
 st.markdown("### Comparaison inter-cantonale")
 
-comparaison = comparaison_cantonale(revenu_brut, is_marie, enfants, deduction_3a)
+comparaison = bundle_call(swiss_tax.comparaison_cantonale, revenu_brut, is_marie, enfants, deduction_3a, fortune)
 
 cantons_noms = list(comparaison.keys())
 impots_totaux = [comparaison[c]["impot_total"] for c in cantons_noms]
@@ -257,11 +281,52 @@ if economie > 0 and canton != canton_min:
         unsafe_allow_html=True,
     )
 
+# Classement des communes
+st.markdown("#### Communes les plus avantageuses")
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    cantons_classement = st.multiselect("Cantons", cantons_list, default=cantons_list, key="cantons_classement")
+with col2:
+    top_communes = st.number_input("Nombre de communes", 3, 50, 10, key="top_communes")
+
+classement = relocation.classement_communes(
+    revenu_brut,
+    marie=is_marie,
+    enfants=enfants,
+    deduction_3a=deduction_3a,
+    deduction_rachat_lpp=rachat_lpp,
+    deduction_frais_effectifs=frais_effectifs,
+    fortune=fortune,
+    top=int(top_communes),
+    cantons=cantons_classement,
+)
+
+if classement["classement"]:
+    st.dataframe(
+        [
+            {
+                "Rang": c["rang"],
+                "Commune": c["commune"],
+                "Canton": c["canton"],
+                "Impôt revenu (CHF)": f"{c['impot_revenu']:,.0f}",
+                "Impôt fortune (CHF)": f"{c['impot_fortune']:,.0f}",
+                "Impôt total (CHF)": f"{c['impot_total']:,.0f}",
+                "Écart (CHF/an)": f"{c['impot_total'] - result['impot_total']:+,.0f}",
+            }
+            for c in classement["classement"]
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption(f"{classement['nb_communes']} communes évaluées. Écart par rapport à votre situation actuelle.")
+
 # Suggestions d'optimisation 
 st.markdown("---")
 st.markdown("### Optimisations fiscales recommandées")
 
-suggestions = suggestions_optimisation(
+suggestions = bundle_call(
+    swiss_tax.suggestions_optimisation,
     revenu_brut=revenu_brut,
     deduction_3a_actuelle=deduction_3a,
     rachat_lpp_actuel=rachat_lpp,
@@ -294,16 +359,119 @@ else:
         unsafe_allow_html=True,
     )
 
+# Rachats LPP échelonnés 
+st.markdown("---")
+st.markdown("### Rachats LPP échelonnés")
+st.markdown(
+    """
+    <div class="section-card">
+        Un rachat LPP est déduit du revenu imposable de l'année, au taux marginal le plus élevé.
+        Réparti sur plusieurs années, le même potentiel de rachat reste dans les tranches hautes du barème
+        et l'économie d'impôt cumulée augmente.
+    </div>
+    """,
+    unsafe_allow_html=True,
+)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    capacite_rachat = st.number_input(
+        "Potentiel de rachat (CHF)", 0, 2_000_000, 100_000, 5_000, key="capacite_rachat",
+        help="Montant de rachat possible indiqué sur le certificat de prévoyance.",
+    )
+with col2:
+    annees_rachat = st.slider("Répartir sur (années)", 1, 15, 5, key="annees_rachat")
+with col3:
+    croissance_rachat = st.slider("Croissance du revenu (%/an)", 0.0, 5.0, 1.0, 0.5, key="croissance_rachat")
+
+rachats = lpp_buyback.optimiser_rachats_lpp(
+    capacite_rachat,
+    annees_rachat,
+    revenu_brut,
+    canton,
+    commune_val,
+    is_marie,
+    enfants,
+    deduction_3a=deduction_3a,
+    deduction_frais_effectifs=frais_effectifs,
+    croissance_salaire=croissance_rachat / 100,
+)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.markdown(
+        f"""
+        <div class="kpi-card">
+            <div class="kpi-value">CHF {rachats['economie_en_une_fois']:,.0f}</div>
+            <div class="kpi-label">Économie — rachat en une fois</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+with col2:
+    st.markdown(
+        f"""
+        <div class="kpi-card">
+            <div class="kpi-value">CHF {rachats['economie_totale']:,.0f}</div>
+            <div class="kpi-label">Économie — rachats optimisés</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+with col3:
+    st.markdown(
+        f"""
+        <div class="kpi-card">
+            <div class="kpi-value" style="background: #00D4AA; -webkit-background-clip: text; -webkit-text-fill-color: transparent;">CHF {rachats['gain_vs_une_fois']:,.0f}</div>
+            <div class="kpi-label">Gain de l'échelonnement</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+if rachats["plan"]:
+    fig_rachat = go.Figure()
+    fig_rachat.add_trace(go.Bar(
+        x=[f"Année {p['annee']}" for p in rachats["plan"]],
+        y=[p["rachat"] for p in rachats["plan"]],
+        name="Rachat",
+        marker=dict(color="#6C63FF", cornerradius=6),
+        customdata=[p["economie"] for p in rachats["plan"]],
+        hovertemplate="<b>%{x}</b><br>Rachat: CHF %{y:,.0f}<br>Économie: CHF %{customdata:,.0f}<extra></extra>",
+    ))
+    fig_rachat.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=20, b=20, l=20, r=20),
+        height=320,
+        showlegend=False,
+        xaxis=dict(showgrid=False, color='#A0A3B1'),
+        yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)', color='#A0A3B1', title="Rachat (CHF)", tickformat=","),
+    )
+    st.plotly_chart(fig_rachat, use_container_width=True, config={"displayModeBar": False})
+    st.caption(
+        f"Montants par pas de CHF {rachats['pas']:,.0f}. Les prestations issues d'un rachat ne peuvent pas "
+        "être retirées en capital dans les 3 ans qui suivent."
+    )
+
 # Sauvegarde 
 fisc_params = {
     "revenu_brut": revenu_brut, "canton": canton, "commune": commune,
     "marie": marie, "enfants": enfants, "deduction_3a": deduction_3a,
-    "rachat_lpp": rachat_lpp, "frais_effectifs": frais_effectifs,
+    "rachat_lpp": rachat_lpp, "frais_effectifs": frais_effectifs, "fortune": fortune,
+    "capacite_rachat": capacite_rachat, "annees_rachat": annees_rachat,
 }
 fisc_results = {
     "impot_total": result["impot_total"], "taux_effectif": result["taux_effectif"],
     "impot_federal": result["impot_federal"], "impot_cantonal": result["impot_cantonal"],
-    "impot_communal": result["impot_communal"], "total_deductions": result["total_deductions"],
+    "impot_communal": result["impot_communal"], "impot_fortune": result["impot_fortune"],
+    "total_deductions": result["total_deductions"],
+    "comparaison_cantons": {"cantons": list(cantons_sorted), "impots": list(impots_sorted)},
+    "rachats_lpp": {
+        "plan": rachats["plan"],
+        "economie_totale": rachats["economie_totale"],
+        "economie_en_une_fois": rachats["economie_en_une_fois"],
+    },
 }
 
 simulation_save_section("fiscalite", fisc_params, fisc_results)
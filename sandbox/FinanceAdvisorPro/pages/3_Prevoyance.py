@@ -4,17 +4,10 @@ Module Prévoyance — Les 3 piliers suisses
 
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.pillar_calc import (
-    estimation_rente_avs,
-    projection_lpp,
-    simulation_3a,
-    projection_retraite_globale,
-)
 from utils.constants import (
     PILIER_3A_SALARIE,
     RENTE_AVS_MAX_MENSUELLE,
@@ -22,7 +15,14 @@ from utils.constants import (
     TAUX_INTERET_3A_MOYEN,
     TAUX_INTERET_3A_FONDS,
     AGE_RETRAITE_HOMMES,
+    BAREMES_RETRAIT_CAPITAL,
+    RETRAIT_3A_ANTICIPE_ANS,
 )
+from utils.lazy import lazy_import
+
+# Moteurs de prévoyance : chargés au premier calcul
+pillar_calc = lazy_import("utils.pillar_calc")
+capital_withdrawal = lazy_import("utils.capital_withdrawal")
 
 css_path = Path(__file__).parent.parent / "assets" / "style.css"
 if css_path.exists():
@@ -31,6 +31,7 @@ if css_path.exists():
 from utils.auth import require_auth, sidebar_user_info, client_banner
 from utils.database import init_db
 from utils.simulation_manager import simulation_save_section, get_loaded_params
+from utils.template_bundles import bundle_call
 
 require_auth()
 sidebar_user_info()
@@ -94,7 +95,7 @@ with tab1:
         unsafe_allow_html=True,
     )
 
-    avs = estimation_rente_avs(salaire, annees_cotisation)
+    avs = pillar_calc.estimation_rente_avs(salaire, annees_cotisation)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -144,7 +145,7 @@ with tab1:
     # Graphique sensibilité au salaire
     st.markdown("#### Sensibilité de la rente au salaire moyen")
     salaires_test = list(range(30_000, 150_001, 10_000))
-    rentes_test = [estimation_rente_avs(s, annees_cotisation)["rente_mensuelle"] for s in salaires_test]
+    rentes_test = [pillar_calc.estimation_rente_avs(s, annees_cotisation)["rente_mensuelle"] for s in salaires_test]
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -190,7 +191,7 @@ with tab2:
     with col2:
         st.markdown(f"**Taux de conversion :** {TAUX_CONVERSION_LPP * 100}%")
 
-    lpp = projection_lpp(salaire, age, capital_lpp, age_retraite)
+    lpp = bundle_call(pillar_calc.projection_lpp, salaire, age, capital_lpp, age_retraite)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -273,7 +274,7 @@ with tab3:
 
     taux_3a = TAUX_INTERET_3A_MOYEN if "bancaire" in type_3a else TAUX_INTERET_3A_FONDS
 
-    sim_3a = simulation_3a(versement_3a, annees_restantes, taux_3a, capital_3a_actuel)
+    sim_3a = bundle_call(pillar_calc.simulation_3a, versement_3a, annees_restantes, taux_3a, capital_3a_actuel)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -342,8 +343,8 @@ with tab3:
 
     # Comparaison compte vs fonds
     st.markdown("#### Compte bancaire vs Fonds de placement")
-    sim_compte = simulation_3a(versement_3a, annees_restantes, TAUX_INTERET_3A_MOYEN, capital_3a_actuel)
-    sim_fonds = simulation_3a(versement_3a, annees_restantes, TAUX_INTERET_3A_FONDS, capital_3a_actuel)
+    sim_compte = pillar_calc.simulation_3a(versement_3a, annees_restantes, TAUX_INTERET_3A_MOYEN, capital_3a_actuel)
+    sim_fonds = pillar_calc.simulation_3a(versement_3a, annees_restantes, TAUX_INTERET_3A_FONDS, capital_3a_actuel)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -387,7 +388,8 @@ with tab3:
 with tab4:
     st.markdown("### Projection globale de la retraite")
 
-    projection = projection_retraite_globale(
+    projection = bundle_call(
+        pillar_calc.projection_retraite_globale,
         salaire_annuel=salaire,
         age_actuel=age,
         capital_lpp_actuel=capital_lpp if 'capital_lpp' in dir() else 50_000,
@@ -529,6 +531,101 @@ with tab4:
             unsafe_allow_html=True,
         )
 
+    # Retrait en capital
+    st.markdown("---")
+    st.markdown("### Retrait en capital — échelonnement")
+    st.markdown(
+        f"""
+        <div class="section-card">
+            Les retraits en capital d'une même année sont additionnés et imposés ensemble, à un taux progressif.
+            Le 3a peut être retiré dès {age_retraite - RETRAIT_3A_ANTICIPE_ANS} ans : en le répartissant sur plusieurs
+            comptes retirés sur des années différentes, on réduit l'impôt total.
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    cantons_list = list(BAREMES_RETRAIT_CAPITAL.keys())
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        canton_retrait = st.selectbox(
+            "Canton de domicile à la retraite", cantons_list,
+            index=cantons_list.index(client["canton"]) if client and client.get("canton") in cantons_list else 0,
+            key="canton_retrait",
+        )
+    with col2:
+        marie_retrait = st.checkbox(
+            "Marié·e", value=client.get("situation_familiale", "") == "Marié·e" if client else False,
+            key="marie_retrait",
+        )
+    with col3:
+        nb_comptes_3a = st.slider("Nombre de comptes 3a", 1, 5, 3, key="nb_comptes_3a")
+    with col4:
+        lpp_en_capital = st.checkbox("LPP retiré en capital", value=False, key="lpp_capital")
+
+    comptes = capital_withdrawal.comptes_standards(
+        capital_lpp=lpp["capital_projete"] if lpp_en_capital and 'lpp' in dir() else 0,
+        capital_3a=sim_3a["capital_final"] if 'sim_3a' in dir() else 0,
+        nb_comptes_3a=nb_comptes_3a,
+        age_retraite=age_retraite,
+    )
+    retraits = capital_withdrawal.optimiser_retraits(comptes, canton_retrait, marie_retrait)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(
+            f"""
+            <div class="kpi-card">
+                <div class="kpi-value">CHF {retraits['reference']['impot_total']:,.0f}</div>
+                <div class="kpi-label">Impôt — tout à {age_retraite} ans</div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+    with col2:
+        st.markdown(
+            f"""
+            <div class="kpi-card">
+                <div class="kpi-value">CHF {retraits['impot_total']:,.0f}</div>
+                <div class="kpi-label">Impôt — retraits échelonnés</div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+    with col3:
+        # Pas d'économie affichée si les calendriers ne portent pas sur le même capital
+        economie_retrait = f"CHF {retraits['economie']:,.0f}" if retraits["economie"] is not None else "—"
+        st.markdown(
+            f"""
+            <div class="kpi-card">
+                <div class="kpi-value" style="background: #00D4AA; -webkit-background-clip: text; -webkit-text-fill-color: transparent;">{economie_retrait}</div>
+                <div class="kpi-label">Économie d'impôt</div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    if retraits["plan"]:
+        st.markdown("#### Calendrier de retraits recommandé")
+        st.dataframe(
+            [
+                {
+                    "Âge": r["age"],
+                    "Comptes": ", ".join(r["comptes"]),
+                    "Montant (CHF)": f"{r['montant']:,.0f}",
+                    "Impôt (CHF)": f"{r['impot']:,.0f}",
+                }
+                for r in retraits["plan"]
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.caption(
+        "Barèmes cantonaux simplifiés ; impôt fédéral au 1/5 du barème ordinaire. "
+        f"Les calendriers sont comparés sur le même capital projeté à {age_retraite} ans "
+        "(un retrait anticipé est supposé réinvesti) : l'économie est une estimation prudente."
+    )
+
 # Sauvegarde 
 prev_params = {
     "age": age, "salaire": salaire, "age_retraite": age_retraite,
@@ -537,6 +634,9 @@ prev_params = {
     "capital_3a_actuel": capital_3a_actuel if 'capital_3a_actuel' in dir() else default_3a,
     "versement_3a": versement_3a if 'versement_3a' in dir() else PILIER_3A_SALARIE,
     "type_3a": type_3a if 'type_3a' in dir() else "Compte bancaire (~1.5%)",
+    "canton_retrait": canton_retrait,
+    "nb_comptes_3a": nb_comptes_3a,
+    "lpp_en_capital": lpp_en_capital,
 }
 prev_results = {
     "rente_avs_mensuelle": avs["rente_mensuelle"],
@@ -546,6 +646,21 @@ prev_results = {
     "rente_totale_mensuelle": projection["rente_totale_mensuelle"],
     "taux_remplacement": projection["taux_remplacement"],
     "gap_mensuel": projection["gap_mensuel"],
+    "evolution_lpp": {
+        "ages": [e["age"] for e in lpp["evolution"]],
+        "capital": [e["capital"] for e in lpp["evolution"]],
+    } if 'lpp' in dir() else {},
+    "evolution_3a": {
+        "annees": [e["annee"] for e in sim_3a["evolution"]],
+        "capital": [e["capital"] for e in sim_3a["evolution"]],
+        "verse": [e["verse"] for e in sim_3a["evolution"]],
+    } if 'sim_3a' in dir() else {},
+    "retrait_capital": {
+        "plan": retraits["plan"],
+        "impot_total": retraits["impot_total"],
+        "impot_reference": retraits["reference"]["impot_total"],
+        "economie": retraits["economie"],
+    },
 }
 
 simulation_save_section("prevoyance", prev_params, prev_results)
@@ -4,14 +4,17 @@ Module Investissements — Simulateur d'investissement
 
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.investment import interets_composes, simulation_monte_carlo, cout_opportunite, comparer_scenarios
 from utils.constants import PROFILS_INVESTISSEMENT
+from utils.lazy import lazy_import
+
+# Moteurs de simulation : chargés au premier calcul
+investment = lazy_import("utils.investment")
+portfolio = lazy_import("utils.portfolio")
+efficient_frontier = lazy_import("utils.efficient_frontier")
 
 css_path = Path(__file__).parent.parent / "assets" / "style.css"
 if css_path.exists():
@@ -20,6 +23,9 @@ if css_path.exists():
 from utils.auth import require_auth, sidebar_user_info, client_banner
 from utils.database import init_db
 from utils.simulation_manager import simulation_save_section, get_loaded_params
+from utils.template_bundles import bundle_call
+
+pd = lazy_import("pandas")  # tableau détaillé uniquement
 
 require_auth()
 sidebar_user_info()
@@ -39,11 +45,12 @@ st.markdown(
 client_banner()
 
 # Tabs 
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     " Calculateur",
     " Profils & Comparaison",
     " Monte Carlo",
     " Coût d'opportunité",
+    " Allocation optimale",
 ])
 
 # Tab 1 : Calculateur d'intérêts composés 
@@ -60,7 +67,7 @@ with tab1:
     with col4:
         annees = st.slider("Durée (années)", 1, 50, 20, 1, key="duree_inv")
 
-    result = interets_composes(capital_initial, versement_mensuel, taux_annuel, annees)
+    result = bundle_call(investment.interets_composes, capital_initial, versement_mensuel, taux_annuel, annees)
 
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
@@ -181,7 +188,7 @@ with tab2:
     with col3:
         dur_comp = st.slider("Durée (années)", 5, 50, 20, 1, key="dur_comp")
 
-    resultats = comparer_scenarios(cap_comp, vers_comp, dur_comp, PROFILS_INVESTISSEMENT)
+    resultats = bundle_call(investment.comparer_scenarios, cap_comp, vers_comp, dur_comp, PROFILS_INVESTISSEMENT)
 
     fig = go.Figure()
     colors = ["#00D4AA", "#6C63FF", "#FFB347", "#FF6B6B"]
@@ -252,12 +259,48 @@ with tab3:
         dur_mc = st.slider("Durée (années)", 5, 40, 20, 1, key="dur_mc")
 
     profil_info = PROFILS_INVESTISSEMENT[profil_mc]
-    mc = simulation_monte_carlo(
-        cap_mc, vers_mc,
-        profil_info["rendement_moyen"],
-        profil_info["volatilite"],
-        dur_mc,
-    )
+    modeles = ["Paramétrique (loi normale)", "Multi-actifs corrélé"]
+    if investment.rendements_historiques() is not None:
+        modeles.append("Historique (bootstrap par blocs)")
+    modele_mc = st.radio("Modèle de rendements", modeles, horizontal=True, key="modele_mc")
+    mc = None
+    rebalancement_mc = None
+    if modele_mc == "Multi-actifs corrélé":
+        frequences_rebal = {"Jamais": 0, "Mensuel": 1, "Trimestriel": 3, "Annuel": 12}
+        rebal_label = st.select_slider(
+            "Rebalancement", list(frequences_rebal), value="Annuel", key="rebal_mc",
+            help="Retour à l'allocation cible du profil ; les versements suivent toujours l'allocation cible.",
+        )
+        rebalancement_mc = frequences_rebal[rebal_label]
+        mc = portfolio.simuler_portefeuille(
+            cap_mc, vers_mc, profil_info["allocation"], dur_mc,
+            rebalancement=rebalancement_mc, n_simulations=2_000,
+        )
+        st.caption(
+            "2'000 scénarios, chaque classe d'actifs avec son rendement, sa volatilité, ses frais "
+            "et ses corrélations (hypothèses de marché du pack fiscal)."
+        )
+    elif modele_mc.startswith("Historique"):
+        try:
+            mc = investment.simulation_bootstrap(cap_mc, vers_mc, profil_info["allocation"], dur_mc)
+        except ValueError as e:
+            st.warning(f"Historique inutilisable ({e}) — modèle paramétrique utilisé.")
+            modele_mc = "Paramétrique (loi normale)"
+        else:
+            h = mc["historique"]
+            st.caption(
+                f"Historique {h['debut']} – {h['fin']} ({h['n_mois']} mois, blocs de {h['taille_bloc']} mois) : "
+                f"rendement {h['rendement_annualise']:.1%}/an, volatilité {h['volatilite_annualisee']:.1%}, "
+                f"excès de kurtosis mensuel {h['kurtosis_excedentaire']:.1f}"
+            )
+    if mc is None:
+        mc = bundle_call(
+            investment.simulation_monte_carlo,
+            cap_mc, vers_mc,
+            profil_info["rendement_moyen"],
+            profil_info["volatilite"],
+            dur_mc,
+        )
 
     # KPIs Monte Carlo
     col1, col2, col3, col4 = st.columns(4)
@@ -364,6 +407,45 @@ with tab3:
     )
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
 
+    if modele_mc == "Multi-actifs corrélé":
+        st.markdown("#### Composition moyenne du portefeuille")
+        moyennes = mc["composition_moyenne"]
+        fig_actifs = go.Figure()
+        for k, classe in enumerate(mc["classes"]):
+            if moyennes[:, k].any():
+                fig_actifs.add_trace(go.Scatter(
+                    x=annees_mc, y=moyennes[:, k], name=classe, stackgroup="actifs", mode="lines",
+                    hovertemplate=f"Année %{{x}}<br>{classe}: CHF %{{y:,.0f}}<extra></extra>",
+                ))
+        fig_actifs.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=30, b=20, l=40, r=20), height=350,
+            xaxis=dict(title="Années", showgrid=False, color='#A0A3B1'),
+            yaxis=dict(title="CHF", showgrid=True, gridcolor='rgba(255,255,255,0.05)',
+                       color='#A0A3B1', tickformat=","),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1,
+                        font=dict(color='#A0A3B1')),
+        )
+        st.plotly_chart(fig_actifs, use_container_width=True, config={"displayModeBar": False})
+
+        comparaison = portfolio.comparer_rebalancements(
+            cap_mc, vers_mc, profil_info["allocation"], dur_mc,
+            frequences=tuple(frequences_rebal.values()), n_simulations=2_000,
+        )
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Rebalancement": libelle,
+                    "Médiane (CHF)": f"{c['mediane']:,.0f}",
+                    "Pessimiste 5% (CHF)": f"{c['percentile_5']:,.0f}",
+                    "Optimiste 95% (CHF)": f"{c['percentile_95']:,.0f}",
+                    "Prob. perte": f"{c['probabilite_perte']:.1f}%",
+                }
+                for libelle, c in zip(frequences_rebal, comparaison)
+            ]),
+            use_container_width=True, hide_index=True,
+        )
+
 # Tab 4 : Coût d'opportunité 
 with tab4:
     st.markdown("### Coût d'opportunité")
@@ -386,7 +468,7 @@ with tab4:
     with col3:
         annees_opp = st.slider("Durée (années)", 5, 50, 20, 1, key="dur_opp")
 
-    opp = cout_opportunite(depense, taux_opp, annees_opp)
+    opp = investment.cout_opportunite(depense, taux_opp, annees_opp)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -437,7 +519,7 @@ with tab4:
     cols = st.columns(3)
     for i, (_, label, montant) in enumerate(exemples):
         with cols[i % 3]:
-            opp_ex = cout_opportunite(montant, taux_opp, annees_opp)
+            opp_ex = investment.cout_opportunite(montant, taux_opp, annees_opp)
             st.markdown(
                 f"""
                 <div class="section-card">
@@ -452,14 +534,134 @@ with tab4:
                 unsafe_allow_html=True,
             )
 
+# Tab 5 : Frontière efficiente et allocation recommandée 
+with tab5:
+    st.markdown("### Frontière efficiente")
+    st.markdown(
+        """
+        <div class="section-card">
+            Parmi toutes les allocations par pas de 5 %, la frontière efficiente retient celles qui offrent
+            le <b>meilleur rendement pour chaque niveau de risque</b>. L'allocation recommandée est la
+            moins risquée qui atteint l'objectif du client avec le niveau de confiance choisi.
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cap_opt = st.number_input("Capital initial (CHF)", 0, 5_000_000, 20_000, 1_000, key="cap_opt")
+        vers_opt = st.number_input("Versement mensuel (CHF)", 0, 50_000, 500, 50, key="vers_opt")
+    with col2:
+        dur_opt = st.slider("Durée (années)", 5, 40, 20, 1, key="dur_opt")
+        objectif_opt = st.number_input("Objectif de capital (CHF)", 0, 20_000_000, 200_000, 10_000, key="objectif_opt")
+    with col3:
+        confiances = {"95 %": 5, "90 %": 10, "75 %": 25, "50 %": 50}
+        confiance_opt = st.selectbox("Probabilité d'atteindre l'objectif", list(confiances), index=1, key="confiance_opt")
+        mesures_risque = {"Volatilité": "volatilite", "CVaR 95 % (perte des pires années)": "cvar"}
+        mesure_label = st.radio("Mesure du risque", list(mesures_risque), key="mesure_opt")
+    mesure_opt = mesures_risque[mesure_label]
+
+    frontiere = efficient_frontier.frontiere_efficiente(mesure_opt)
+    profils_eval = efficient_frontier.evaluer_allocations({nom: p["allocation"] for nom, p in PROFILS_INVESTISSEMENT.items()})
+    reco = efficient_frontier.recommander_allocation(
+        cap_opt, vers_opt, dur_opt, objectif_opt, percentile=confiances[confiance_opt], mesure=mesure_opt,
+    )
+
+    fig_front = go.Figure()
+    fig_front.add_trace(go.Scatter(
+        x=[p[mesure_opt] * 100 for p in frontiere["points"]],
+        y=[p["rendement"] * 100 for p in frontiere["points"]],
+        mode="lines", name="Frontière efficiente",
+        line=dict(color="#6C63FF", width=3),
+        customdata=[", ".join(f"{c} {v:.0f}%" for c, v in p["allocation"].items()) for p in frontiere["points"]],
+        hovertemplate="Risque %{x:.1f}%<br>Rendement %{y:.2f}%<br>%{customdata}<extra></extra>",
+    ))
+    colors = ["#00D4AA", "#6C63FF", "#FFB347", "#FF6B6B"]
+    for i, (nom, p) in enumerate(profils_eval.items()):
+        fig_front.add_trace(go.Scatter(
+            x=[p[mesure_opt] * 100], y=[p["rendement"] * 100],
+            mode="markers+text", name=nom, text=[nom], textposition="bottom right",
+            marker=dict(size=11, color=colors[i % len(colors)]),
+            hovertemplate=f"<b>{nom}</b><br>Risque %{{x:.1f}}%<br>Rendement %{{y:.2f}}%<extra></extra>",
+        ))
+    fig_front.add_trace(go.Scatter(
+        x=[reco[mesure_opt] * 100], y=[reco["rendement"] * 100],
+        mode="markers", name="Recommandée",
+        marker=dict(size=18, color="#FFD700", symbol="star"),
+        hovertemplate="<b>Recommandée</b><br>Risque %{x:.1f}%<br>Rendement %{y:.2f}%<extra></extra>",
+    ))
+    fig_front.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=30, b=20, l=40, r=20), height=450,
+        xaxis=dict(title=f"{mesure_label} (%/an)", showgrid=False, color='#A0A3B1'),
+        yaxis=dict(title="Rendement net de frais (%/an)", showgrid=True, gridcolor='rgba(255,255,255,0.05)',
+                   color='#A0A3B1'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1,
+                    font=dict(color='#A0A3B1')),
+    )
+    st.plotly_chart(fig_front, use_container_width=True, config={"displayModeBar": False})
+    st.caption(
+        f"{frontiere['nb_candidats']:,} allocations évaluées (Crypto limitée à 10 %), "
+        "hypothèses de marché du pack fiscal."
+    )
+
+    st.markdown("#### Allocation recommandée")
+    if reco["atteint"]:
+        st.success(
+            f"Objectif atteint dans {confiance_opt} des scénarios : capital de "
+            f"CHF {reco['valeur_percentile']:,.0f} au percentile {reco['percentile']}."
+        )
+    else:
+        st.warning(
+            f"Aucune allocation de la frontière n'atteint CHF {objectif_opt:,.0f} avec une probabilité de "
+            f"{confiance_opt}. Meilleure allocation : CHF {reco['valeur_percentile']:,.0f} au percentile "
+            f"{reco['percentile']}."
+        )
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.dataframe(
+            pd.DataFrame([{"Classe d'actifs": c, "Part": f"{v:.0f}%"} for c, v in reco["allocation"].items()]),
+            use_container_width=True, hide_index=True,
+        )
+    with col2:
+        st.metric("Rendement attendu", f"{reco['rendement']:.2%}")
+        st.metric("Volatilité", f"{reco['volatilite']:.2%}")
+        st.metric("CVaR 95 %", f"{reco['cvar']:.2%}")
+
 # Sauvegarde 
 inv_params = {
     "capital_initial": capital_initial, "versement_mensuel": versement_mensuel,
     "taux_annuel": taux_annuel, "annees": annees,
+    # Monte Carlo : toutes les entrées des résultats "monte_carlo"
+    "capital_mc": cap_mc, "versement_mc": vers_mc, "profil_mc": profil_mc, "duree_mc": dur_mc,
+    "modele_mc": modele_mc, "rebalancement_mc": rebalancement_mc,
+    # Allocation optimale : toutes les entrées des résultats "allocation_optimale"
+    "capital_opt": cap_opt, "versement_opt": vers_opt, "duree_opt": dur_opt,
+    "objectif_opt": objectif_opt, "percentile_opt": confiances[confiance_opt], "mesure_opt": mesure_opt,
 }
 inv_results = {
     "capital_final": result["capital_final"], "total_interets": result["total_interets"],
     "total_verse": result["total_verse"], "rendement_pct": result["rendement_pct"],
+    "evolution": {
+        "annees": [e["annee"] for e in result["evolution"]],
+        "capital": [e["capital"] for e in result["evolution"]],
+        "verse": [e["verse"] for e in result["evolution"]],
+    },
+    "monte_carlo": {
+        "profil": profil_mc,
+        "modele": modele_mc,
+        "annees": [e["annee"] for e in mc["percentiles_evolution"][50]],
+        **{f"p{p}": [e["valeur"] for e in serie] for p, serie in mc["percentiles_evolution"].items()},
+    },
+    "allocation_optimale": {
+        "objectif": objectif_opt,
+        "percentile": reco["percentile"],
+        "mesure": mesure_opt,
+        "allocation": reco["allocation"],
+        "atteint": reco["atteint"],
+        "valeur_percentile": reco["valeur_percentile"],
+    },
 }
 
 simulation_save_section("investissements", inv_params, inv_results)
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+from utils import auth, database
+from utils.batch_reports import plan_reports
+from utils.db_backends import SQLiteBackend, set_backend
+
+CONSEILLER = {"name": "Claire Favre", "email": "claire@example.ch", "password": "x", "role": "conseiller"}
+
+
+class TestPlanReports(unittest.TestCase):
+
+    def setUp(self):
+        set_backend(SQLiteBackend.in_memory())
+        self.addCleanup(set_backend, None)
+        database.init_db()
+        self.client_id = database.create_client("cfavre", nom="Muster", prenom="Anna")
+        database.save_simulation(self.client_id, "cfavre", "budget", "Budget", {}, {"solde": 300})
+
+    def test_conseiller_du_fichier_yaml(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            credentials = Path(dossier) / "credentials.yaml"
+            credentials.write_text(yaml.safe_dump({"users": {"cfavre": CONSEILLER}}), encoding="utf-8")
+            with mock.patch.object(auth, "AUTH_BACKEND", "yaml"), \
+                    mock.patch.object(auth, "CREDENTIALS_FILE", credentials), \
+                    mock.patch.dict(auth._credentials_cache, {"mtime": None, "data": None}):
+                tasks, missing = plan_reports([self.client_id], ["budget", "fiscalite"])
+        self.assertEqual([t["advisor_name"] for t in tasks], ["Claire Favre"])
+        self.assertEqual(missing, [(self.client_id, "fiscalite")])
+
+    def test_conseiller_en_base(self):
+        database.create_user("cfavre", **CONSEILLER)
+        with mock.patch.object(auth, "AUTH_BACKEND", "db"):
+            tasks, _ = plan_reports([self.client_id], ["budget"])
+        self.assertEqual(tasks[0]["advisor_name"], "Claire Favre")
+
+    def test_conseiller_inconnu(self):
+        with mock.patch.object(auth, "AUTH_BACKEND", "db"):
+            tasks, _ = plan_reports([self.client_id], ["budget"])
+        self.assertEqual(tasks[0]["advisor_name"], "cfavre")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from utils.budget import COMPARAISON, analyse_budget, analyse_budgets
+
+BUDGET = {
+    "salaire_net": 7_000, "bonus_mensuel": 500, "revenus_annexes": 500,
+    "loyer": 2_000, "assurance_maladie": 400, "impots_mensuels": 800, "prevoyance_3a": 588,
+    "alimentation": 700, "loisirs": 300, "vacances": 212,
+}
+
+
+class TestAnalyseBudget(unittest.TestCase):
+
+    def test_totaux(self):
+        analyse = analyse_budget(BUDGET)
+        self.assertEqual(analyse["revenu_total"], 8_000)
+        self.assertEqual(analyse["total_charges_fixes"], 3_788)
+        self.assertEqual(analyse["total_variables"], 1_212)
+        self.assertEqual(analyse["solde"], 3_000)
+        self.assertEqual(analyse["taux_epargne"], 37.5)
+        self.assertEqual(analyse["comparaison"]["Logement"]["client_pct"], 25.0)
+        self.assertEqual(analyse["comparaison"]["Épargne"]["client_pct"], 37.5)
+
+    def test_alertes(self):
+        self.assertEqual(
+            analyse_budget(BUDGET)["alertes"],
+            {"logement": False, "epargne_faible": False, "epargne_excellente": True, "pilier_3a": False},
+        )
+        serre = analyse_budget({**BUDGET, "loyer": 3_000, "prevoyance_3a": 0, "vacances": 2_500})
+        self.assertEqual(
+            serre["alertes"],
+            {"logement": True, "epargne_faible": True, "epargne_excellente": False, "pilier_3a": True},
+        )
+        self.assertEqual(serre["solde"], 300)
+
+    def test_sans_revenu(self):
+        analyse = analyse_budget({"loyer": 1_000})
+        self.assertEqual(analyse["taux_epargne"], 0.0)
+        self.assertFalse(any(analyse["alertes"].values()))
+
+    def test_portefeuille_identique_au_budget_seul(self):
+        budgets = [BUDGET, {**BUDGET, "loyer": 3_200, "bonus_mensuel": None}, {"salaire_net": 4_000}]
+        tableau = analyse_budgets(pd.DataFrame(budgets))
+        for ligne, budget in zip(tableau.itertuples(), budgets):
+            seul = analyse_budget(budget)
+            self.assertAlmostEqual(ligne.solde, seul["solde"])
+            self.assertAlmostEqual(ligne.taux_epargne, seul["taux_epargne"])
+            for cle, label, _, _ in COMPARAISON:
+                self.assertAlmostEqual(getattr(ligne, f"pct_{cle}"), seul["comparaison"][label]["client_pct"])
+            self.assertEqual(bool(ligne.alerte_logement), seul["alertes"]["logement"])
+            self.assertEqual(bool(ligne.alerte_3a), seul["alertes"]["pilier_3a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
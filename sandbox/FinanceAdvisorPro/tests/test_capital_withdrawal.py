@@ -0,0 +1,84 @@
+import unittest
+from itertools import product
+
+import numpy as np
+
+from utils.capital_withdrawal import (
+    MAX_COMPTES, comptes_standards, impot_retrait_capital, impot_retrait_capital_vectorise, optimiser_retraits,
+)
+
+CANTON = "Vaud (VD)"
+
+
+def _force_brute(comptes, canton, marie=False):
+    """Impôt minimal sur toutes les affectations compte → âge de retrait."""
+    fenetres = [range(c["age_min"], c["age_max"] + 1) for c in comptes]
+    meilleur = np.inf
+    for ages in product(*fenetres):
+        par_age = {}
+        for c, age in zip(comptes, ages):
+            par_age[age] = par_age.get(age, 0) + c["capital"]
+        impot = sum(impot_retrait_capital(m, canton, marie)["impot_total"] for m in par_age.values())
+        meilleur = min(meilleur, impot)
+    return meilleur
+
+
+class TestImpotRetrait(unittest.TestCase):
+
+    def test_progressif(self):
+        montants = np.linspace(0, 2_000_000, 41)
+        impots = impot_retrait_capital_vectorise(montants, CANTON)["total"]
+        self.assertTrue((np.diff(impots) >= 0).all())
+        taux = [impot_retrait_capital(m, CANTON)["taux_effectif"] for m in (100_000, 500_000, 1_500_000)]
+        self.assertEqual(taux, sorted(taux))
+
+    def test_canton_inconnu_federal_seul(self):
+        impot = impot_retrait_capital(400_000, "Atlantide")
+        self.assertEqual(impot["impot_cantonal"], 0)
+        self.assertEqual(impot["impot_total"], impot["impot_federal"])
+
+
+class TestOptimiserRetraits(unittest.TestCase):
+
+    def test_jamais_pire_que_la_reference(self):
+        rng = np.random.default_rng(5)
+        for _ in range(10):
+            n = int(rng.integers(1, 5))
+            comptes = [
+                {"nom": f"c{j}", "capital": float(rng.integers(20, 600)) * 1_000,
+                 "age_min": int(a), "age_max": int(a + rng.integers(0, 4))}
+                for j, a in enumerate(rng.integers(59, 64, size=n))
+            ]
+            resultat = optimiser_retraits(comptes, CANTON, marie=bool(rng.integers(2)))
+            self.assertIsNotNone(resultat["economie"])
+            self.assertGreaterEqual(resultat["economie"], 0)
+            self.assertEqual(resultat["montant_total"], resultat["reference"]["montant_total"])
+
+    def test_optimum_force_brute(self):
+        comptes = comptes_standards(400_000, 150_000, nb_comptes_3a=3)
+        resultat = optimiser_retraits(comptes, CANTON)
+        self.assertAlmostEqual(resultat["impot_total"], _force_brute(comptes, CANTON), places=2)
+
+    def test_chaque_compte_retire_une_fois_dans_sa_fenetre(self):
+        comptes = comptes_standards(400_000, 150_000, nb_comptes_3a=3)
+        fenetres = {c["nom"]: (c["age_min"], c["age_max"]) for c in comptes}
+        retires = [(nom, ligne["age"]) for ligne in optimiser_retraits(comptes, CANTON)["plan"] for nom in ligne["comptes"]]
+        self.assertEqual(sorted(nom for nom, _ in retires), sorted(fenetres))
+        for nom, age in retires:
+            self.assertTrue(fenetres[nom][0] <= age <= fenetres[nom][1])
+
+    def test_compte_unique(self):
+        resultat = optimiser_retraits(comptes_standards(300_000, 0), CANTON)
+        self.assertEqual(resultat["economie"], 0)
+        self.assertEqual(resultat["plan"], resultat["reference"]["plan"])
+
+    def test_erreurs(self):
+        with self.assertRaises(ValueError):
+            optimiser_retraits([{"nom": "x", "capital": 1, "age_min": 65, "age_max": 60}], CANTON)
+        trop = [{"nom": str(j), "capital": 1, "age_min": 60, "age_max": 65} for j in range(MAX_COMPTES + 1)]
+        with self.assertRaises(ValueError):
+            optimiser_retraits(trop, CANTON)
+
+
+if __name__ == "__main__":
+    unittest.main()
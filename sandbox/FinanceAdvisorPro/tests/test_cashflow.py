@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from utils.cashflow import projection_cashflow
+
+CLIENT = dict(
+    salaire_annuel=110_000, age_actuel=58, depenses_annuelles=60_000, canton="Vaud (VD)",
+    commune="Lausanne", capital_lpp=300_000, capital_3a=50_000, epargne_initiale=80_000, annees=12,
+)
+
+
+class TestProjectionCashflow(unittest.TestCase):
+
+    def test_scenarios_identiques_aux_projections_seules(self):
+        rendements = [0.02, 0.04, 0.06]
+        groupe = projection_cashflow(**CLIENT, rendement_placements=rendements)
+        self.assertEqual(groupe["scenarios"], 3)
+        for s, rendement in enumerate(rendements):
+            seul = projection_cashflow(**CLIENT, rendement_placements=rendement)
+            for serie in ("impots", "surplus", "patrimoine", "patrimoine_total"):
+                np.testing.assert_allclose(groupe[serie][s], seul[serie][0])
+
+    def test_equilibre_des_flux(self):
+        r = projection_cashflow(**CLIENT, rendement_placements=0.03)
+        np.testing.assert_allclose(
+            r["surplus"],
+            r["revenu_brut"] - r["cotisations"] - r["impots"] - r["versement_3a"] - r["depenses"],
+        )
+        precedent = np.concatenate([[CLIENT["epargne_initiale"]], r["patrimoine"][0, :-1]])
+        # Le 3a rejoint le patrimoine l'année de la retraite (65 ans, 8e année)
+        precedent[7] += r["capital_3a"][0, 6]
+        np.testing.assert_allclose(r["patrimoine"][0], precedent * 1.03 + r["surplus"][0])
+
+    def test_passage_a_la_retraite(self):
+        r = projection_cashflow(**CLIENT)
+        retraite = r["ages"].index(65)
+        self.assertTrue((r["capital_lpp"][0, retraite:] == 0).all())
+        self.assertTrue((r["capital_3a"][0, retraite:] == 0).all())
+        self.assertTrue((r["cotisations"][0, retraite:] == 0).all())
+        self.assertTrue((r["versement_3a"][0, retraite:] == 0).all())
+        self.assertGreater(r["capital_lpp"][0, retraite - 1], CLIENT["capital_lpp"])
+
+    def test_epuisement_du_patrimoine(self):
+        r = projection_cashflow(**{**CLIENT, "depenses_annuelles": 150_000})
+        self.assertIsNotNone(r["age_epuisement"][0])
+        self.assertIsNone(projection_cashflow(**CLIENT)["age_epuisement"][0])
+
+    def test_memoisation_en_lecture_seule(self):
+        r = projection_cashflow(**CLIENT)
+        self.assertIs(projection_cashflow(**CLIENT), r)
+        with self.assertRaises(ValueError):
+            r["patrimoine"][0, 0] = 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils import database, migrations
+from utils.db_backends import SQLiteBackend, set_backend
+from utils.migrations import LATEST_VERSION, run_migrations
+
+RESULTATS = {"capital_final": 125_000.0, "evolution": [1, 2, 3]}
+
+
+class DatabaseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        set_backend(SQLiteBackend.in_memory())
+        database.init_db()
+        self.client_id = database.create_client("conseiller", nom="Muster", prenom="Anna")
+
+    def tearDown(self):
+        set_backend(None)
+
+    def _payloads(self):
+        with database.get_db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM simulation_payloads").fetchone()[0]
+
+
+class TestPayloads(DatabaseTestCase):
+
+    def test_resultats_identiques_partages(self):
+        database.save_simulation(self.client_id, "conseiller", "investissements", "a", {"x": 1}, RESULTATS)
+        database.save_simulation(self.client_id, "conseiller", "investissements", "b", {"x": 2}, RESULTATS)
+        self.assertEqual(self._payloads(), 1)
+        versions = database.get_simulations(self.client_id, "investissements")
+        self.assertEqual([s["resultats"] for s in versions], [RESULTATS, RESULTATS])
+
+    def test_payload_recent_garde_apres_suppression(self):
+        # Une sauvegarde concurrente peut pointer vers le payload pendant la purge
+        sim_id = database.save_simulation(self.client_id, "conseiller", "budget", "a", {}, RESULTATS)
+        database.delete_simulation(sim_id)
+        self.assertEqual(self._payloads(), 1)
+        database.save_simulation(self.client_id, "conseiller", "budget", "b", {}, RESULTATS)
+        self.assertEqual(database.get_latest_simulation(self.client_id, "budget")["resultats"], RESULTATS)
+
+    def test_payload_orphelin_purge_apres_delai(self):
+        sim_id = database.save_simulation(self.client_id, "conseiller", "budget", "a", {}, RESULTATS)
+        database.delete_simulation(sim_id)
+        with database.get_db() as conn:
+            database._purge_orphan_payloads(conn, grace=-1)
+        self.assertEqual(self._payloads(), 0)
+
+
+class TestFindSimulationByParams(DatabaseTestCase):
+
+    def test_derniere_version_du_client(self):
+        autre_client = database.create_client("conseiller", nom="Autre", prenom="Ben")
+        database.save_simulation(self.client_id, "conseiller", "fiscalite", "v1", {"revenu": 90_000}, RESULTATS)
+        v2 = database.save_simulation(self.client_id, "conseiller", "fiscalite", "v2", {"revenu": 90_000}, {"impot": 1})
+        database.save_simulation(autre_client, "conseiller", "fiscalite", "autre", {"revenu": 90_000}, RESULTATS)
+
+        trouvee = database.find_simulation_by_params(self.client_id, "fiscalite", {"revenu": 90_000})
+        self.assertEqual(trouvee["id"], v2)
+        self.assertEqual(trouvee["resultats"], {"impot": 1})
+        self.assertIsNone(database.find_simulation_by_params(self.client_id, "fiscalite", {"revenu": 1}))
+        self.assertIsNone(database.find_simulation_by_params(self.client_id, "budget", {"revenu": 90_000}))
+
+
+
+class TestMigrations(unittest.TestCase):
+
+    def test_demarrages_concurrents(self):
+        # Deux processus sur une base vierge : un seul applique les migrations
+        with tempfile.TemporaryDirectory() as dossier:
+            backend = SQLiteBackend(Path(dossier) / "fap.db")
+            depart = threading.Barrier(2)
+            resultats = []
+            (numero, description, schema_initial), *suite = migrations.MIGRATIONS
+
+            def schema_initial_lent(conn, backend):
+                time.sleep(0.2)
+                schema_initial(conn, backend)
+
+            def demarrer():
+                conn = backend.connect()
+                try:
+                    depart.wait()
+                    resultats.append(run_migrations(conn, backend))
+                finally:
+                    backend.release(conn)
+
+            threads = [threading.Thread(target=demarrer) for _ in range(2)]
+            with mock.patch.object(migrations, "MIGRATIONS", [(numero, description, schema_initial_lent), *suite]):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(sorted(resultats), [[], list(range(1, LATEST_VERSION + 1))])
+            conn = backend.connect()
+            try:
+                versions = conn.execute("SELECT version FROM schema_version ORDER BY version").fetchall()
+            finally:
+                backend.release(conn)
+        self.assertEqual([row["version"] for row in versions], list(range(1, LATEST_VERSION + 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
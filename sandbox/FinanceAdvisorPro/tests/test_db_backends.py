@@ -0,0 +1,70 @@
+import unittest
+
+from utils.db_backends import _PgConnection, _PgRow, _to_pyformat
+
+
+class FakeCursor:
+    """Curseur psycopg2 minimal : enregistre la requête envoyée."""
+
+    def __init__(self, log):
+        self.log = log
+        self.description = [("n",)]
+        self.rowcount = 1
+
+    def execute(self, sql, params):
+        self.log.append((sql, params))
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class FakeRawConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class TestToPyformat(unittest.TestCase):
+
+    def test_placeholders(self):
+        self.assertEqual(
+            _to_pyformat("SELECT * FROM clients WHERE id = ? AND advisor_id = ?"),
+            "SELECT * FROM clients WHERE id = %s AND advisor_id = %s",
+        )
+
+    def test_percent_is_escaped(self):
+        self.assertEqual(_to_pyformat("SELECT 100 % 7, ?"), "SELECT 100 %% 7, %s")
+
+    def test_string_literals(self):
+        # Un `?` dans une chaîne reste littéral, un `%` y est doublé
+        self.assertEqual(
+            _to_pyformat("SELECT * FROM clients WHERE notes LIKE '%?%' AND nom = ?"),
+            "SELECT * FROM clients WHERE notes LIKE '%%?%%' AND nom = %s",
+        )
+
+    def test_escaped_quote_in_literal(self):
+        self.assertEqual(
+            _to_pyformat("SELECT 'l''an ?' AS a, ?"),
+            "SELECT 'l''an ?' AS a, %s",
+        )
+
+
+class TestPgConnection(unittest.TestCase):
+
+    def test_execute_rewrites_and_passes_params(self):
+        raw = FakeRawConnection()
+        conn = _PgConnection(raw)
+        row = conn.execute("SELECT n FROM t WHERE a = ? AND b LIKE ?", ["x", "%y%"]).fetchone()
+        self.assertEqual(raw.log, [("SELECT n FROM t WHERE a = %s AND b LIKE %s", ("x", "%y%"))])
+        self.assertIsInstance(row, _PgRow)
+        self.assertEqual(row["n"], 1)
+        self.assertEqual(row[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
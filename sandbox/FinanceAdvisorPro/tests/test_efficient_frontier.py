@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from utils.efficient_frontier import (
+    N_SCENARIOS_CVAR, NIVEAU_CVAR, _evaluation, _grille, _mesures, _pareto, _rendements_annuels,
+    frontiere_efficiente, recommander_allocation,
+)
+from utils.parameter_packs import resoudre_annee
+
+
+class TestGrille(unittest.TestCase):
+
+    def test_simplexe_sous_bornes(self):
+        grille = _grille(5, 5, (100, 100, 100, 100, 10))
+        self.assertEqual(len(grille), 4_641)
+        self.assertTrue((grille.sum(axis=1) == 100).all())
+        self.assertTrue((grille % 5 == 0).all() and (grille[:, 4] <= 10).all())
+        self.assertEqual(len(np.unique(grille, axis=0)), len(grille))
+
+    def test_pas_invalide(self):
+        with self.assertRaises(ValueError):
+            _grille(5, 7, (100,) * 5)
+
+
+class TestPareto(unittest.TestCase):
+
+    def test_non_domines(self):
+        rng = np.random.default_rng(1)
+        risque, rendement = rng.random(500), rng.random(500)
+        front = _pareto(risque, rendement)
+        for i in front:
+            domine = (risque <= risque[i]) & (rendement >= rendement[i]) & ((risque < risque[i]) | (rendement > rendement[i]))
+            self.assertFalse(domine.any())
+        # Tout candidat hors front est dominé par un point du front
+        for i in np.setdiff1d(np.arange(500), front):
+            self.assertTrue(((risque[front] <= risque[i]) & (rendement[front] >= rendement[i])).any())
+        self.assertTrue((np.diff(risque[front]) >= 0).all() and (np.diff(rendement[front]) > 0).all())
+
+
+class TestMesures(unittest.TestCase):
+
+    def test_cvar_par_blocs_identique_au_calcul_dense(self):
+        annee = resoudre_annee()
+        poids = _evaluation(annee, 10, (100.0,) * 5)[0]
+        cvar = _mesures(poids, annee)[2]
+        pertes = -(_rendements_annuels(annee, N_SCENARIOS_CVAR, 42) @ poids.T)
+        n_queue = int(round(N_SCENARIOS_CVAR * (1 - NIVEAU_CVAR)))
+        np.testing.assert_allclose(cvar, np.sort(pertes, axis=0)[-n_queue:].mean(axis=0))
+
+
+class TestFrontiere(unittest.TestCase):
+
+    def test_risque_et_rendement_croissants(self):
+        for mesure in ("volatilite", "cvar"):
+            points = frontiere_efficiente(mesure)["points"]
+            self.assertGreater(len(points), 1)
+            self.assertEqual([p[mesure] for p in points], sorted(p[mesure] for p in points))
+            self.assertEqual([p["rendement"] for p in points], sorted(p["rendement"] for p in points))
+            for p in points:
+                self.assertAlmostEqual(sum(p["allocation"].values()), 100, places=6)
+
+    def test_mesure_inconnue(self):
+        with self.assertRaises(ValueError):
+            frontiere_efficiente("drawdown")
+
+
+class TestRecommandation(unittest.TestCase):
+
+    def test_moins_risquee_qui_atteint_l_objectif(self):
+        reco = recommander_allocation(100_000, 1_000, 15, 300_000)
+        self.assertTrue(reco["atteint"])
+        self.assertGreaterEqual(reco["valeur_percentile"], 300_000)
+        # Aucun point simulé moins risqué n'atteint l'objectif
+        for point in reco["points"]:
+            if point["volatilite"] < reco["volatilite"]:
+                self.assertLess(point["valeur_percentile"], 300_000)
+
+    def test_objectif_hors_d_atteinte(self):
+        reco = recommander_allocation(10_000, 0, 5, 10_000_000)
+        self.assertFalse(reco["atteint"])
+        self.assertEqual(reco["valeur_percentile"], max(p["valeur_percentile"] for p in reco["points"]))
+
+    def test_percentile_invalide(self):
+        with self.assertRaises(ValueError):
+            recommander_allocation(10_000, 0, 5, 20_000, percentile=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from utils.investment import (
+    PERCENTILES, _indices_blocs, rendements_historiques, simulation_bootstrap, simulation_monte_carlo,
+)
+
+ECHANTILLON = Path(__file__).parent / "data" / "rendements_mensuels.csv"
+EQUILIBRE = {"Obligations": 35, "Actions": 35, "Immobilier": 20, "Liquidités": 10}
+
+
+def _monte_carlo_boucle(capital_initial, versement_mensuel, rendement_moyen, volatilite, annees, n_simulations):
+    """Implémentation d'origine, scénario par scénario et mois par mois."""
+    np.random.seed(42)
+    taux_mensuel = rendement_moyen / 12
+    vol_mensuelle = volatilite / np.sqrt(12)
+    trajectoires = np.zeros((n_simulations, annees * 12 + 1))
+    trajectoires[:, 0] = capital_initial
+    for sim in range(n_simulations):
+        capital = capital_initial
+        for m in range(1, annees * 12 + 1):
+            capital = max(capital * (1 + np.random.normal(taux_mensuel, vol_mensuelle)) + versement_mensuel, 0)
+            trajectoires[sim, m] = capital
+    return trajectoires[:, ::12]
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_identique_a_la_boucle(self):
+        # Le second cas, très volatil, touche le plancher à 0
+        for args in ((50_000, 500, 0.05, 0.10, 10, 200), (20_000, 0, 0.0, 4.0, 5, 100)):
+            resultat = simulation_monte_carlo(*args)
+            annuel = _monte_carlo_boucle(*args)
+            self.assertEqual((annuel == 0).any(), args[3] > 1)
+            for p in PERCENTILES:
+                np.testing.assert_allclose(
+                    [e["valeur"] for e in resultat["percentiles_evolution"][p]],
+                    np.round(np.percentile(annuel, p, axis=0), 2),
+                    rtol=1e-9,
+                )
+            self.assertAlmostEqual(resultat["mediane"], round(float(np.median(annuel[:, -1])), 2), places=2)
+            self.assertEqual(
+                resultat["probabilite_perte"],
+                round(float(np.mean(annuel[:, -1] < resultat["total_verse"])) * 100, 2),
+            )
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def test_lecture_historique(self):
+        historique = rendements_historiques(ECHANTILLON)
+        self.assertEqual(historique["classes"], ("Obligations", "Actions", "Immobilier", "Liquidités", "Crypto"))
+        self.assertEqual(historique["rendements"].shape, (60, 5))
+        self.assertTrue(np.isnan(historique["rendements"][:24, 4]).all())
+
+    def test_blocs_consecutifs(self):
+        taille_bloc = 6
+        indices = _indices_blocs(60, 40, taille_bloc, 200, 7)
+        self.assertEqual(indices.shape, (200, 40))
+        self.assertTrue(((indices >= 0) & (indices < 60)).all())
+        # Dans chaque bloc, les mois se suivent ; un nouveau bloc peut repartir n'importe où
+        ecarts = np.diff(indices, axis=1)
+        dans_bloc = np.arange(1, 40) % taille_bloc != 0
+        self.assertTrue((ecarts[:, dans_bloc] == 1).all())
+        self.assertFalse((ecarts[:, ~dans_bloc] == 1).all())
+
+    def test_graine_reproductible(self):
+        a = simulation_bootstrap(10_000, 200, EQUILIBRE, 5, chemin=ECHANTILLON, graine=3)
+        b = simulation_bootstrap(10_000, 200, EQUILIBRE, 5, chemin=ECHANTILLON, graine=3)
+        c = simulation_bootstrap(10_000, 200, EQUILIBRE, 5, chemin=ECHANTILLON, graine=4)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a["mediane"], c["mediane"])
+
+    def test_meme_sortie_que_le_parametrique(self):
+        bootstrap = simulation_bootstrap(10_000, 200, EQUILIBRE, 5, chemin=ECHANTILLON)
+        parametrique = simulation_monte_carlo(10_000, 200, 0.04, 0.08, 5)
+        self.assertEqual(set(bootstrap) - {"historique"}, set(parametrique))
+        self.assertEqual(set(bootstrap["percentiles_evolution"]), set(PERCENTILES))
+        self.assertEqual(len(bootstrap["percentiles_evolution"][50]), 6)
+        self.assertEqual(bootstrap["total_verse"], parametrique["total_verse"])
+
+    def test_mois_incomplets_exclus(self):
+        sans_crypto = simulation_bootstrap(10_000, 0, EQUILIBRE, 3, chemin=ECHANTILLON)["historique"]
+        avec_crypto = simulation_bootstrap(10_000, 0, {**EQUILIBRE, "Crypto": 5}, 3, chemin=ECHANTILLON)["historique"]
+        self.assertEqual((sans_crypto["debut"], sans_crypto["n_mois"]), ("2019-01", 60))
+        self.assertEqual((avec_crypto["debut"], avec_crypto["n_mois"]), ("2021-01", 36))
+
+    def test_erreurs(self):
+        with self.assertRaises(ValueError):
+            simulation_bootstrap(10_000, 0, {"Or": 100}, 3, chemin=ECHANTILLON)
+        with self.assertRaises(ValueError):
+            simulation_bootstrap(10_000, 0, EQUILIBRE, 3, taille_bloc=61, chemin=ECHANTILLON)
+        with self.assertRaises(FileNotFoundError):
+            simulation_bootstrap(10_000, 0, EQUILIBRE, 3, chemin=ECHANTILLON.with_name("absent.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from utils.lpp_buyback import economies_rachat, optimiser_rachats_lpp
+
+CONTEXTE = dict(revenu_brut=160_000, canton="Vaud (VD)", commune="Lausanne")
+
+
+class TestEconomiesRachat(unittest.TestCase):
+
+    def test_croissante_et_nulle_sans_rachat(self):
+        economies = economies_rachat([90_000, 160_000], np.linspace(0, 80_000, 17), "Vaud (VD)")
+        self.assertTrue((economies[:, 0] == 0).all())
+        self.assertTrue((np.diff(economies, axis=1) >= 0).all())
+        # Un revenu plus élevé économise plus sur le même rachat
+        self.assertTrue((economies[1] >= economies[0]).all())
+
+
+class TestOptimiserRachats(unittest.TestCase):
+
+    def test_toute_la_capacite_est_rachetee(self):
+        for capacite, annees in ((120_000, 4), (123_456, 3), (7_500, 5), (2_000_000, 6)):
+            resultat = optimiser_rachats_lpp(capacite, annees, **CONTEXTE)
+            self.assertAlmostEqual(resultat["rachat_total"], capacite, places=2)
+            self.assertEqual([p["annee"] for p in resultat["plan"]], list(range(1, annees + 1)))
+
+    def test_repartir_vaut_mieux_qu_une_fois(self):
+        resultat = optimiser_rachats_lpp(120_000, 4, **CONTEXTE)
+        self.assertGreaterEqual(resultat["gain_vs_une_fois"], 0)
+        self.assertAlmostEqual(
+            resultat["gain_vs_une_fois"], resultat["economie_totale"] - resultat["economie_en_une_fois"], places=2,
+        )
+        # Montants égaux (sur la grille) : au mieux égal à l'optimum, aux départages près
+        self.assertGreaterEqual(resultat["economie_totale"] + 1, resultat["economie_repartie"])
+
+    def test_optimum_force_brute(self):
+        # Deux années, grille de 10 pas : toutes les répartitions
+        resultat = optimiser_rachats_lpp(50_000, 2, pas=5_000, **CONTEXTE)
+        montants = np.linspace(0, 50_000, 11)
+        economies = economies_rachat([CONTEXTE["revenu_brut"]], montants, "Vaud (VD)", "Lausanne")[0]
+        meilleure = max(economies[k] + economies[10 - k] for k in range(11))
+        self.assertAlmostEqual(resultat["economie_totale"], meilleure, places=2)
+
+    def test_sans_capacite(self):
+        self.assertEqual(optimiser_rachats_lpp(0, 5, **CONTEXTE)["plan"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from utils import database, mail_queue
+from utils.db_backends import SQLiteBackend, set_backend
+
+CONFIG = {"host": "smtp.example.ch", "port": 587, "user": "conseil@example.ch", "password": "ancien"}
+
+
+def _emails(n: int) -> list[dict]:
+    return [
+        {"to_email": f"client{i}@example.ch", "client_name": f"Client {i}", "module_name": "Budget",
+         "pdf_bytes": b"%PDF-1.4", "subject": "Rapport"}
+        for i in range(n)
+    ]
+
+
+class MailQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        set_backend(SQLiteBackend.in_memory())
+        database.init_db()
+        self.key = mail_queue.smtp_key(CONFIG)
+
+    def tearDown(self):
+        for queue in mail_queue._queues.values():
+            queue.stop()
+        mail_queue._queues.clear()
+        set_backend(None)
+
+
+class TestReleaseOutbox(MailQueueTestCase):
+
+    def test_emails_reserves_rendus_sans_tentative(self):
+        database.enqueue_emails(self.key, _emails(3))
+        lot = database.claim_outbox_emails(self.key, 10)
+        database.complete_outbox_email(lot[0]["id"], lot[0]["claim_token"], "sent")
+        self.assertEqual(database.release_outbox_emails(lot[0]["claim_token"]), 2)
+        self.assertEqual(database.get_outbox_counts(self.key), {"sent": 1, "queued": 2})
+        repris = database.claim_outbox_emails(self.key, 10)
+        self.assertEqual([e["attempts"] for e in repris], [0, 0])
+
+
+class TestStop(MailQueueTestCase):
+
+    def test_arret_en_cours_de_lot(self):
+        database.enqueue_emails(self.key, _emails(3))
+        queue = mail_queue.MailQueue(CONFIG, concurrency=1)
+
+        def envoi_puis_arret(session, email):
+            database.complete_outbox_email(email["id"], email["claim_token"], "sent")
+            queue._stopped.set()
+
+        with mock.patch.object(queue, "_deliver", envoi_puis_arret):
+            queue.start()
+            worker = queue._threads[0]
+            worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(database.get_outbox_counts(self.key), {"sent": 1, "queued": 2})
+        queue.start()
+        self.assertEqual(queue._threads, [])
+
+    def test_changement_de_config_arrete_l_ancienne_file(self):
+        with mock.patch.object(mail_queue.MailQueue, "_run", lambda self: self._stopped.wait()):
+            ancienne = mail_queue.get_mail_queue(CONFIG)
+            self.assertIs(mail_queue.get_mail_queue(dict(CONFIG)), ancienne)
+            nouvelle = mail_queue.get_mail_queue({**CONFIG, "password": "nouveau"})
+        self.assertIsNot(nouvelle, ancienne)
+        self.assertTrue(ancienne._stopped.is_set())
+        self.assertFalse(any(t.is_alive() for t in ancienne._threads))
+        self.assertTrue(all(t.is_alive() for t in nouvelle._threads))
+        self.assertIs(mail_queue._queues[self.key], nouvelle)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import copy
+import json
+import math
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils import parameter_packs
+from utils.constants import PILIER_3A_SALARIE
+from utils.parameter_packs import charger_pack, resoudre_annee
+from utils.swiss_tax import calcul_impot_federal
+
+with open(parameter_packs.PACKS_DIR / "2025.json", encoding="utf-8") as _f:
+    PACK_2025 = json.load(_f)
+
+
+def _vider_caches():
+    for fn in (parameter_packs.annees_disponibles, parameter_packs.resoudre_annee, parameter_packs._charger):
+        fn.cache_clear()
+
+
+class PacksTestCase(unittest.TestCase):
+    """Packs écrits dans un dossier temporaire à la place de data/tax_packs."""
+
+    def setUp(self):
+        self._dossier = tempfile.TemporaryDirectory()
+        self.dossier = Path(self._dossier.name)
+        patch = mock.patch.object(parameter_packs, "PACKS_DIR", self.dossier)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self._dossier.cleanup)
+        self.addCleanup(_vider_caches)
+        _vider_caches()
+
+    def ecrire(self, annee: int, pack: dict):
+        (self.dossier / f"{annee}.json").write_text(json.dumps(pack), encoding="utf-8")
+
+
+class TestResolution(PacksTestCase):
+
+    def test_annee_applicable(self):
+        self.ecrire(2025, PACK_2025)
+        self.ecrire(2027, {**PACK_2025, "annee": 2027})
+        self.assertEqual(resoudre_annee(), 2027)
+        self.assertEqual(resoudre_annee(2026), 2025)
+        self.assertEqual(resoudre_annee(2030), 2027)
+        self.assertEqual(resoudre_annee(2020), 2025)
+
+    def test_aucun_pack(self):
+        with self.assertRaises(FileNotFoundError):
+            resoudre_annee()
+
+    def test_pack_de_l_annee_utilise(self):
+        pack_2027 = copy.deepcopy(PACK_2025)
+        pack_2027["annee"] = 2027
+        pack_2027["bareme_federal"]["seul"] = [[None, 0.1]]
+        self.ecrire(2025, PACK_2025)
+        self.ecrire(2027, pack_2027)
+        self.assertEqual(calcul_impot_federal(100_000, annee=2027), 10_000)
+        self.assertNotEqual(calcul_impot_federal(100_000, annee=2025), 10_000)
+
+
+class TestValidation(PacksTestCase):
+
+    def assertInvalide(self, pack: dict, message: str):
+        self.ecrire(2025, pack)
+        with self.assertRaises(ValueError) as erreur:
+            charger_pack(2025)
+        self.assertIn(message, str(erreur.exception))
+
+    def test_section_manquante(self):
+        pack = {k: v for k, v in PACK_2025.items() if k != "marches"}
+        self.assertInvalide(pack, "section « marches » manquante")
+
+    def test_annee_differente_du_fichier(self):
+        self.assertInvalide({**PACK_2025, "annee": 2024}, "différente du nom de fichier")
+
+    def test_bareme_non_croissant(self):
+        pack = copy.deepcopy(PACK_2025)
+        pack["bareme_federal"]["seul"] = [[50_000, 0.01], [40_000, 0.02], [None, 0.03]]
+        self.assertInvalide(pack, "bareme_federal.seul : seuils non croissants")
+
+    def test_correlations_asymetriques(self):
+        pack = copy.deepcopy(PACK_2025)
+        pack["marches"]["correlations"][0][1] = 0.5
+        self.assertInvalide(pack, "matrice symétrique")
+
+
+class TestPackCourant(unittest.TestCase):
+
+    def test_mise_en_forme(self):
+        pack = charger_pack()
+        self.assertTrue(math.isinf(pack["bareme_federal"]["seul"][-1][0]))
+        self.assertIsInstance(next(iter(pack["lpp"]["taux_par_age"])), tuple)
+        self.assertIs(charger_pack(pack["annee"]), pack)
+        self.assertEqual(PILIER_3A_SALARIE, pack["pilier_3a"]["salarie"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from utils.pdf_export import COLORS, FinanceAdvisorPDF, _add_cover_page, _cover_template
+
+
+def _couverture(advisor_name: str, client_name: str) -> bytes:
+    pdf = FinanceAdvisorPDF(advisor_name, client_name, "Budget")
+    pdf.compress = False
+    _add_cover_page(pdf, "Gestion Budgetaire")
+    return bytes(pdf.output())
+
+
+class TestCouverture(unittest.TestCase):
+
+    def setUp(self):
+        _cover_template.cache_clear()
+
+    def test_enregistree_une_fois_par_conseiller(self):
+        a = _couverture("Claire Favre", "Anna Muster")
+        b = _couverture("Claire Favre", "Marc Rochat")
+        info = _cover_template.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+        self.assertIn(b"(Client : Anna Muster)", a)
+        self.assertIn(b"(Client : Marc Rochat)", b)
+        self.assertIn(b"(Conseiller : Claire Favre)", b)
+        _couverture("Luc Morel", "Anna Muster")
+        self.assertEqual(_cover_template.cache_info().misses, 2)
+
+    def test_theme_dans_la_cle(self):
+        modele = _cover_template("Claire Favre", "Budget", tuple(COLORS.items()))
+        autre = _cover_template("Claire Favre", "Budget", tuple({**COLORS, "primary": (0, 0, 0)}.items()))
+        self.assertIsNot(modele, autre)
+        self.assertIn(("fill", (0, 0, 0)), autre.ops)
+        self.assertNotIn(("fill", (0, 0, 0)), modele.ops)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from utils.constants import PROFILS_INVESTISSEMENT
+from utils.efficient_frontier import evaluer_allocations
+from utils.portfolio import balayer_allocations, comparer_rebalancements, poids_allocation, simuler_portefeuille
+
+ALLOCATION = PROFILS_INVESTISSEMENT["Équilibré"]["allocation"]
+
+
+class TestProfils(unittest.TestCase):
+
+    def test_profils_ordonnes_dans_les_deux_modeles(self):
+        # Les profils gardent leurs chiffres paramétriques ; le pack doit au
+        # moins les classer dans le même ordre de risque et de rendement
+        noms = list(PROFILS_INVESTISSEMENT)
+        pack = evaluer_allocations({n: PROFILS_INVESTISSEMENT[n]["allocation"] for n in noms})
+        for cle_profil, cle_pack in (("rendement_moyen", "rendement"), ("volatilite", "volatilite")):
+            parametrique = [PROFILS_INVESTISSEMENT[n][cle_profil] for n in noms]
+            multi_actifs = [pack[n][cle_pack] for n in noms]
+            self.assertEqual(parametrique, sorted(parametrique))
+            self.assertEqual(multi_actifs, sorted(multi_actifs))
+
+
+class TestSimulerPortefeuille(unittest.TestCase):
+
+    def setUp(self):
+        self.resultat = simuler_portefeuille(50_000, 500, ALLOCATION, 10, n_simulations=300)
+
+    def test_trajectoires_par_classe(self):
+        avoirs = self.resultat["avoirs"]
+        self.assertEqual(avoirs.shape, (300, 11, len(self.resultat["classes"])))
+        np.testing.assert_allclose(avoirs.sum(axis=-1), self.resultat["valeurs"])
+        np.testing.assert_allclose(avoirs.mean(axis=0), self.resultat["composition_moyenne"])
+
+    def test_graine_reproductible(self):
+        autre = simuler_portefeuille(50_000, 500, ALLOCATION, 10, n_simulations=300)
+        np.testing.assert_array_equal(autre["avoirs"], self.resultat["avoirs"])
+
+    def test_balayage_sur_les_memes_tirages(self):
+        balayage = balayer_allocations(50_000, 500, {"Équilibré": ALLOCATION}, 10, n_simulations=300)
+        self.assertEqual(balayage[0]["mediane"], self.resultat["mediane"])
+
+
+    def test_rebalancement_annuel(self):
+        # Rebalancé juste avant chaque relevé de fin d'année : composition = allocation cible
+        avoirs = self.resultat["avoirs"]
+        cible = poids_allocation(ALLOCATION, self.resultat["classes"])
+        np.testing.assert_allclose(avoirs / avoirs.sum(axis=-1, keepdims=True), np.broadcast_to(cible, avoirs.shape))
+        derive = simuler_portefeuille(50_000, 500, ALLOCATION, 10, rebalancement=0, n_simulations=300)["avoirs"]
+        self.assertFalse(np.allclose(derive[:, -1] / derive[:, -1].sum(axis=-1, keepdims=True), cible))
+
+    def test_frais(self):
+        sans = simuler_portefeuille(50_000, 500, ALLOCATION, 10, n_simulations=300, frais={"Actions": 0.0})
+        chers = simuler_portefeuille(50_000, 500, ALLOCATION, 10, n_simulations=300, frais={"Actions": 0.02})
+        self.assertTrue((chers["valeurs"][:, -1] < sans["valeurs"][:, -1]).all())
+
+    def test_comparer_rebalancements(self):
+        resultats = comparer_rebalancements(50_000, 500, ALLOCATION, 10, n_simulations=300)
+        self.assertEqual([r["rebalancement"] for r in resultats], [0, 1, 3, 12])
+        self.assertEqual(resultats[-1]["mediane"], self.resultat["mediane"])
+
+    def test_erreurs(self):
+        with self.assertRaises(ValueError):
+            simuler_portefeuille(50_000, 500, {"Or": 100}, 10)
+        with self.assertRaises(ValueError):
+            simuler_portefeuille(50_000, 500, ALLOCATION, 10, frais={"Or": 0.01})
+        with self.assertRaises(ValueError):
+            simuler_portefeuille(50_000, 500, {"Actions": 0}, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.relocation import classement_communes
+from utils.swiss_tax import calcul_impot_total
+
+REVENU = 150_000
+FORTUNE = 500_000
+
+
+class TestClassementCommunes(unittest.TestCase):
+
+    def test_identique_au_calcul_par_commune(self):
+        classement = classement_communes(REVENU, marie=True, enfants=1, fortune=FORTUNE, top=100, chemin=None)
+        for ligne in classement["classement"]:
+            seul = calcul_impot_total(
+                REVENU, ligne["canton"], ligne["commune"], marie=True, enfants=1, fortune=FORTUNE,
+            )
+            # Au centime près : le barème vectorisé cumule les tranches dans un autre ordre
+            self.assertAlmostEqual(ligne["impot_revenu"], seul["impot_revenu"], delta=0.011)
+            self.assertAlmostEqual(ligne["impot_fortune"], seul["impot_fortune"], places=2)
+
+    def test_ordre_croissant(self):
+        classement = classement_communes(REVENU, fortune=FORTUNE, top=100, chemin=None)
+        lignes = classement["classement"]
+        self.assertEqual(len(lignes), classement["nb_communes"])
+        self.assertEqual([l["rang"] for l in lignes], list(range(1, len(lignes) + 1)))
+        totaux = [l["impot_total"] for l in lignes]
+        self.assertEqual(totaux, sorted(totaux))
+        self.assertEqual(classement_communes(REVENU, fortune=FORTUNE, top=3, chemin=None)["classement"], lignes[:3])
+
+    def test_filtre_cantons(self):
+        classement = classement_communes(REVENU, top=100, cantons=["Vaud (VD)"], chemin=None)
+        self.assertTrue(classement["classement"])
+        self.assertEqual({l["canton"] for l in classement["classement"]}, {"Vaud (VD)"})
+
+    def test_csv_complete_et_corrige(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "communes.csv"
+            chemin.write_text(
+                "canton,commune,coefficient_communal\n"
+                "VD,Lutry,0.01\n"                    # abréviation, nouvelle commune
+                "Vaud (VD),Lausanne,0.02\n"          # nom complet, coefficient corrigé
+                "XX,Nulle part,0.5\n"                # canton inconnu : ignoré
+                "VD,Illisible,n/a\n",                # coefficient illisible : ignoré
+                encoding="utf-8",
+            )
+            sans = classement_communes(REVENU, top=200, cantons=["Vaud (VD)"], chemin=None)
+            avec = classement_communes(REVENU, top=200, cantons=["Vaud (VD)"], chemin=chemin)
+        self.assertEqual(avec["nb_communes"], sans["nb_communes"] + 1)
+        self.assertEqual([l["commune"] for l in avec["classement"][:2]], ["Lutry", "Lausanne"])
+
+
+if __name__ == "__main__":
+    unittest.main()
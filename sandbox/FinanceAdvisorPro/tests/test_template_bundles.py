@@ -0,0 +1,28 @@
+import unittest
+from unittest import mock
+
+from utils import template_bundles
+from utils.budget import analyse_budget
+from utils.case_templates import CASE_TEMPLATES
+from utils.template_bundles import _call_key, _template_calls, bundle_call
+
+
+class TestBundleBudget(unittest.TestCase):
+
+    def test_budget_du_cas_type_servi_sans_calcul(self):
+        template = CASE_TEMPLATES["famille_classe_moyenne"]
+        params = next(args[0] for fn, args, _ in _template_calls(template) if fn is analyse_budget)
+        # Postes du cas type, les autres aux valeurs par défaut de la page
+        self.assertEqual(params["loyer"], template["budget"]["loyer"])
+        self.assertEqual(params["vacances"], 200)
+
+        precalcule = {"precalcule": True}
+        entries = {_call_key(analyse_budget, (params,), {}): precalcule}
+        with mock.patch.object(template_bundles, "_entries", entries):
+            self.assertEqual(bundle_call(analyse_budget, dict(params)), precalcule)
+            modifie = {**params, "loyer": params["loyer"] + 100}
+            self.assertEqual(bundle_call(analyse_budget, modifie), analyse_budget(modifie))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from utils.parameter_packs import charger_pack
+from utils.swiss_tax import calcul_impot_fortune, calcul_impot_fortune_vectorise, calcul_impot_total
+
+FORTUNES = np.array([0, 40_000, 356_000, 1_250_000, 4_000_000], dtype=float)
+
+
+class TestImpotFortune(unittest.TestCase):
+
+    def test_bareme_par_tranches(self):
+        # Vaud : franchise 56'000, 0.25 % jusqu'à 100'000 puis 0.45 %
+        self.assertEqual(
+            calcul_impot_fortune(356_000, "Vaud (VD)"),
+            {"fortune_imposable": 300_000.0, "impot_fortune": 1_150.0, "taux_effectif": 0.323},
+        )
+        self.assertEqual(calcul_impot_fortune(356_000, "Vaud (VD)", marie=True)["impot_fortune"], 898.0)
+
+    def test_tous_cantons_identiques_au_canton_seul(self):
+        cantons = list(charger_pack()["fortune"])
+        for marie, enfants in ((False, 0), (True, 2)):
+            imposables, impots = calcul_impot_fortune_vectorise(FORTUNES, None, marie, enfants)
+            self.assertEqual(impots.shape, (len(cantons), len(FORTUNES)))
+            for k, canton in enumerate(cantons):
+                imposable, impot = calcul_impot_fortune_vectorise(FORTUNES, canton, marie, enfants)
+                np.testing.assert_array_equal(imposables[k], imposable)
+                np.testing.assert_array_equal(impots[k], impot)
+
+    def test_croissant_avec_la_fortune(self):
+        _, impots = calcul_impot_fortune_vectorise(np.linspace(0, 5_000_000, 101))
+        self.assertTrue((np.diff(impots, axis=1) >= 0).all())
+
+    def test_deduction_enfants(self):
+        # Genève déduit un montant par enfant, Vaud non
+        self.assertLess(
+            calcul_impot_fortune(800_000, "Genève (GE)", enfants=2)["impot_fortune"],
+            calcul_impot_fortune(800_000, "Genève (GE)")["impot_fortune"],
+        )
+        self.assertEqual(
+            calcul_impot_fortune(800_000, "Vaud (VD)", enfants=2)["impot_fortune"],
+            calcul_impot_fortune(800_000, "Vaud (VD)")["impot_fortune"],
+        )
+
+    def test_canton_inconnu(self):
+        imposable, impot = calcul_impot_fortune_vectorise(FORTUNES, "Atlantide")
+        self.assertFalse(imposable.any() or impot.any())
+
+    def test_inclus_dans_impot_total(self):
+        sans = calcul_impot_total(120_000, "Vaud (VD)")
+        avec = calcul_impot_total(120_000, "Vaud (VD)", fortune=356_000)
+        self.assertEqual(avec["impot_revenu"], sans["impot_revenu"])
+        self.assertEqual(avec["impot_fortune"], 1_150.0)
+        self.assertAlmostEqual(avec["impot_total"], sans["impot_total"] + 1_150.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,13 +5,40 @@ Gestion des sessions, login/logout, et rôles.
 
 import streamlit as st
 import yaml
-import hashlib
+import os
+import copy
+import tempfile
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
+from utils.passwords import (
+    hash_password,
+    hash_password_async,
+    needs_rehash,
+    verify_password,
+)
+from utils.sessions import issue_token, verify_token, remember_session, revoke_token
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 # Chemin vers le fichier de credentials
 CREDENTIALS_FILE = Path(__file__).parent.parent / "data" / "credentials.yaml"
+LOCK_FILE = CREDENTIALS_FILE.with_suffix(".lock")
+
+# Stockage des comptes : "yaml" (fichier, défaut) ou "db" (table users)
+AUTH_BACKEND = os.environ.get("FAP_AUTH_BACKEND", "yaml")
+
+# Cache en mémoire du fichier YAML, invalidé par son mtime
+_credentials_cache = {"mtime": None, "data": None}
+_cache_lock = threading.Lock()
 
 
 def _ensure_credentials_file():
@@ -30,26 +57,131 @@ def _ensure_credentials_file():
                 }
             }
         }
-        with open(CREDENTIALS_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(default_credentials, f, allow_unicode=True, default_flow_style=False)
+        with _file_lock():
+            if not CREDENTIALS_FILE.exists():
+                _write_credentials_file(default_credentials)
 
 
 def _hash_password(password: str) -> str:
-    """Hash un mot de passe avec SHA-256 (MVP — bcrypt pour la prod)."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash un mot de passe avec le KDF configuré (voir utils.passwords)."""
+    return hash_password(password)
+
+
+def _public_user(username: str, user: dict) -> dict:
+    """Infos utilisateur exposées dans la session (sans le hash)."""
+    return {
+        "username": username,
+        "name": user["name"],
+        "email": user.get("email", ""),
+        "role": user.get("role", "conseiller"),
+        "cabinet": user.get("cabinet", ""),
+    }
+
+
+@contextmanager
+def _file_lock(timeout: float = 10.0):
+    """Verrou inter-processus sur le fichier de credentials (écritures)."""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a+b") as lock:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Fichier de credentials verrouillé par un autre processus.")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_credentials_file() -> dict:
+    """Lit et parse le fichier YAML (sans cache)."""
+    with open(CREDENTIALS_FILE, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {"users": {}}
+
+
+def _write_credentials_file(credentials: dict):
+    """Écriture atomique : fichier temporaire puis renommage."""
+    fd, tmp_path = tempfile.mkstemp(dir=CREDENTIALS_FILE.parent, prefix=".credentials-", suffix=".yaml")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml.dump(credentials, f, allow_unicode=True, default_flow_style=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CREDENTIALS_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
 
 def _load_credentials() -> dict:
-    """Charge les credentials depuis le fichier YAML."""
+    """
+    Charge les credentials depuis le fichier YAML.
+    Le résultat est mis en cache tant que le mtime du fichier ne change pas :
+    à traiter en lecture seule.
+    """
     _ensure_credentials_file()
-    with open(CREDENTIALS_FILE, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    mtime = CREDENTIALS_FILE.stat().st_mtime_ns
+    with _cache_lock:
+        if _credentials_cache["mtime"] != mtime:
+            _credentials_cache["data"] = _read_credentials_file()
+            _credentials_cache["mtime"] = mtime
+        return _credentials_cache["data"]
+
+
+def _get_user(username: str) -> dict | None:
+    """Retourne l'enregistrement d'un utilisateur depuis le stockage actif."""
+    if AUTH_BACKEND == "db":
+        from utils.database import get_user
+        return get_user(username)
+    return _load_credentials().get("users", {}).get(username)
+
 
+def get_advisor(username: str) -> dict | None:
+    """Infos publiques d'un conseiller (sans le hash), depuis le stockage actif."""
+    user = _get_user(username)
+    return _public_user(username, user) if user else None
 
-def _save_credentials(credentials: dict):
-    """Sauvegarde les credentials dans le fichier YAML."""
-    with open(CREDENTIALS_FILE, "w", encoding="utf-8") as f:
-        yaml.dump(credentials, f, allow_unicode=True, default_flow_style=False)
+
+def _add_user(username: str, record: dict) -> bool:
+    """Ajoute un utilisateur de façon atomique. False si l'identifiant existe."""
+    if AUTH_BACKEND == "db":
+        from utils.database import create_user
+        return create_user(username, **record)
+
+    _ensure_credentials_file()
+    with _file_lock():
+        # Relire sous verrou : une autre instance a pu écrire entre-temps
+        credentials = _read_credentials_file()
+        users = credentials.setdefault("users", {})
+        if username in users:
+            return False
+        users[username] = record
+        _write_credentials_file(credentials)
+        with _cache_lock:
+            _credentials_cache["data"] = credentials
+            _credentials_cache["mtime"] = CREDENTIALS_FILE.stat().st_mtime_ns
+    return True
+
+
+def migrate_credentials_to_db() -> int:
+    """Importe les comptes du fichier YAML dans la table users. Retourne le nombre importé."""
+    from utils.database import create_user
+    users = copy.deepcopy(_load_credentials().get("users", {}))
+    return sum(1 for username, record in users.items() if create_user(username, **record))
 
 
 def authenticate(username: str, password: str) -> dict | None:
@@ -57,22 +189,40 @@ def authenticate(username: str, password: str) -> dict | None:
     Authentifie un utilisateur.
     Retourne les infos user si succès, None sinon.
     """
-    credentials = _load_credentials()
-    users = credentials.get("users", {})
-
-    if username in users:
-        user = users[username]
-        if user["password"] == _hash_password(password):
-            return {
-                "username": username,
-                "name": user["name"],
-                "email": user.get("email", ""),
-                "role": user.get("role", "conseiller"),
-                "cabinet": user.get("cabinet", ""),
-            }
+    user = _get_user(username)
+
+    if user:
+        stored = user["password"]
+        # La connexion attend la vérification, pas le rehash
+        if verify_password(password, stored):
+            # Rehash paresseux en arrière-plan : ancien SHA-256 ou paramètres de coût dépassés
+            if needs_rehash(stored):
+                hash_password_async(password).add_done_callback(
+                    lambda future: _update_password(username, future.result())
+                )
+            return _public_user(username, user)
     return None
 
 
+def _update_password(username: str, password_hash: str):
+    """Remplace le hash stocké d'un utilisateur."""
+    if AUTH_BACKEND == "db":
+        from utils.database import update_user_password
+        update_user_password(username, password_hash)
+        return
+
+    with _file_lock():
+        credentials = _read_credentials_file()
+        users = credentials.get("users", {})
+        if username not in users:
+            return
+        users[username]["password"] = password_hash
+        _write_credentials_file(credentials)
+        with _cache_lock:
+            _credentials_cache["data"] = credentials
+            _credentials_cache["mtime"] = CREDENTIALS_FILE.stat().st_mtime_ns
+
+
 def register_user(
     username: str,
     password: str,
@@ -81,24 +231,15 @@ def register_user(
     cabinet: str = "",
     role: str = "conseiller",
 ) -> bool:
-    """Enregistre un nouvel utilisateur. Retourne True si succès."""
-    credentials = _load_credentials()
-    users = credentials.get("users", {})
-
-    if username in users:
-        return False  # Username déjà pris
-
-    users[username] = {
+    """Enregistre un nouvel utilisateur. Retourne True si succès (False si l'identifiant est pris)."""
+    return _add_user(username, {
         "name": name,
         "email": email,
         "password": _hash_password(password),
         "role": role,
         "cabinet": cabinet,
         "created_at": datetime.now().isoformat(),
-    }
-    credentials["users"] = users
-    _save_credentials(credentials)
-    return True
+    })
 
 
 def init_session():
@@ -119,30 +260,31 @@ def init_session():
         qp_user = st.query_params.get("auth_user", "")
         qp_token = st.query_params.get("auth_token", "")
         if qp_user and qp_token:
-            # Vérifier que le token correspond au user dans credentials
-            credentials = _load_credentials()
-            users = credentials.get("users", {})
-            if qp_user in users:
-                expected_token = hashlib.sha256(f"{qp_user}:{users[qp_user]['password']}".encode()).hexdigest()[:16]
-                if qp_token == expected_token:
-                    user_data = users[qp_user]
-                    st.session_state.authenticated = True
-                    st.session_state.user = {
-                        "username": qp_user,
-                        "name": user_data["name"],
-                        "email": user_data.get("email", ""),
-                        "role": user_data.get("role", "conseiller"),
-                        "cabinet": user_data.get("cabinet", ""),
-                    }
+            # Token signé : vérifié sans lire le stockage des comptes
+            session_user = verify_token(qp_token, username=qp_user)
+            if session_user and session_user.pop("_reload", False):
+                # Session inconnue de ce processus (redémarrage) : recharger le profil une fois
+                user_data = _get_user(qp_user)
+                session_user = _public_user(qp_user, user_data) if user_data else None
+                if session_user:
+                    remember_session(qp_token, session_user)
+            if session_user:
+                st.session_state.authenticated = True
+                st.session_state.user = session_user
+                st.session_state._auth_token = qp_token
 
 
 def _generate_auth_token(username: str) -> str:
-    """Génère un token d'authentification pour la persistance localStorage."""
-    credentials = _load_credentials()
-    users = credentials.get("users", {})
-    if username in users:
-        return hashlib.sha256(f"{username}:{users[username]['password']}".encode()).hexdigest()[:16]
-    return ""
+    """Génère un token de session signé pour la persistance localStorage."""
+    user = st.session_state.get("user")
+    if not user or user.get("username") != username:
+        user_data = _get_user(username)
+        if not user_data:
+            return ""
+        user = _public_user(username, user_data)
+    token = issue_token(user)
+    st.session_state._auth_token = token
+    return token
 
 
 def is_authenticated() -> bool:
@@ -161,6 +303,9 @@ def logout():
     st.session_state.user = None
     st.session_state.current_client = None
     st.session_state._logout_triggered = True
+    token = st.session_state.pop("_auth_token", None)
+    if token:
+        revoke_token(token)
     # Nettoyer les query_params
     for key in ["auth_user", "auth_token"]:
         if key in st.query_params:
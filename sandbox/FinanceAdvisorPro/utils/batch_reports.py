@@ -0,0 +1,236 @@
+"""
+Génération de rapports PDF par lots, hors session Streamlit.
+Charge la dernière simulation de chaque (client, module), rend les PDF en
+parallèle dans un pool de processus et les écrit dans un dossier ou une
+archive ZIP. Les noms de fichiers dépendent de l'ID de la simulation :
+relancer un lot interrompu ne régénère que les rapports manquants.
+
+Exemples :
+    python -m utils.batch_reports --advisor demo --output rapports_2025/
+    python -m utils.batch_reports --clients <id1> <id2> --modules prevoyance --output fin_annee.zip
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .auth import get_advisor
+from .database import init_db, get_client, get_clients, get_latest_simulation
+from .pdf_export import REPORT_EXPORTS
+
+MODULES = tuple(REPORT_EXPORTS)
+
+
+def _slug(text: str) -> str:
+    """Nom de fichier ASCII sans espaces ni caractères spéciaux."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9-]+", "_", text).strip("_")
+
+
+def report_filename(client: dict, module: str, simulation: dict) -> str:
+    """Nom déterministe du rapport d'une simulation (clé de reprise)."""
+    label = REPORT_EXPORTS[module][0]
+    nom_client = f"{client.get('prenom', '')} {client.get('nom', '')}".strip()
+    date = simulation["created_at"][:10].replace("-", "")
+    return f"Rapport_{_slug(label)}_{_slug(nom_client)}_{date}_{simulation['id'][:8]}.pdf"
+
+
+def plan_reports(
+    client_ids: list[str],
+    modules: list[str] | None = None,
+    advisor_name: str | None = None,
+) -> tuple[list[dict], list[tuple[str, str]]]:
+    """
+    Prépare les tâches de rendu. Les lectures en base restent dans le processus
+    principal ; les tâches ne contiennent que des données sérialisables.
+    Retourne (tâches, [(client_id, module)] sans simulation).
+    """
+    modules = list(modules or MODULES)
+    unknown = set(modules) - set(MODULES)
+    if unknown:
+        raise ValueError(f"Modules inconnus : {', '.join(sorted(unknown))}")
+
+    tasks, missing = [], []
+    advisor_names = {}
+    for client_id in client_ids:
+        client = get_client(client_id)
+        if not client:
+            missing.extend((client_id, module) for module in modules)
+            continue
+        if advisor_name is None and client["advisor_id"] not in advisor_names:
+            # Comptes YAML ou table users selon FAP_AUTH_BACKEND
+            advisor = get_advisor(client["advisor_id"])
+            advisor_names[client["advisor_id"]] = advisor["name"] if advisor else client["advisor_id"]
+        for module in modules:
+            simulation = get_latest_simulation(client_id, module)
+            if not simulation:
+                missing.append((client_id, module))
+                continue
+            tasks.append({
+                "client_id": client_id,
+                "module": module,
+                "filename": report_filename(client, module, simulation),
+                "advisor_name": advisor_name or advisor_names[client["advisor_id"]],
+                "client_name": f"{client.get('prenom', '')} {client.get('nom', '')}".strip(),
+                "params": simulation["parametres"],
+                "results": simulation["resultats"],
+            })
+    return tasks, missing
+
+
+def _render(task: dict) -> bytes:
+    """Rend un rapport (exécuté dans un processus du pool)."""
+    export_fn = REPORT_EXPORTS[task["module"]][1]
+    return bytes(export_fn(
+        advisor_name=task["advisor_name"],
+        client_name=task["client_name"],
+        params=task["params"],
+        results=task["results"],
+    ))
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _pack_zip(archive: Path, parts_dir: Path):
+    """Réécrit l'archive avec ses entrées existantes et les rapports du dossier de travail."""
+    tmp = archive.with_name(archive.name + ".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+        if archive.exists():
+            with zipfile.ZipFile(archive) as previous:
+                for name in previous.namelist():
+                    out.writestr(name, previous.read(name))
+        for part in sorted(parts_dir.glob("*.pdf")):
+            if part.name not in out.namelist():
+                out.write(part, part.name)
+    os.replace(tmp, archive)
+    shutil.rmtree(parts_dir)
+
+
+def generate_reports(
+    client_ids: list[str],
+    output: str | Path,
+    modules: list[str] | None = None,
+    advisor_name: str | None = None,
+    workers: int | None = None,
+    progress=None,
+) -> dict:
+    """
+    Génère les rapports des clients donnés.
+
+    Args:
+        client_ids: Clients à traiter
+        output: Dossier de sortie, ou chemin se terminant par .zip
+        modules: Modules à exporter (défaut : tous)
+        advisor_name: Nom affiché sur les rapports (défaut : nom du conseiller du client)
+        workers: Nombre de processus (défaut : nombre de CPU)
+        progress: Callback progress(fait, total, fichier, statut) — statut parmi
+                  "generated", "skipped", "failed"
+
+    Returns:
+        Dict {"generated", "skipped", "failed", "missing"} (listes de fichiers,
+        ou de (client_id, module) pour "missing") et "errors" {fichier: message}
+    """
+    init_db()
+    output = Path(output)
+    as_zip = output.suffix.lower() == ".zip"
+    # Les PDF d'une archive sont d'abord écrits dans un dossier de travail,
+    # conservé en cas d'interruption pour la reprise.
+    target_dir = output.with_name(output.name + ".parts") if as_zip else output
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    done = {p.name for p in target_dir.glob("*.pdf")}
+    if as_zip and output.exists():
+        with zipfile.ZipFile(output) as archive:
+            done.update(archive.namelist())
+
+    tasks, missing = plan_reports(client_ids, modules, advisor_name)
+    summary = {"generated": [], "skipped": [], "failed": [], "errors": {}, "missing": missing}
+    total = len(tasks)
+    count = 0
+
+    def _report(filename: str, status: str):
+        nonlocal count
+        count += 1
+        summary[status].append(filename)
+        if progress:
+            progress(count, total, filename, status)
+
+    pending = []
+    for task in tasks:
+        if task["filename"] in done:
+            _report(task["filename"], "skipped")
+        else:
+            pending.append(task)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render, task): task for task in pending}
+            for future in as_completed(futures):
+                filename = futures[future]["filename"]
+                try:
+                    _write_atomic(target_dir / filename, future.result())
+                except Exception as e:
+                    summary["errors"][filename] = str(e)
+                    _report(filename, "failed")
+                else:
+                    _report(filename, "generated")
+
+    if as_zip and not summary["failed"]:
+        _pack_zip(output, target_dir)
+    return summary
+
+
+# ════════════════════════════════════════════════════════════
+# CLI
+# ════════════════════════════════════════════════════════════
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Génération de rapports PDF par lots")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--clients", nargs="+", metavar="ID", help="IDs des clients")
+    scope.add_argument("--advisor", metavar="USERNAME", help="Tous les clients d'un conseiller")
+    parser.add_argument("--statut", help="Filtre sur le statut des clients (avec --advisor)")
+    parser.add_argument("--modules", nargs="+", choices=MODULES, help="Modules à exporter (défaut : tous)")
+    parser.add_argument("--output", required=True, help="Dossier de sortie ou archive .zip")
+    parser.add_argument("--advisor-name", help="Nom du conseiller affiché sur les rapports")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (défaut : nombre de CPU)")
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.advisor:
+        client_ids = [c["id"] for c in get_clients(args.advisor, statut=args.statut)]
+    else:
+        client_ids = args.clients
+
+    def _print_progress(done: int, total: int, filename: str, status: str):
+        print(f"[{done}/{total}] {status:<9} {filename}", flush=True)
+
+    summary = generate_reports(
+        client_ids,
+        args.output,
+        modules=args.modules,
+        advisor_name=args.advisor_name,
+        workers=args.workers,
+        progress=_print_progress,
+    )
+    print(
+        f"{len(summary['generated'])} généré(s), {len(summary['skipped'])} déjà présent(s), "
+        f"{len(summary['failed'])} échec(s), {len(summary['missing'])} sans simulation"
+    )
+    for filename, error in summary["errors"].items():
+        print(f"  {filename} : {error}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Calculs budgétaires.
+Un budget est le dict des postes mensuels de la page Budget (les postes
+absents valent 0). Les mêmes calculs s'appliquent colonne par colonne à un
+DataFrame de budgets — une ligne par client — pour analyser tout le
+portefeuille en une passe.
+"""
+
+import numpy as np
+
+from .constants import CATEGORIES_BUDGET, PILIER_3A_SALARIE
+
+REVENUS = ("salaire_net", "bonus_mensuel", "revenus_annexes")
+CHARGES_FIXES = (
+    "loyer", "assurance_maladie", "impots_mensuels", "transport",
+    "assurances_autres", "telecom", "prevoyance_3a", "charges_autres",
+)
+DEPENSES_VARIABLES = (
+    "alimentation", "restaurants", "loisirs", "habillement",
+    "sante", "cadeaux", "vacances", "depenses_autres",
+)
+POSTES = REVENUS + CHARGES_FIXES + DEPENSES_VARIABLES
+
+# Comparaison aux moyennes suisses : (clé, libellé, poste, catégorie de CATEGORIES_BUDGET).
+# L'épargne (poste None) est le solde positif.
+COMPARAISON = (
+    ("logement", "Logement", "loyer", "Logement"),
+    ("assurance_maladie", "Assurance maladie", "assurance_maladie", "Assurance maladie"),
+    ("alimentation", "Alimentation", "alimentation", "Alimentation"),
+    ("transport", "Transport", "transport", "Transport"),
+    ("impots", "Impôts", "impots_mensuels", "Impôts"),
+    ("loisirs", "Loisirs", "loisirs", "Loisirs & Culture"),
+    ("epargne", "Épargne", None, "Épargne & Prévoyance"),
+)
+
+SEUIL_LOGEMENT_PCT = 33
+SEUIL_EPARGNE_FAIBLE_PCT = 10
+SEUIL_EPARGNE_EXCELLENTE_PCT = 20
+VERSEMENT_3A_MENSUEL_MAX = round(PILIER_3A_SALARIE / 12)
+
+
+def _pct(montant, revenu):
+    """Part du revenu en %, arrondie à 0.1 (0 si pas de revenu)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(revenu > 0, np.round(montant / np.where(revenu > 0, revenu, 1) * 100, 1), 0.0)
+
+
+def _metriques(postes) -> dict:
+    """
+    Calcule toutes les métriques à partir d'un accès par poste
+    (dict de scalaires ou DataFrame) ; les valeurs sont des tableaux NumPy.
+    """
+    col = {p: np.asarray(postes[p], dtype=float) for p in POSTES}
+
+    revenu_total = sum(col[p] for p in REVENUS)
+    total_charges_fixes = sum(col[p] for p in CHARGES_FIXES)
+    total_variables = sum(col[p] for p in DEPENSES_VARIABLES)
+    total_depenses = total_charges_fixes + total_variables
+    solde = revenu_total - total_depenses
+    epargne = np.maximum(solde, 0)
+
+    metriques = {
+        "revenu_total": revenu_total,
+        "total_charges_fixes": total_charges_fixes,
+        "total_variables": total_variables,
+        "total_depenses": total_depenses,
+        "solde": solde,
+        "taux_epargne": _pct(solde, revenu_total),
+    }
+    for cle, _, poste, _ in COMPARAISON:
+        metriques[f"pct_{cle}"] = _pct(col[poste] if poste else epargne, revenu_total)
+
+    a_revenu = revenu_total > 0
+    metriques["alerte_logement"] = a_revenu & (col["loyer"] / np.where(a_revenu, revenu_total, 1) * 100 > SEUIL_LOGEMENT_PCT)
+    metriques["alerte_epargne"] = a_revenu & (metriques["taux_epargne"] < SEUIL_EPARGNE_FAIBLE_PCT)
+    metriques["epargne_excellente"] = a_revenu & (metriques["taux_epargne"] >= SEUIL_EPARGNE_EXCELLENTE_PCT)
+    metriques["alerte_3a"] = a_revenu & (col["prevoyance_3a"] < VERSEMENT_3A_MENSUEL_MAX)
+    return metriques
+
+
+def analyse_budget(budget: dict) -> dict:
+    """
+    Analyse d'un budget mensuel.
+
+    Args:
+        budget: {poste: montant mensuel CHF} (postes de POSTES, absents = 0)
+
+    Returns:
+        Dict des totaux, du solde, du taux d'épargne, de la comparaison
+        aux moyennes suisses et des alertes
+    """
+    postes = {p: budget.get(p) or 0 for p in POSTES}
+    m = _metriques(postes)
+
+    def _montant(v):
+        v = float(v)
+        return int(v) if v.is_integer() else round(v, 2)
+
+    return {
+        "revenu_total": _montant(m["revenu_total"]),
+        "total_charges_fixes": _montant(m["total_charges_fixes"]),
+        "total_variables": _montant(m["total_variables"]),
+        "total_depenses": _montant(m["total_depenses"]),
+        "solde": _montant(m["solde"]),
+        "taux_epargne": float(m["taux_epargne"]),
+        "comparaison": {
+            label: {
+                "client_pct": float(m[f"pct_{cle}"]),
+                "moyenne_pct": round(CATEGORIES_BUDGET[categorie]["moyenne_pct"] * 100, 1),
+            }
+            for cle, label, _, categorie in COMPARAISON
+        },
+        "alertes": {
+            "logement": bool(m["alerte_logement"]),
+            "epargne_faible": bool(m["alerte_epargne"]),
+            "epargne_excellente": bool(m["epargne_excellente"]),
+            "pilier_3a": bool(m["alerte_3a"]),
+        },
+    }
+
+
+def analyse_budgets(budgets):
+    """
+    Analyse vectorisée d'un portefeuille de budgets.
+
+    Args:
+        budgets: DataFrame, une ligne par budget, colonnes de POSTES
+                 (colonnes absentes ou valeurs manquantes = 0)
+
+    Returns:
+        Copie du DataFrame complétée des colonnes revenu_total, total_charges_fixes,
+        total_variables, total_depenses, solde, taux_epargne, pct_<clé de COMPARAISON>,
+        alerte_logement, alerte_epargne, epargne_excellente, alerte_3a et nb_alertes
+    """
+    postes = budgets.reindex(columns=list(POSTES)).fillna(0)
+    m = _metriques(postes)
+    m["nb_alertes"] = (
+        m["alerte_logement"].astype(int) + m["alerte_epargne"].astype(int) + m["alerte_3a"].astype(int)
+    )
+    return budgets.assign(**m)
@@ -0,0 +1,231 @@
+"""
+Imposition des retraits en capital (LPP, 3a) et échelonnement optimal.
+Les prestations en capital sont imposées à part du revenu, à taux réduit,
+mais les retraits d'une même année s'additionnent : répartir les comptes
+sur plusieurs années réduit la progressivité.
+
+L'optimiseur calcule d'abord, en un appel vectorisé, l'impôt de chaque
+combinaison (sous-ensemble de comptes × année), puis cherche le calendrier
+par programmation dynamique sur les sous-ensembles déjà retirés.
+
+Tous les calendriers portent sur le même capital : chaque compte compte
+pour son solde projeté à l'âge maximal, quel que soit l'âge du retrait (un
+capital retiré plus tôt est supposé réinvesti au même rendement). Sinon un
+retrait anticipé, plus petit, paraîtrait moins imposé du seul fait de la
+croissance abandonnée. L'impôt d'un retrait anticipé est ainsi majoré :
+l'économie affichée est une estimation prudente.
+"""
+
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+from .constants import AGE_RETRAITE_HOMMES
+from .parameter_packs import charger_pack, resoudre_annee
+from .swiss_tax import appliquer_baremes, calcul_impot_federal_vectorise, compiler_baremes
+
+MAX_COMPTES = 10  # 3^10 transitions par année
+
+
+@lru_cache(maxsize=None)
+def _tables(annee: int) -> tuple:
+    return compiler_baremes(charger_pack(annee)["retrait_capital"]["baremes"])
+
+
+def impot_retrait_capital_vectorise(
+    montants,
+    canton: str,
+    marie: bool = False,
+    annee: int | None = None,
+) -> dict:
+    """
+    Impôt sur des retraits en capital (montant total retiré dans l'année).
+    Retourne {"federal", "cantonal", "total"} (tableaux de la forme de `montants`).
+    """
+    annee = resoudre_annee(annee)
+    fraction_ifd = charger_pack(annee)["retrait_capital"]["fraction_ifd"]
+    montants = np.asarray(montants, dtype=float)
+    federal = np.round(calcul_impot_federal_vectorise(montants, marie, annee) * fraction_ifd, 2)
+    _, index, basses, largeurs, taux = _tables(annee)
+    if canton in index:
+        i = [index[canton]]
+        cantonal = appliquer_baremes(montants[None], basses[i], largeurs[i], taux[i])[0]
+    else:
+        cantonal = np.zeros_like(montants)
+    return {"federal": federal, "cantonal": cantonal, "total": np.round(federal + cantonal, 2)}
+
+
+def impot_retrait_capital(montant: float, canton: str, marie: bool = False, annee: int | None = None) -> dict:
+    """Impôt sur un retrait en capital unique."""
+    impots = impot_retrait_capital_vectorise(montant, canton, marie, annee)
+    total = float(impots["total"])
+    return {
+        "impot_federal": float(impots["federal"]),
+        "impot_cantonal": float(impots["cantonal"]),
+        "impot_total": total,
+        "taux_effectif": round(total / montant * 100, 2) if montant > 0 else 0,
+    }
+
+
+def comptes_standards(
+    capital_lpp: float,
+    capital_3a: float,
+    nb_comptes_3a: int = 1,
+    age_retraite: int = AGE_RETRAITE_HOMMES,
+    annee: int | None = None,
+) -> list[dict]:
+    """
+    Comptes d'un assuré type : LPP retiré à la retraite, 3a réparti sur
+    `nb_comptes_3a` comptes retirables quelques années avant la retraite
+    (5 ans selon le pack 2025). Les capitaux sont les soldes projetés à
+    l'âge de la retraite.
+    """
+    anticipation = charger_pack(annee)["retrait_capital"]["anticipation_3a_ans"]
+    comptes = []
+    if capital_lpp > 0:
+        comptes.append({"nom": "LPP", "capital": capital_lpp, "age_min": age_retraite, "age_max": age_retraite})
+    if capital_3a > 0 and nb_comptes_3a > 0:
+        for i in range(nb_comptes_3a):
+            comptes.append({
+                "nom": f"3a n°{i + 1}" if nb_comptes_3a > 1 else "3a",
+                "capital": capital_3a / nb_comptes_3a,
+                "age_min": age_retraite - anticipation,
+                "age_max": age_retraite,
+            })
+    return comptes
+
+
+@lru_cache(maxsize=None)
+def _transitions(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Toutes les paires (déjà retirés, retirés cette année) de sous-ensembles
+    disjoints de n comptes, en masques de bits : chaque compte est dans
+    l'un des trois états (pas encore, déjà, cette année).
+    """
+    etats = np.array(list(product(range(3), repeat=n)), dtype=np.int64).reshape(-1, n)
+    bits = 1 << np.arange(n, dtype=np.int64)
+    avant = ((etats == 1) * bits).sum(axis=1)
+    maintenant = ((etats == 2) * bits).sum(axis=1)
+    for table in (avant, maintenant):
+        table.flags.writeable = False
+    return avant, maintenant
+
+
+def _calendrier_reference(comptes: list[dict]) -> dict[int, list[int]]:
+    """Chaque compte retiré à son âge maximal (tout à la retraite)."""
+    calendrier = {}
+    for j, c in enumerate(comptes):
+        calendrier.setdefault(c["age_max"], []).append(j)
+    return calendrier
+
+
+def optimiser_retraits(
+    comptes: list[dict],
+    canton: str,
+    marie: bool = False,
+    taux_actualisation: float = 0.0,
+    annee: int | None = None,
+) -> dict:
+    """
+    Calendrier de retraits minimisant l'impôt total.
+
+    Args:
+        comptes: [{"nom", "capital", "age_min", "age_max"}] — `capital` est
+                 le solde projeté à `age_max`, retenu à tout âge de retrait
+        canton: Canton de domicile au moment des retraits
+        marie: Retraits d'un couple (imposés ensemble, barème marié)
+        taux_actualisation: Les impôts des années suivantes sont actualisés
+                            à ce taux (0 = somme nominale)
+        annee: Année fiscale des barèmes (pack fiscal)
+
+    Returns:
+        Dict {"plan": [{"age", "comptes", "montant", "impot"}], "montant_total",
+        "impot_total", "reference": {...même forme, tout à l'âge maximal},
+        "economie"} — economie vaut None si les deux calendriers ne portent
+        pas sur le même montant total
+    """
+    n = len(comptes)
+    if n == 0:
+        vide = {"plan": [], "montant_total": 0.0, "impot_total": 0.0}
+        return {**vide, "reference": dict(vide), "economie": 0.0}
+    if n > MAX_COMPTES:
+        raise ValueError(f"Au plus {MAX_COMPTES} comptes (reçu {n})")
+    for c in comptes:
+        if c["age_min"] > c["age_max"]:
+            raise ValueError(f"{c['nom']} : âge minimal supérieur à l'âge maximal")
+
+    age_debut = min(c["age_min"] for c in comptes)
+    ages = np.arange(age_debut, max(c["age_max"] for c in comptes) + 1)
+
+    # Capital de chaque compte, en valeur à l'âge maximal, à chaque âge (0 hors fenêtre)
+    capital = np.array([c["capital"] for c in comptes], dtype=float)[:, None]
+    age_min = np.array([c["age_min"] for c in comptes])[:, None]
+    age_max = np.array([c["age_max"] for c in comptes])[:, None]
+    eligible = (ages >= age_min) & (ages <= age_max)                                 # (n, Y)
+    soldes = np.where(eligible, capital, 0.0)
+
+    # Table d'impôt de chaque sous-ensemble à chaque âge, en un appel
+    masques = np.arange(1 << n, dtype=np.int64)
+    membres = ((masques[:, None] >> np.arange(n)) & 1).astype(float)                  # (M, n)
+    montants = membres @ soldes                                                      # (M, Y)
+    possible = (membres @ (~eligible).astype(float)) == 0                            # (M, Y)
+    impots = impot_retrait_capital_vectorise(montants, canton, marie, annee)["total"]
+    couts = np.where(possible, impots / (1 + taux_actualisation) ** (ages - age_debut), np.inf)
+
+    # Programmation dynamique sur l'ensemble des comptes déjà retirés
+    avant, maintenant = _transitions(n)
+    apres = avant | maintenant
+    bits = 1 << np.arange(n, dtype=np.int64)
+    cout = np.full(1 << n, np.inf)
+    cout[0] = 0.0
+    historique = []
+    for y, age in enumerate(ages):
+        candidats = cout[avant] + couts[maintenant, y]
+        nouveau = np.full(1 << n, np.inf)
+        np.minimum.at(nouveau, apres, candidats)
+        # Les comptes arrivés à leur âge maximal doivent être retirés
+        dus = int(bits[age_max[:, 0] == age].sum())
+        nouveau[(masques & dus) != dus] = np.inf
+        historique.append((candidats, nouveau))
+        cout = nouveau
+
+    complet = (1 << n) - 1
+    if not np.isfinite(cout[complet]):
+        raise ValueError("Aucun calendrier ne respecte les fenêtres de retrait")
+
+    # Reconstitution du calendrier
+    plan, masque = [], complet
+    for y in range(len(ages) - 1, -1, -1):
+        candidats, nouveau = historique[y]
+        k = np.flatnonzero((apres == masque) & (candidats == nouveau[masque]))[0]
+        if maintenant[k]:
+            plan.append((int(ages[y]), [j for j in range(n) if maintenant[k] >> j & 1]))
+        masque = int(avant[k])
+    plan.reverse()
+
+    def _resume(calendrier) -> dict:
+        lignes = []
+        for age, indices in calendrier:
+            y = int(age - age_debut)
+            m = int(sum(1 << j for j in indices))
+            lignes.append({
+                "age": int(age),
+                "comptes": [comptes[j]["nom"] for j in indices],
+                "montant": round(float(montants[m, y]), 2),
+                "impot": round(float(impots[m, y]), 2),
+            })
+        return {
+            "plan": lignes,
+            "montant_total": round(sum(l["montant"] for l in lignes), 2),
+            "impot_total": round(sum(l["impot"] for l in lignes), 2),
+        }
+
+    optimal = _resume(plan)
+    reference = _resume(sorted(_calendrier_reference(comptes).items()))
+    comparable = abs(optimal["montant_total"] - reference["montant_total"]) < 0.01
+    return {
+        **optimal,
+        "reference": reference,
+        "economie": round(reference["impot_total"] - optimal["impot_total"], 2) if comparable else None,
+    }
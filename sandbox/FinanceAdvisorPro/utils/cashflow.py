@@ -0,0 +1,197 @@
+"""
+Projection des flux financiers du ménage, année par année.
+Relie salaire, cotisations AVS/LPP, impôts (swiss_tax), 3ème pilier, dépenses
+du budget et placement de l'excédent jusqu'à et après la retraite.
+
+Les hypothèses de marché (croissance des salaires, rendement des placements,
+inflation) acceptent une valeur ou une liste : chaque position est un
+scénario, et tous les scénarios avancent ensemble sur un axe NumPy. Les
+projections sont mémoïsées : un rerun de page avec les mêmes paramètres ne
+recalcule rien. Avec `annee`, chaque année de projection prend son pack
+fiscal (le plus récent disponible pour les années futures).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .constants import AGE_RETRAITE_HOMMES, PILIER_3A_SALARIE, TAUX_INTERET_3A_MOYEN
+from .parameter_packs import charger_pack, resoudre_annee
+from .pillar_calc import estimation_rente_avs
+from .swiss_tax import calcul_impot_fortune_vectorise, calcul_impot_revenu_vectorise, calcul_impot_total_vectorise
+
+HORIZON_ANNEES = 40
+TAUX_COTISATIONS_SOCIALES = 0.0535  # AVS/AI/APG/AC, part employé
+
+# Hypothèses par défaut de la vue « plan de vie » : croissance des salaires, rendement, inflation
+SCENARIOS_CASHFLOW = {
+    "Prudent": {"croissance_salaire": 0.005, "rendement_placements": 0.02, "inflation": 0.015},
+    "Central": {"croissance_salaire": 0.01, "rendement_placements": 0.04, "inflation": 0.01},
+    "Favorable": {"croissance_salaire": 0.015, "rendement_placements": 0.06, "inflation": 0.01},
+}
+
+_SERIES = (
+    "revenu_brut", "cotisations", "impots", "versement_3a", "depenses",
+    "surplus", "capital_lpp", "capital_3a", "patrimoine", "patrimoine_total",
+)
+
+
+def _taux_lpp_employe(age: int, taux_par_age: dict) -> float:
+    for (age_min, age_max), taux in taux_par_age.items():
+        if age_min <= age <= age_max:
+            return taux
+    return 0.0
+
+
+def _hypotheses(*valeurs) -> tuple[tuple[float, ...], ...]:
+    """Aligne les hypothèses (valeurs ou listes) sur un même nombre de scénarios."""
+    tableaux = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in valeurs))
+    return tuple(tuple(float(x) for x in t) for t in tableaux)
+
+
+def projection_cashflow(
+    salaire_annuel: float,
+    age_actuel: int,
+    depenses_annuelles: float,
+    canton: str,
+    commune: str | None = None,
+    marie: bool = False,
+    enfants: int = 0,
+    capital_lpp: float = 0,
+    capital_3a: float = 0,
+    epargne_initiale: float = 0,
+    versement_3a_annuel: float = PILIER_3A_SALARIE,
+    taux_rendement_3a: float = TAUX_INTERET_3A_MOYEN,
+    croissance_salaire=0.01,
+    rendement_placements=0.04,
+    inflation=0.01,
+    age_retraite: int = AGE_RETRAITE_HOMMES,
+    annees: int = HORIZON_ANNEES,
+    annee: int | None = None,
+) -> dict:
+    """
+    Projette les flux annuels du ménage sur `annees` ans.
+
+    Pendant la vie active : salaire brut indexé, cotisations sociales et LPP
+    (part employé), impôts sur le revenu de l'année et sur le patrimoine placé
+    (LPP et 3a exonérés), versement 3a, dépenses indexées sur l'inflation ;
+    l'excédent est placé au rendement donné. À la retraite, le capital LPP est converti en rente, le capital 3a
+    rejoint le patrimoine (impôt sur le retrait non déduit) et la rente AVS
+    est estimée sur le dernier salaire.
+
+    Args:
+        depenses_annuelles: Dépenses du ménage hors impôts et 3ème pilier (CHF/an)
+        croissance_salaire, rendement_placements, inflation: Valeur ou liste
+            (une entrée par scénario)
+        annee: Année civile de la première année projetée (None = pack
+            fiscal le plus récent pour toutes les années)
+
+    Returns:
+        Dict {"ages": [...], "scenarios": S, <série>: tableau (S, annees), ...}
+        pour les séries revenu_brut, cotisations, impots, versement_3a,
+        depenses, surplus (négatif = prélèvement sur le patrimoine),
+        capital_lpp, capital_3a, patrimoine et patrimoine_total ; plus
+        "patrimoine_retraite" (S,) et "age_epuisement" (premier âge où le
+        patrimoine devient négatif, None sinon). Les tableaux sont partagés
+        par le cache et en lecture seule.
+    """
+    hypotheses = _hypotheses(croissance_salaire, rendement_placements, inflation)
+    return _projection(
+        float(salaire_annuel), int(age_actuel), float(depenses_annuelles), canton, commune,
+        bool(marie), int(enfants), float(capital_lpp), float(capital_3a), float(epargne_initiale),
+        float(versement_3a_annuel), float(taux_rendement_3a), *hypotheses,
+        int(age_retraite), int(annees), None if annee is None else int(annee),
+    )
+
+
+@lru_cache(maxsize=256)
+def _projection(
+    salaire_annuel, age_actuel, depenses_annuelles, canton, commune, marie, enfants,
+    capital_lpp, capital_3a, epargne_initiale, versement_3a_annuel, taux_rendement_3a,
+    croissance_salaire, rendement_placements, inflation, age_retraite, annees, annee,
+) -> dict:
+    croissance = np.array(croissance_salaire)
+    rendement = np.array(rendement_placements)
+    inflation = np.array(inflation)
+    n_scenarios = len(croissance)
+
+    series = {nom: np.zeros((n_scenarios, annees)) for nom in _SERIES}
+    lpp = np.full(n_scenarios, capital_lpp)
+    pilier_3a = np.full(n_scenarios, capital_3a)
+    patrimoine = np.full(n_scenarios, epargne_initiale)
+    salaire = np.full(n_scenarios, salaire_annuel)
+    rente = None
+
+    for t in range(annees):
+        age = age_actuel + t
+        pack_annee = resoudre_annee(None if annee is None else annee + t)
+        pack = charger_pack(pack_annee)
+        if age < age_retraite:
+            lpp_params = pack["lpp"]
+            versement_3a = min(versement_3a_annuel, pack["pilier_3a"]["salarie"])
+            if t > 0:
+                salaire = salaire * (1 + croissance)
+            coordonne = np.where(
+                salaire >= lpp_params["seuil_entree"],
+                np.maximum(np.minimum(salaire, lpp_params["salaire_max"]) - lpp_params["deduction_coordination"], 0),
+                0.0,
+            )
+            cotisation_lpp = coordonne * _taux_lpp_employe(age, lpp_params["taux_par_age"])
+            lpp = lpp * (1 + lpp_params["taux_interet_minimal"]) + 2 * cotisation_lpp  # employé + employeur
+            pilier_3a = pilier_3a * (1 + taux_rendement_3a) + versement_3a
+
+            revenu = salaire
+            cotisations = salaire * TAUX_COTISATIONS_SOCIALES + cotisation_lpp
+            impots = calcul_impot_total_vectorise(
+                salaire, canton, commune, marie, enfants, deduction_3a=versement_3a,
+                fortune=np.maximum(patrimoine, 0), annee=pack_annee,
+            )["impot_total"]
+            verse_3a = versement_3a
+        else:
+            if rente is None:
+                # Passage à la retraite : conversion LPP, retrait du 3a
+                rente_avs = np.array([
+                    estimation_rente_avs(s, min(age_retraite - 20, 44), pack_annee)["rente_annuelle"] for s in salaire
+                ])
+                rente = rente_avs + lpp * pack["lpp"]["taux_conversion"]
+                patrimoine = patrimoine + pilier_3a
+                lpp = np.zeros(n_scenarios)
+                pilier_3a = np.zeros(n_scenarios)
+            revenu = rente
+            cotisations = np.zeros(n_scenarios)
+            impots = (
+                calcul_impot_revenu_vectorise(rente, canton, commune, marie, pack_annee)["total"]
+                + calcul_impot_fortune_vectorise(np.maximum(patrimoine, 0), canton, marie, annee=pack_annee)[1]
+            )
+            verse_3a = 0.0
+
+        depenses = depenses_annuelles * (1 + inflation) ** t
+        surplus = revenu - cotisations - impots - verse_3a - depenses
+        patrimoine = patrimoine * (1 + rendement) + surplus
+
+        series["revenu_brut"][:, t] = revenu
+        series["cotisations"][:, t] = cotisations
+        series["impots"][:, t] = impots
+        series["versement_3a"][:, t] = verse_3a
+        series["depenses"][:, t] = depenses
+        series["surplus"][:, t] = surplus
+        series["capital_lpp"][:, t] = lpp
+        series["capital_3a"][:, t] = pilier_3a
+        series["patrimoine"][:, t] = patrimoine
+
+    series["patrimoine_total"] = series["patrimoine"] + series["capital_lpp"] + series["capital_3a"]
+
+    ages = [age_actuel + t for t in range(annees)]
+    idx_retraite = min(max(age_retraite - age_actuel - 1, 0), annees - 1)
+    negatif = series["patrimoine"] < 0
+    result = {
+        "ages": ages,
+        "scenarios": n_scenarios,
+        **series,
+        "patrimoine_retraite": series["patrimoine_total"][:, idx_retraite],
+        "age_epuisement": [ages[int(row.argmax())] if row.any() else None for row in negatif],
+    }
+    for valeur in result.values():
+        if isinstance(valeur, np.ndarray):
+            valeur.flags.writeable = False
+    return result
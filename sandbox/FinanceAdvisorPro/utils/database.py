@@ -1,26 +1,54 @@
 """
-Couche de base de données SQLite pour Finance Advisor Pro.
+Couche de base de données pour Finance Advisor Pro.
 Gère les clients, simulations et paramètres du conseiller.
+Le stockage est délégué à un backend (SQLite par défaut, PostgreSQL via
+FAP_DATABASE_URL) — voir utils.db_backends.
 """
 
-import sqlite3
+import hashlib
 import json
+import threading
 import uuid
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from contextlib import contextmanager
 
+from .payload_codec import DEFAULT_CODEC, encode_payload, decode_payload, content_hash
+from .db_backends import get_backend
+from .migrations import run_migrations
+
 DB_PATH = Path(__file__).parent.parent / "data" / "finance_advisor.db"
 
+# Colonnes modifiables (les noms de colonnes ne viennent jamais de l'appelant)
+_CLIENT_COLUMNS = frozenset({
+    "nom", "prenom", "email", "telephone", "date_naissance", "age",
+    "situation_familiale", "enfants", "canton", "commune", "salaire_annuel",
+    "capital_lpp", "capital_3a", "statut", "tags", "notes", "updated_at",
+})
+_SETTINGS_COLUMNS = frozenset({
+    "logo_path", "primary_color", "secondary_color", "cabinet_name",
+    "cabinet_address", "cabinet_phone", "cabinet_email", "cabinet_website",
+    "updated_at",
+})
+
+PAYLOAD_PURGE_GRACE = 600  # secondes pendant lesquelles un payload orphelin est gardé
+
+_schema_ready_for = None
+_schema_lock = threading.Lock()
+
+
+def _check_columns(fields, allowed: frozenset, table: str):
+    """Refuse toute colonne hors liste blanche avant de construire le SQL."""
+    unknown = set(fields) - allowed
+    if unknown:
+        raise ValueError(f"Colonnes inconnues pour {table} : {', '.join(sorted(unknown))}")
+
 
 @contextmanager
 def get_db():
-    """Context manager pour les connexions SQLite."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    """Context manager pour les connexions du backend actif."""
+    backend = get_backend(DB_PATH)
+    conn = backend.connect()
     try:
         yield conn
         conn.commit()
@@ -28,75 +56,25 @@ def get_db():
         conn.rollback()
         raise
     finally:
-        conn.close()
+        backend.release(conn)
 
 
 def init_db():
-    """Initialise les tables de la base de données."""
-    with get_db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS clients (
-                id TEXT PRIMARY KEY,
-                advisor_id TEXT NOT NULL,
-                nom TEXT NOT NULL,
-                prenom TEXT NOT NULL,
-                email TEXT DEFAULT '',
-                telephone TEXT DEFAULT '',
-                date_naissance TEXT DEFAULT '',
-                age INTEGER DEFAULT 30,
-                situation_familiale TEXT DEFAULT 'Célibataire',
-                enfants INTEGER DEFAULT 0,
-                canton TEXT DEFAULT 'Vaud (VD)',
-                commune TEXT DEFAULT '',
-                salaire_annuel REAL DEFAULT 0,
-                capital_lpp REAL DEFAULT 0,
-                capital_3a REAL DEFAULT 0,
-                statut TEXT DEFAULT 'prospect',
-                tags TEXT DEFAULT '[]',
-                notes TEXT DEFAULT '',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS simulations (
-                id TEXT PRIMARY KEY,
-                client_id TEXT NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
-                advisor_id TEXT NOT NULL,
-                module TEXT NOT NULL,
-                nom TEXT NOT NULL,
-                parametres TEXT DEFAULT '{}',
-                resultats TEXT DEFAULT '{}',
-                created_at TEXT NOT NULL,
-                version INTEGER DEFAULT 1
-            );
-
-            CREATE TABLE IF NOT EXISTS advisor_settings (
-                advisor_id TEXT PRIMARY KEY,
-                logo_path TEXT DEFAULT '',
-                primary_color TEXT DEFAULT '#6C63FF',
-                secondary_color TEXT DEFAULT '#00D4AA',
-                cabinet_name TEXT DEFAULT '',
-                cabinet_address TEXT DEFAULT '',
-                cabinet_phone TEXT DEFAULT '',
-                cabinet_email TEXT DEFAULT '',
-                cabinet_website TEXT DEFAULT '',
-                updated_at TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS email_logs (
-                id TEXT PRIMARY KEY,
-                client_id TEXT REFERENCES clients(id),
-                advisor_id TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                sent_at TEXT NOT NULL,
-                status TEXT DEFAULT 'sent'
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_clients_advisor ON clients(advisor_id);
-            CREATE INDEX IF NOT EXISTS idx_clients_statut ON clients(statut);
-            CREATE INDEX IF NOT EXISTS idx_simulations_client ON simulations(client_id);
-            CREATE INDEX IF NOT EXISTS idx_simulations_module ON simulations(module);
-        """)
+    """
+    Vérifie que le schéma est à jour.
+    Les migrations ne tournent qu'une fois par processus et par backend ;
+    les appels suivants (à chaque rerun de page) ne font qu'un test en mémoire.
+    """
+    global _schema_ready_for
+    backend = get_backend(DB_PATH)
+    if _schema_ready_for is backend:
+        return
+    with _schema_lock:
+        if _schema_ready_for is backend:
+            return
+        with get_db() as conn:
+            run_migrations(conn, backend)
+        _schema_ready_for = backend
 
 
 # ════════════════════════════════════════════════════════════
@@ -186,6 +164,7 @@ def update_client(client_id: str, **kwargs) -> bool:
         kwargs["tags"] = json.dumps(kwargs["tags"])
 
     kwargs["updated_at"] = datetime.now().isoformat()
+    _check_columns(kwargs, _CLIENT_COLUMNS, "clients")
 
     set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
     values = list(kwargs.values()) + [client_id]
@@ -202,6 +181,7 @@ def delete_client(client_id: str) -> bool:
     """Supprime un client et toutes ses simulations."""
     with get_db() as conn:
         result = conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+        _purge_orphan_payloads(conn)
         return result.rowcount > 0
 
 
@@ -234,55 +214,147 @@ def save_simulation(
     parametres: dict,
     resultats: dict,
 ) -> str:
-    """Sauvegarde une simulation. Retourne l'ID."""
+    """
+    Sauvegarde une simulation. Retourne l'ID.
+    Les résultats sont stockés une seule fois dans `simulation_payloads`,
+    indexés par empreinte de contenu, et référencés par chaque version.
+    """
+    with get_db() as conn:
+        return _insert_simulation(conn, client_id, advisor_id, module, nom, parametres, resultats)
+
+
+def save_simulations(simulations: list[dict]) -> list[str]:
+    """
+    Sauvegarde un lot de simulations dans une seule transaction.
+    Chaque élément contient les arguments de `save_simulation`. Retourne les IDs.
+    """
+    with get_db() as conn:
+        return [_insert_simulation(conn, **sim) for sim in simulations]
+
+
+def _insert_simulation(
+    conn,
+    client_id: str,
+    advisor_id: str,
+    module: str,
+    nom: str,
+    parametres: dict,
+    resultats: dict,
+) -> str:
+    """Insère une version de simulation sur une connexion ouverte."""
     sim_id = str(uuid.uuid4())[:8]
     now = datetime.now().isoformat()
+    params_hash = content_hash(parametres)
 
     # Calculer la version (incrémentale par client+module)
-    with get_db() as conn:
-        max_version = conn.execute(
-            "SELECT COALESCE(MAX(version), 0) FROM simulations WHERE client_id = ? AND module = ?",
-            (client_id, module),
-        ).fetchone()[0]
+    max_version = conn.execute(
+        "SELECT COALESCE(MAX(version), 0) FROM simulations WHERE client_id = ? AND module = ?",
+        (client_id, module),
+    ).fetchone()[0]
+
+    # Payload adressé par son contenu : des résultats identiques ne sont stockés qu'une fois.
+    # Un payload déjà connu est « touché » dans la même transaction : la ligne est
+    # verrouillée et rajeunie, la purge d'une autre connexion ne peut plus la supprimer
+    payload_hash = content_hash(resultats)
+    conn.execute(
+        """INSERT INTO simulation_payloads (hash, codec, data, created_at) VALUES (?, ?, ?, ?)
+           ON CONFLICT (hash) DO UPDATE SET created_at = excluded.created_at""",
+        (payload_hash, DEFAULT_CODEC, encode_payload(resultats), now),
+    )
+
+    conn.execute(
+        """INSERT INTO simulations (id, client_id, advisor_id, module, nom, parametres, resultats,
+                                    created_at, version, codec, params_hash, payload_hash)
+           VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)""",
+        (
+            sim_id, client_id, advisor_id, module, nom,
+            encode_payload(parametres),
+            now, max_version + 1, DEFAULT_CODEC, params_hash, payload_hash,
+        ),
+    )
+    return sim_id
 
-        conn.execute(
-            """INSERT INTO simulations (id, client_id, advisor_id, module, nom, parametres, resultats, created_at, version)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (sim_id, client_id, advisor_id, module, nom, json.dumps(parametres), json.dumps(resultats), now, max_version + 1),
-        )
 
-    return sim_id
+_SIMULATION_SELECT = """SELECT s.*, p.codec AS payload_codec, p.data AS payload_data
+               FROM simulations s
+               LEFT JOIN simulation_payloads p ON p.hash = s.payload_hash
+               WHERE s.client_id = ?"""
+
+
+def _decode_simulation(row) -> dict:
+    """Décode les paramètres et résultats d'une ligne de simulation."""
+    sim = dict(row)
+    # codec NULL/0 = ligne historique en JSON texte
+    codec = sim.pop("codec", None)
+    payload_codec = sim.pop("payload_codec", None)
+    payload_data = sim.pop("payload_data", None)
+    sim["parametres"] = decode_payload(sim.get("parametres"), codec)
+    if payload_data is not None:
+        sim["resultats"] = decode_payload(payload_data, payload_codec)
+    else:
+        sim["resultats"] = decode_payload(sim.get("resultats"), codec)
+    return sim
 
 
 def get_simulations(client_id: str, module: str | None = None) -> list[dict]:
     """Récupère les simulations d'un client."""
-    query = "SELECT * FROM simulations WHERE client_id = ?"
+    query = _SIMULATION_SELECT
     params = [client_id]
 
     if module:
-        query += " AND module = ?"
+        query += " AND s.module = ?"
         params.append(module)
 
-    query += " ORDER BY created_at DESC"
+    query += " ORDER BY s.created_at DESC"
 
     with get_db() as conn:
         rows = conn.execute(query, params).fetchall()
-        simulations = []
-        for row in rows:
-            sim = dict(row)
-            sim["parametres"] = json.loads(sim.get("parametres", "{}"))
-            sim["resultats"] = json.loads(sim.get("resultats", "{}"))
-            simulations.append(sim)
-        return simulations
+        return [_decode_simulation(row) for row in rows]
+
+
+def get_latest_simulation(client_id: str, module: str) -> dict | None:
+    """Récupère la dernière version d'une simulation d'un client pour un module."""
+    query = _SIMULATION_SELECT + " AND s.module = ? ORDER BY s.created_at DESC LIMIT 1"
+    with get_db() as conn:
+        row = conn.execute(query, (client_id, module)).fetchone()
+        return _decode_simulation(row) if row else None
+
+
+def find_simulation_by_params(client_id: str, module: str, parametres: dict) -> dict | None:
+    """
+    Dernière version d'une simulation du client pour ce module enregistrée
+    avec exactement ces paramètres (même empreinte), ou None.
+    """
+    query = _SIMULATION_SELECT + " AND s.module = ? AND s.params_hash = ? ORDER BY s.created_at DESC LIMIT 1"
+    with get_db() as conn:
+        row = conn.execute(query, (client_id, module, content_hash(parametres))).fetchone()
+        return _decode_simulation(row) if row else None
 
 
 def delete_simulation(sim_id: str) -> bool:
     """Supprime une simulation."""
     with get_db() as conn:
         result = conn.execute("DELETE FROM simulations WHERE id = ?", (sim_id,))
+        _purge_orphan_payloads(conn)
         return result.rowcount > 0
 
 
+def _purge_orphan_payloads(conn, grace: float = PAYLOAD_PURGE_GRACE):
+    """
+    Supprime les payloads qui ne sont plus référencés par aucune simulation.
+    Ceux écrits ou réutilisés depuis moins de `grace` secondes sont gardés :
+    une sauvegarde en cours d'une autre connexion peut y pointer sans être
+    encore visible.
+    """
+    cutoff = (datetime.now() - timedelta(seconds=grace)).isoformat()
+    conn.execute(
+        """DELETE FROM simulation_payloads
+           WHERE created_at < ?
+             AND NOT EXISTS (SELECT 1 FROM simulations s WHERE s.payload_hash = simulation_payloads.hash)""",
+        (cutoff,),
+    )
+
+
 # ════════════════════════════════════════════════════════════
 # ADVISOR SETTINGS (White-label)
 # ════════════════════════════════════════════════════════════
@@ -314,6 +386,7 @@ def save_advisor_settings(advisor_id: str, **kwargs) -> bool:
     """Sauvegarde les paramètres d'un conseiller (upsert)."""
     now = datetime.now().isoformat()
     kwargs["updated_at"] = now
+    _check_columns(kwargs, _SETTINGS_COLUMNS, "advisor_settings")
 
     with get_db() as conn:
         existing = conn.execute(
@@ -335,18 +408,273 @@ def save_advisor_settings(advisor_id: str, **kwargs) -> bool:
     return True
 
 
+# ════════════════════════════════════════════════════════════
+# UTILISATEURS (stockage des comptes en base, FAP_AUTH_BACKEND=db)
+# ════════════════════════════════════════════════════════════
+
+def get_user(username: str) -> dict | None:
+    """Récupère un compte conseiller par son identifiant."""
+    init_db()
+    with get_db() as conn:
+        row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return dict(row) if row else None
+
+
+def create_user(username: str, **kwargs) -> bool:
+    """Crée un compte conseiller. Retourne False si l'identifiant existe déjà."""
+    init_db()
+    with get_db() as conn:
+        result = conn.execute(
+            """INSERT INTO users (username, name, email, password, role, cabinet, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (username) DO NOTHING""",
+            (
+                username,
+                kwargs.get("name", username),
+                kwargs.get("email", ""),
+                kwargs["password"],
+                kwargs.get("role", "conseiller"),
+                kwargs.get("cabinet", ""),
+                kwargs.get("created_at") or datetime.now().isoformat(),
+            ),
+        )
+        return result.rowcount > 0
+
+
+def update_user_password(username: str, password_hash: str) -> bool:
+    """Remplace le hash du mot de passe d'un compte (rehash à la connexion)."""
+    init_db()
+    with get_db() as conn:
+        result = conn.execute(
+            "UPDATE users SET password = ? WHERE username = ?", (password_hash, username)
+        )
+        return result.rowcount > 0
+
+
+# ════════════════════════════════════════════════════════════
+# SESSIONS (tokens signés persistés, FAP_PERSIST_SESSIONS=1)
+# ════════════════════════════════════════════════════════════
+
+def save_session(session_id: str, username: str, user_json: str, expires_at: int):
+    """Enregistre une session signée."""
+    init_db()
+    with get_db() as conn:
+        # Purge opportuniste des sessions expirées
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (int(datetime.now().timestamp()),))
+        conn.execute(
+            "INSERT INTO sessions (id, username, user_json, expires_at) VALUES (?, ?, ?, ?)",
+            (session_id, username, user_json, expires_at),
+        )
+
+
+def get_session(session_id: str) -> dict | None:
+    """Récupère une session par son identifiant."""
+    init_db()
+    with get_db() as conn:
+        row = conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return dict(row) if row else None
+
+
+def delete_session(session_id: str) -> bool:
+    """Supprime une session (déconnexion)."""
+    init_db()
+    with get_db() as conn:
+        result = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return result.rowcount > 0
+
+
+def delete_user_sessions(username: str) -> int:
+    """Supprime toutes les sessions d'un utilisateur."""
+    init_db()
+    with get_db() as conn:
+        result = conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+        return result.rowcount
+
+
 # ════════════════════════════════════════════════════════════
 # EMAIL LOGS
 # ════════════════════════════════════════════════════════════
 
-def log_email(client_id: str, advisor_id: str, subject: str) -> str:
-    """Log un envoi d'email."""
+def log_email(client_id: str, advisor_id: str, subject: str, status: str = "sent") -> str:
+    """Log un envoi d'email (statut : queued, sending, sent, failed)."""
     log_id = str(uuid.uuid4())[:8]
     now = datetime.now().isoformat()
 
     with get_db() as conn:
         conn.execute(
-            "INSERT INTO email_logs (id, client_id, advisor_id, subject, sent_at) VALUES (?, ?, ?, ?, ?)",
-            (log_id, client_id, advisor_id, subject, now),
+            "INSERT INTO email_logs (id, client_id, advisor_id, subject, sent_at, status) VALUES (?, ?, ?, ?, ?, ?)",
+            (log_id, client_id, advisor_id, subject, now, status),
         )
     return log_id
+
+
+def update_email_status(log_id: str, status: str) -> bool:
+    """Met à jour le statut d'un email ; `sent_at` prend l'horodatage du changement."""
+    with get_db() as conn:
+        result = conn.execute(
+            "UPDATE email_logs SET status = ?, sent_at = ? WHERE id = ?",
+            (status, datetime.now().isoformat(), log_id),
+        )
+        return result.rowcount > 0
+
+
+# ════════════════════════════════════════════════════════════
+# EMAIL OUTBOX (envois persistés, repris après crash)
+# ════════════════════════════════════════════════════════════
+
+_OUTBOX_PENDING = "status = 'queued' AND next_attempt_at <= ?"
+_OUTBOX_STALE = "status = 'sending' AND locked_at < ?"
+
+
+def enqueue_emails(smtp_key: str, emails: list[dict]) -> list[str]:
+    """
+    Ajoute des emails à la file d'envoi, dans une seule transaction.
+    Chaque élément contient to_email, client_name, module_name, pdf_bytes,
+    subject et optionnellement advisor_name, client_id, advisor_id.
+    Les PDF identiques ne sont stockés qu'une fois. Retourne les IDs
+    (communs à `email_outbox` et `email_logs`).
+    """
+    init_db()
+    now = datetime.now().isoformat()
+    ids = []
+    with get_db() as conn:
+        for email in emails:
+            email_id = str(uuid.uuid4())[:8]
+            attachment_hash = hashlib.sha256(email["pdf_bytes"]).hexdigest()
+            conn.execute(
+                """INSERT INTO email_attachments (hash, data, created_at) VALUES (?, ?, ?)
+                   ON CONFLICT (hash) DO NOTHING""",
+                (attachment_hash, bytes(email["pdf_bytes"]), now),
+            )
+            conn.execute(
+                """INSERT INTO email_outbox (id, smtp_key, client_id, advisor_id, to_email, client_name,
+                       module_name, advisor_name, attachment_hash, status, next_attempt_at, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)""",
+                (email_id, smtp_key, email.get("client_id"), email.get("advisor_id", ""),
+                 email["to_email"], email["client_name"], email["module_name"],
+                 email.get("advisor_name", ""), attachment_hash, now, now),
+            )
+            conn.execute(
+                "INSERT INTO email_logs (id, client_id, advisor_id, subject, sent_at, status) VALUES (?, ?, ?, ?, ?, 'queued')",
+                (email_id, email.get("client_id"), email.get("advisor_id", ""), email["subject"], now),
+            )
+            ids.append(email_id)
+    return ids
+
+
+def claim_outbox_emails(smtp_key: str, limit: int, stale_after: float = 600) -> list[dict]:
+    """
+    Réserve jusqu'à `limit` emails à envoyer (queued → sending), y compris ceux
+    restés en `sending` plus de `stale_after` secondes (worker interrompu).
+    Chaque appel pose un jeton unique : deux workers ne réservent jamais la même ligne.
+    """
+    init_db()
+    now = datetime.now()
+    token = uuid.uuid4().hex
+    stale = (now - timedelta(seconds=stale_after)).isoformat()
+    now = now.isoformat()
+    with get_db() as conn:
+        conn.execute(
+            f"""UPDATE email_outbox SET status = 'sending', claim_token = ?, locked_at = ?
+                WHERE id IN (
+                    SELECT id FROM email_outbox
+                    WHERE smtp_key = ? AND (({_OUTBOX_PENDING}) OR ({_OUTBOX_STALE}))
+                    ORDER BY created_at LIMIT ?
+                )
+                AND (({_OUTBOX_PENDING}) OR ({_OUTBOX_STALE}))""",
+            (token, now, smtp_key, now, stale, limit, now, stale),
+        )
+        rows = conn.execute(
+            "SELECT * FROM email_outbox WHERE claim_token = ? ORDER BY created_at", (token,)
+        ).fetchall()
+        conn.execute(
+            "UPDATE email_logs SET status = 'sending', sent_at = ? WHERE id IN "
+            "(SELECT id FROM email_outbox WHERE claim_token = ?)",
+            (now, token),
+        )
+        return [dict(row) for row in rows]
+
+
+def get_email_attachment(attachment_hash: str) -> bytes | None:
+    """Récupère une pièce jointe stockée."""
+    with get_db() as conn:
+        row = conn.execute("SELECT data FROM email_attachments WHERE hash = ?", (attachment_hash,)).fetchone()
+        return bytes(row["data"]) if row else None
+
+
+def complete_outbox_email(
+    email_id: str,
+    claim_token: str,
+    status: str,
+    error: str = "",
+    retry_in: float | None = None,
+) -> bool:
+    """
+    Termine une tentative d'envoi : `sent`, `failed`, ou `queued` avec
+    `retry_in` secondes de délai avant le prochain essai.
+    Sans effet (False) si la réservation `claim_token` n'est plus la bonne :
+    l'email a été repris par un autre worker après expiration.
+    """
+    now = datetime.now()
+    next_attempt = (now + timedelta(seconds=retry_in or 0)).isoformat()
+    with get_db() as conn:
+        result = conn.execute(
+            """UPDATE email_outbox
+               SET status = ?, attempts = attempts + 1, last_error = ?, claim_token = NULL,
+                   locked_at = NULL, next_attempt_at = ?
+               WHERE id = ? AND claim_token = ?""",
+            (status, error, next_attempt, email_id, claim_token),
+        )
+        if result.rowcount == 0:
+            return False
+        conn.execute(
+            "UPDATE email_logs SET status = ?, sent_at = ? WHERE id = ?",
+            (status, now.isoformat(), email_id),
+        )
+        if status in ("sent", "failed"):
+            _purge_sent_attachments(conn)
+    return True
+
+
+def release_outbox_emails(claim_token: str) -> int:
+    """
+    Rend à la file (`queued`, sans compter de tentative) les emails encore
+    réservés par `claim_token` : un worker arrêté avant de les envoyer.
+    Retourne le nombre d'emails rendus.
+    """
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE email_logs SET status = 'queued' WHERE id IN "
+            "(SELECT id FROM email_outbox WHERE claim_token = ? AND status = 'sending')",
+            (claim_token,),
+        )
+        result = conn.execute(
+            """UPDATE email_outbox SET status = 'queued', claim_token = NULL, locked_at = NULL
+               WHERE claim_token = ? AND status = 'sending'""",
+            (claim_token,),
+        )
+        return result.rowcount
+
+
+def _purge_sent_attachments(conn):
+    """Supprime les pièces jointes qui ne sont plus attendues par aucun email en file."""
+    conn.execute(
+        """DELETE FROM email_attachments
+           WHERE NOT EXISTS (
+               SELECT 1 FROM email_outbox o
+               WHERE o.attachment_hash = email_attachments.hash AND o.status IN ('queued', 'sending')
+           )"""
+    )
+
+
+def get_outbox_counts(smtp_key: str | None = None) -> dict:
+    """Nombre d'emails par statut dans la file d'envoi."""
+    init_db()
+    query = "SELECT status, COUNT(*) AS n FROM email_outbox"
+    params = []
+    if smtp_key:
+        query += " WHERE smtp_key = ?"
+        params.append(smtp_key)
+    with get_db() as conn:
+        rows = conn.execute(query + " GROUP BY status", params).fetchall()
+        return {row["status"]: row["n"] for row in rows}
@@ -0,0 +1,103 @@
+"""
+Couche d'accès asynchrone (asyncio) à la base de données.
+Même API que utils.database, mêmes schéma et backend : chaque appel est
+exécuté hors de la boucle d'événements. Les lectures tournent en parallèle
+sur un pool de threads ; les écritures passent par un thread unique qui les
+sérialise dans l'ordre d'arrivée (un seul écrivain SQLite à la fois).
+
+Exemple :
+    ctx = asyncio.run(load_advisor_context("demo", client_id))
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from . import database as _db
+
+_READ_WORKERS = 4
+_read_executor = ThreadPoolExecutor(max_workers=_READ_WORKERS, thread_name_prefix="fap-db-read")
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fap-db-write")
+
+
+async def _run(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+    """Exécute une fonction synchrone de utils.database dans un executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+def _reader(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _run(_read_executor, fn, *args, **kwargs)
+    return wrapper
+
+
+def _writer(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _run(_write_executor, fn, *args, **kwargs)
+    return wrapper
+
+
+# ════════════════════════════════════════════════════════════
+# API (mêmes signatures que utils.database)
+# ════════════════════════════════════════════════════════════
+
+init_db = _writer(_db.init_db)
+
+create_client = _writer(_db.create_client)
+get_clients = _reader(_db.get_clients)
+get_client = _reader(_db.get_client)
+update_client = _writer(_db.update_client)
+delete_client = _writer(_db.delete_client)
+get_client_count = _reader(_db.get_client_count)
+
+save_simulation = _writer(_db.save_simulation)
+save_simulations = _writer(_db.save_simulations)
+get_simulations = _reader(_db.get_simulations)
+get_latest_simulation = _reader(_db.get_latest_simulation)
+find_simulation_by_params = _reader(_db.find_simulation_by_params)
+delete_simulation = _writer(_db.delete_simulation)
+
+get_advisor_settings = _reader(_db.get_advisor_settings)
+save_advisor_settings = _writer(_db.save_advisor_settings)
+
+log_email = _writer(_db.log_email)
+update_email_status = _writer(_db.update_email_status)
+
+
+# ════════════════════════════════════════════════════════════
+# CHARGEMENTS CONCURRENTS & ÉCRITURES PAR LOTS
+# ════════════════════════════════════════════════════════════
+
+async def load_advisor_context(
+    advisor_id: str,
+    client_id: str | None = None,
+    module: str | None = None,
+) -> dict:
+    """
+    Charge en parallèle les données d'une page : clients, statistiques,
+    paramètres du conseiller et, si un client est donné, sa fiche et son historique.
+    """
+    tasks = {
+        "clients": get_clients(advisor_id),
+        "stats": get_client_count(advisor_id),
+        "settings": get_advisor_settings(advisor_id),
+    }
+    if client_id:
+        tasks["client"] = get_client(client_id)
+        tasks["simulations"] = get_simulations(client_id, module=module)
+
+    values = await asyncio.gather(*tasks.values())
+    return dict(zip(tasks.keys(), values))
+
+
+async def save_simulations_batch(simulations: list[dict], chunk_size: int = 200) -> list[str]:
+    """
+    Sauvegarde un grand nombre de simulations en enchaînant des transactions
+    de `chunk_size` lignes sur le thread d'écriture. Retourne les IDs dans l'ordre.
+    """
+    chunks = [simulations[i:i + chunk_size] for i in range(0, len(simulations), chunk_size)]
+    results = await asyncio.gather(*(save_simulations(chunk) for chunk in chunks))
+    return [sim_id for chunk_ids in results for sim_id in chunk_ids]
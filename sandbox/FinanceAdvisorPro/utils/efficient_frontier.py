@@ -0,0 +1,249 @@
+"""
+Frontière efficiente et allocation recommandée sur les classes d'actifs.
+Les candidats sont toutes les allocations d'une grille du simplexe (pas de
+5 % par défaut, bornes par classe) ; chacun est évalué en une opération
+matricielle :
+
+- rendement et volatilité annuels (nets de frais) par moyenne-variance,
+  avec les hypothèses de marché du pack ;
+- CVaR annuelle (perte moyenne des 5 % pires années) sur des scénarios
+  annuels corrélés, simulés une fois par pack.
+
+Les frontières sont mises en cache par pack : le graphique de la page ne
+simule rien. Seule la recommandation simule, en un passage groupé, les
+points de la frontière à l'horizon du client.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from .parameter_packs import resoudre_annee
+from .portfolio import REBALANCEMENT_MOIS, _marches, _trajectoires, poids_allocation
+
+PAS_GRILLE = 5                    # % ; 5 classes → 10 626 allocations (4 641 sous les bornes par défaut)
+BORNES_ALLOCATION = {"Crypto": 10}  # % maximum par classe
+NIVEAU_CVAR = 0.95
+N_SCENARIOS_CVAR = 5_000
+TAILLE_BLOC_CVAR = 256            # candidats évalués ensemble pour la CVaR
+MAX_POINTS_SIMULES = 30           # points de la frontière simulés pour la recommandation
+N_SIMULATIONS_RECOMMANDATION = 1_000
+MESURES = ("volatilite", "cvar")
+
+
+@lru_cache(maxsize=8)
+def _grille(n_classes: int, pas: int, bornes: tuple[float, ...]) -> np.ndarray:
+    """Allocations (en %) multiples de `pas`, de somme 100, sous les bornes par classe."""
+    if pas <= 0 or 100 % pas:
+        raise ValueError(f"Le pas de la grille doit diviser 100 (reçu {pas})")
+    n = 100 // pas
+    # Étoiles et barres : positions des n_classes - 1 séparateurs parmi n + n_classes - 1
+    separateurs = np.array(list(combinations(range(n + n_classes - 1), n_classes - 1))).reshape(-1, n_classes - 1)
+    bords = np.hstack([
+        np.full((len(separateurs), 1), -1), separateurs, np.full((len(separateurs), 1), n + n_classes - 1),
+    ])
+    grille = (np.diff(bords, axis=1) - 1) * pas
+    grille = grille[(grille <= np.array(bornes)).all(axis=1)].astype(float)
+    grille.flags.writeable = False
+    return grille
+
+
+@lru_cache(maxsize=None)
+def _rendements_annuels(annee: int, n_scenarios: int, graine: int) -> np.ndarray:
+    """Rendements annuels nets de frais par classe (scénarios × classes), 12 mois de chocs corrélés."""
+    _, rendements, volatilites, frais, cholesky = _marches(annee)
+    rng = np.random.default_rng(graine)
+    chocs = rng.standard_normal((n_scenarios, 12, len(cholesky))) @ cholesky.T
+    mensuels = np.maximum(1 + rendements / 12 + volatilites / np.sqrt(12) * chocs, 0) * (1 - frais / 12)
+    annuels = mensuels.prod(axis=1) - 1
+    annuels.flags.writeable = False
+    return annuels
+
+
+def _pareto(risque: np.ndarray, rendement: np.ndarray) -> np.ndarray:
+    """Indices des candidats non dominés, par risque croissant."""
+    ordre = np.lexsort((-rendement, risque))
+    tries = rendement[ordre]
+    garde = np.r_[True, tries[1:] > np.maximum.accumulate(tries)[:-1]]
+    return ordre[garde]
+
+
+def _mesures(poids: np.ndarray, annee: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Rendement, volatilité et CVaR annuels de chaque ligne de poids (candidats × classes)."""
+    _, rendements, volatilites, frais, cholesky = _marches(annee)
+    facteur = volatilites[:, None] * cholesky                                # covariance = facteur @ facteur.T
+    rendement = poids @ (rendements - frais)
+    volatilite = np.linalg.norm(poids @ facteur, axis=1)
+
+    # Pertes (scénarios × candidats) par blocs de candidats : la matrice
+    # complète pèserait N_SCENARIOS_CVAR × 4 641 flottants (~190 Mo)
+    scenarios = _rendements_annuels(annee, N_SCENARIOS_CVAR, 42)
+    n_queue = max(int(round(N_SCENARIOS_CVAR * (1 - NIVEAU_CVAR))), 1)
+    cvar = np.empty(len(poids))
+    for debut in range(0, len(poids), TAILLE_BLOC_CVAR):
+        pertes = -(scenarios @ poids[debut:debut + TAILLE_BLOC_CVAR].T)
+        cvar[debut:debut + TAILLE_BLOC_CVAR] = np.partition(pertes, -n_queue, axis=0)[-n_queue:].mean(axis=0)
+    return rendement, volatilite, cvar
+
+
+@lru_cache(maxsize=16)
+def _evaluation(annee: int, pas: int, bornes: tuple[float, ...]) -> tuple:
+    """(poids, rendement, volatilité, CVaR) de tous les candidats, en lecture seule."""
+    poids = _grille(len(_marches(annee)[0]), pas, bornes) / 100
+    rendement, volatilite, cvar = _mesures(poids, annee)
+    for table in (poids, rendement, volatilite, cvar):
+        table.flags.writeable = False
+    return poids, rendement, volatilite, cvar
+
+
+def _bornes(classes: tuple[str, ...], bornes: dict | None) -> tuple[float, ...]:
+    bornes = BORNES_ALLOCATION if bornes is None else bornes
+    return tuple(float(bornes.get(c, 100)) for c in classes)
+
+
+def _point(classes, poids, rendement, volatilite, cvar) -> dict:
+    return {
+        "allocation": {c: round(float(p) * 100, 1) for c, p in zip(classes, poids) if p > 0},
+        "rendement": round(float(rendement), 4),
+        "volatilite": round(float(volatilite), 4),
+        "cvar": round(float(cvar), 4),
+    }
+
+
+@lru_cache(maxsize=16)
+def _indices_frontiere(annee: int, pas: int, bornes: tuple[float, ...], mesure: str) -> np.ndarray:
+    _, rendement, volatilite, cvar = _evaluation(annee, pas, bornes)
+    indices = _pareto(volatilite if mesure == "volatilite" else cvar, rendement)
+    indices.flags.writeable = False
+    return indices
+
+
+def frontiere_efficiente(
+    mesure: str = "volatilite",
+    pas: int = PAS_GRILLE,
+    bornes: dict | None = None,
+    annee: int | None = None,
+) -> dict:
+    """
+    Allocations efficientes : rendement maximal pour chaque niveau de risque.
+
+    Args:
+        mesure: Risque minimisé, "volatilite" (moyenne-variance) ou "cvar"
+        pas: Pas de la grille d'allocations (% , diviseur de 100)
+        bornes: Part maximale par classe en % (défaut BORNES_ALLOCATION)
+        annee: Année du pack d'hypothèses de marché
+
+    Returns:
+        Dict {"classes", "points": [{"allocation", "rendement", "volatilite",
+        "cvar"}] par risque croissant, "nb_candidats", "niveau_cvar"}
+    """
+    if mesure not in MESURES:
+        raise ValueError(f"Mesure de risque inconnue : {mesure} (attendu : {', '.join(MESURES)})")
+    annee = resoudre_annee(annee)
+    classes = _marches(annee)[0]
+    cle_bornes = _bornes(classes, bornes)
+    poids, rendement, volatilite, cvar = _evaluation(annee, pas, cle_bornes)
+    return {
+        "classes": classes,
+        "points": [
+            _point(classes, poids[i], rendement[i], volatilite[i], cvar[i])
+            for i in _indices_frontiere(annee, pas, cle_bornes, mesure)
+        ],
+        "nb_candidats": len(poids),
+        "niveau_cvar": NIVEAU_CVAR,
+    }
+
+
+def evaluer_allocations(allocations: dict[str, dict], annee: int | None = None) -> dict[str, dict]:
+    """
+    Rendement, volatilité et CVaR d'allocations données ({nom: {classe: %}}),
+    sur les mêmes hypothèses et scénarios que la frontière.
+    """
+    annee = resoudre_annee(annee)
+    classes = _marches(annee)[0]
+    poids = np.array([poids_allocation(a, classes) for a in allocations.values()]).reshape(-1, len(classes))
+    mesures = _mesures(poids, annee)
+    return {nom: _point(classes, poids[i], *(m[i] for m in mesures)) for i, nom in enumerate(allocations)}
+
+
+@lru_cache(maxsize=32)
+def _valeurs_finales(
+    capital_initial: float,
+    versement_mensuel: float,
+    annees: int,
+    mesure: str,
+    pas: int,
+    bornes: tuple[float, ...],
+    annee: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (indices des points simulés, capitaux finaux (points × simulations)) :
+    jusqu'à MAX_POINTS_SIMULES points de la frontière, répartis sur toute
+    sa longueur, simulés ensemble sur les mêmes tirages.
+    """
+    frontiere = _indices_frontiere(annee, pas, bornes, mesure)
+    choisis = np.unique(np.linspace(0, len(frontiere) - 1, min(len(frontiere), MAX_POINTS_SIMULES)).round().astype(int))
+    poids = _evaluation(annee, pas, bornes)[0][frontiere[choisis]]
+    valeurs = _trajectoires(
+        poids, capital_initial, versement_mensuel, annees, np.full(len(poids), REBALANCEMENT_MOIS),
+        N_SIMULATIONS_RECOMMANDATION, None, 42, annee, par_actif=False,
+    )[:, :, -1]
+    for table in (choisis, valeurs):
+        table.flags.writeable = False
+    return frontiere[choisis], valeurs
+
+
+def recommander_allocation(
+    capital_initial: float,
+    versement_mensuel: float,
+    annees: int,
+    objectif: float,
+    percentile: float = 10,
+    mesure: str = "volatilite",
+    pas: int = PAS_GRILLE,
+    bornes: dict | None = None,
+    annee: int | None = None,
+) -> dict:
+    """
+    Allocation la moins risquée de la frontière dont le capital final au
+    `percentile` donné atteint l'objectif (percentile 10 = objectif atteint
+    dans 90 % des scénarios). Si aucune ne l'atteint, celle qui s'en approche
+    le plus.
+
+    Returns:
+        Dict {"allocation", "rendement", "volatilite", "cvar",
+        "valeur_percentile", "objectif", "percentile", "atteint",
+        "points": [{"rendement", "volatilite", "cvar", "valeur_percentile"}]
+        (points de la frontière simulés, par risque croissant)}
+    """
+    if mesure not in MESURES:
+        raise ValueError(f"Mesure de risque inconnue : {mesure} (attendu : {', '.join(MESURES)})")
+    if not 0 < percentile < 100:
+        raise ValueError(f"Percentile hors de ]0, 100[ : {percentile}")
+    annee = resoudre_annee(annee)
+    classes = _marches(annee)[0]
+    cle_bornes = _bornes(classes, bornes)
+    indices, valeurs = _valeurs_finales(
+        float(capital_initial), float(versement_mensuel), int(annees), mesure, pas, cle_bornes, annee,
+    )
+    niveaux = np.percentile(valeurs, percentile, axis=1)
+
+    atteints = np.flatnonzero(niveaux >= objectif)
+    k = int(atteints[0]) if len(atteints) else int(niveaux.argmax())
+    poids, rendement, volatilite, cvar = _evaluation(annee, pas, cle_bornes)
+    i = indices[k]
+    return {
+        **_point(classes, poids[i], rendement[i], volatilite[i], cvar[i]),
+        "valeur_percentile": round(float(niveaux[k]), 2),
+        "objectif": objectif,
+        "percentile": percentile,
+        "atteint": bool(len(atteints)),
+        "points": [
+            {
+                **{c: v for c, v in _point(classes, poids[j], rendement[j], volatilite[j], cvar[j]).items() if c != "allocation"},
+                "valeur_percentile": round(float(n), 2),
+            }
+            for j, n in zip(indices, niveaux)
+        ],
+    }
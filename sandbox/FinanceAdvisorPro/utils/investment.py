@@ -1,9 +1,29 @@
 """
 Fonctions de simulation d'investissement.
+Deux moteurs Monte Carlo partagent la même capitalisation vectorisée et la
+même sortie par percentiles : rendements mensuels normaux (paramétrique), ou
+rééchantillonnage par blocs d'un historique local de rendements mensuels
+(data/rendements_historiques.csv), qui conserve queues épaisses et
+autocorrélation des marchés.
 """
 
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+
 import numpy as np
 
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Historique : une ligne par mois, rendements mensuels décimaux par classe d'actifs
+# (mêmes noms que les allocations de PROFILS_INVESTISSEMENT), par ex.
+#     mois,Obligations,Actions,Immobilier,Liquidités,Crypto
+#     2000-01,0.0042,-0.0315,0.0120,0.0002,
+# Une case vide exclut le mois pour les portefeuilles qui détiennent cette classe.
+RENDEMENTS_HISTORIQUES_CSV = Path(__file__).parent.parent / "data" / "rendements_historiques.csv"
+TAILLE_BLOC_MOIS = 12
+
 
 def interets_composes(
     capital_initial: float,
@@ -58,44 +78,160 @@ def simulation_monte_carlo(
     vol_mensuelle = volatilite / np.sqrt(12)
     n_mois = annees * 12
 
-    resultats_finaux = []
-    percentiles_evolution = {5: [], 25: [], 50: [], 75: [], 95: []}
-
-    # Simuler
-    all_trajectories = np.zeros((n_simulations, n_mois + 1))
-    all_trajectories[:, 0] = capital_initial
-
-    for sim in range(n_simulations):
-        capital = capital_initial
-        for m in range(1, n_mois + 1):
-            rendement = np.random.normal(taux_mensuel, vol_mensuelle)
-            capital = capital * (1 + rendement) + versement_mensuel
-            capital = max(capital, 0)
-            all_trajectories[sim, m] = capital
-        resultats_finaux.append(capital)
-
-    # Calculer les percentiles par année
-    for annee in range(annees + 1):
-        mois = annee * 12
-        valeurs = all_trajectories[:, mois]
-        for p in percentiles_evolution:
-            percentiles_evolution[p].append({
-                "annee": annee,
-                "valeur": round(float(np.percentile(valeurs, p)), 2),
-            })
+    # Même suite de tirages que scénario par scénario, mois par mois
+    rendements = np.random.normal(taux_mensuel, vol_mensuelle, size=(n_simulations, n_mois))
+    return _resume_simulation(_capitaliser(capital_initial, versement_mensuel, rendements), capital_initial, versement_mensuel)
+
+
+def _capitaliser(capital_initial: float, versement_mensuel: float, rendements: np.ndarray) -> np.ndarray:
+    """
+    Fait évoluer toutes les trajectoires ensemble, mois par mois (capital
+    plancher à 0), et ne conserve que le capital en fin d'année.
+
+    Args:
+        rendements: Rendements mensuels (simulations, mois)
+
+    Returns:
+        Tableau (simulations, années + 1), colonne 0 = capital initial
+    """
+    n_simulations, n_mois = rendements.shape
+    capital = np.full(n_simulations, float(capital_initial))
+    annuel = np.empty((n_simulations, n_mois // 12 + 1))
+    annuel[:, 0] = capital
+    for m, rendement in enumerate(np.ascontiguousarray(rendements.T), start=1):
+        capital = np.maximum(capital * (1 + rendement) + versement_mensuel, 0)
+        if m % 12 == 0:
+            annuel[:, m // 12] = capital
+    return annuel
+
 
-    total_verse = capital_initial + versement_mensuel * n_mois
+def _resume_simulation(annuel: np.ndarray, capital_initial: float, versement_mensuel: float) -> dict:
+    """Percentiles par année et indicateurs finaux à partir des capitaux annuels."""
+    niveaux = np.percentile(annuel, PERCENTILES, axis=0)
+    finaux = annuel[:, -1]
+    total_verse = capital_initial + versement_mensuel * (annuel.shape[1] - 1) * 12
+    final = dict(zip(PERCENTILES, niveaux[:, -1]))
 
     return {
-        "mediane": round(float(np.median(resultats_finaux)), 2),
-        "percentile_5": round(float(np.percentile(resultats_finaux, 5)), 2),
-        "percentile_25": round(float(np.percentile(resultats_finaux, 25)), 2),
-        "percentile_75": round(float(np.percentile(resultats_finaux, 75)), 2),
-        "percentile_95": round(float(np.percentile(resultats_finaux, 95)), 2),
+        "mediane": round(float(np.median(finaux)), 2),
+        "percentile_5": round(float(final[5]), 2),
+        "percentile_25": round(float(final[25]), 2),
+        "percentile_75": round(float(final[75]), 2),
+        "percentile_95": round(float(final[95]), 2),
         "total_verse": round(total_verse, 2),
-        "probabilite_perte": round(float(np.mean(np.array(resultats_finaux) < total_verse)) * 100, 2),
-        "percentiles_evolution": percentiles_evolution,
+        "probabilite_perte": round(float(np.mean(finaux < total_verse)) * 100, 2),
+        "percentiles_evolution": {
+            p: [{"annee": annee, "valeur": round(float(v), 2)} for annee, v in enumerate(serie)]
+            for p, serie in zip(PERCENTILES, niveaux)
+        },
+    }
+
+
+# ════════════════════════════════════════════════════════════
+# BOOTSTRAP HISTORIQUE
+# ════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=4)
+def _lire_rendements(chemin: str, mtime: float) -> tuple[tuple[str, ...], tuple[str, ...], np.ndarray]:
+    """(mois, classes d'actifs, rendements (mois × classes), NaN = donnée absente)."""
+    with open(chemin, newline="", encoding="utf-8") as f:
+        lignes = list(csv.reader(f))
+    if len(lignes) < 2:
+        raise ValueError(f"{Path(chemin).name} : aucune donnée")
+    classes = tuple(c.strip() for c in lignes[0][1:])
+    mois, valeurs = [], []
+    for numero, ligne in enumerate(lignes[1:], start=2):
+        if not any(cellule.strip() for cellule in ligne):
+            continue
+        try:
+            valeurs.append([float(c) if c.strip() else math.nan for c in ligne[1:len(classes) + 1]])
+        except ValueError:
+            raise ValueError(f"{Path(chemin).name}, ligne {numero} : rendement non numérique") from None
+        valeurs[-1] += [math.nan] * (len(classes) - len(valeurs[-1]))
+        mois.append(ligne[0].strip())
+    rendements = np.array(valeurs, dtype=float)
+    rendements.flags.writeable = False
+    return tuple(mois), classes, rendements
+
+
+def rendements_historiques(chemin: Path = RENDEMENTS_HISTORIQUES_CSV) -> dict | None:
+    """
+    Historique de rendements mensuels, lu une fois tant que le fichier ne change pas.
+    Retourne {"mois", "classes", "rendements"} ou None si le fichier n'existe pas.
+    """
+    chemin = Path(chemin)
+    if not chemin.exists():
+        return None
+    mois, classes, rendements = _lire_rendements(str(chemin), chemin.stat().st_mtime)
+    return {"mois": mois, "classes": classes, "rendements": rendements}
+
+
+@lru_cache(maxsize=32)
+def _indices_blocs(n_historique: int, n_mois: int, taille_bloc: int, n_simulations: int, graine: int) -> np.ndarray:
+    """Indices des mois tirés : blocs consécutifs de l'historique mis bout à bout (simulations, mois)."""
+    rng = np.random.default_rng(graine)
+    n_blocs = -(-n_mois // taille_bloc)
+    debuts = rng.integers(0, n_historique - taille_bloc + 1, size=(n_simulations, n_blocs))
+    indices = (debuts[:, :, None] + np.arange(taille_bloc)).reshape(n_simulations, -1)[:, :n_mois]
+    indices.flags.writeable = False
+    return indices
+
+
+def simulation_bootstrap(
+    capital_initial: float,
+    versement_mensuel: float,
+    allocation: dict,
+    annees: int,
+    n_simulations: int = 500,
+    taille_bloc: int = TAILLE_BLOC_MOIS,
+    chemin: Path = RENDEMENTS_HISTORIQUES_CSV,
+    graine: int = 42,
+) -> dict:
+    """
+    Monte Carlo par rééchantillonnage de blocs de l'historique.
+    Le portefeuille est rebalancé chaque mois selon l'allocation (en %) ; les
+    blocs de `taille_bloc` mois consécutifs conservent l'autocorrélation et
+    les queues épaisses des rendements réels.
+
+    Returns:
+        Même forme que simulation_monte_carlo, plus "historique" : période,
+        nombre de mois, rendement et volatilité annualisés, excès de kurtosis
+        des rendements mensuels du portefeuille
+    """
+    historique = rendements_historiques(chemin)
+    if historique is None:
+        raise FileNotFoundError(f"Historique de rendements introuvable : {chemin}")
+
+    classes = historique["classes"]
+    manquantes = [c for c, pct in allocation.items() if pct and c not in classes]
+    if manquantes:
+        raise ValueError(f"Classes absentes de l'historique : {', '.join(manquantes)}")
+    poids = np.array([allocation.get(c, 0) for c in classes], dtype=float)
+    poids /= poids.sum()
+
+    # Mois complets pour les classes détenues
+    detenues = poids > 0
+    complets = ~np.isnan(historique["rendements"][:, detenues]).any(axis=1)
+    serie = np.nan_to_num(historique["rendements"][complets]) @ poids
+    if len(serie) < taille_bloc:
+        raise ValueError(f"Historique trop court : {len(serie)} mois pour des blocs de {taille_bloc}")
+
+    n_mois = annees * 12
+    rendements = serie[_indices_blocs(len(serie), n_mois, taille_bloc, n_simulations, graine)]
+    result = _resume_simulation(_capitaliser(capital_initial, versement_mensuel, rendements), capital_initial, versement_mensuel)
+
+    mois = [m for m, ok in zip(historique["mois"], complets) if ok]
+    ecart = serie - serie.mean()
+    result["historique"] = {
+        "debut": mois[0],
+        "fin": mois[-1],
+        "n_mois": len(serie),
+        "taille_bloc": taille_bloc,
+        "rendement_annualise": round(float(np.prod(1 + serie) ** (12 / len(serie)) - 1), 4),
+        "volatilite_annualisee": round(float(serie.std(ddof=1) * np.sqrt(12)), 4),
+        "kurtosis_excedentaire": round(float((ecart ** 4).mean() / (ecart ** 2).mean() ** 2 - 3), 2),
     }
+    return result
 
 
 def cout_opportunite(
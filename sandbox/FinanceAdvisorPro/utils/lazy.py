@@ -0,0 +1,43 @@
+"""
+Imports différés pour les pages.
+`lazy_import("pandas")` retourne un mandataire : le module n'est réellement
+importé qu'au premier accès à l'un de ses attributs. Une page peut ainsi
+afficher ses premiers éléments avant de charger les dépendances lourdes
+qui ne servent que plus bas (tableaux, export PDF...).
+
+Mesure : python -m benchmarks.import_time
+"""
+
+import importlib
+import sys
+
+
+class LazyModule:
+    """Mandataire d'un module importé au premier accès à un attribut."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "chargé" if self._module is not None else "différé"
+        return f"<module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Retourne le module `name` s'il est déjà chargé, sinon un mandataire différé."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
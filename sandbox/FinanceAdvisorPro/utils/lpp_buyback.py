@@ -0,0 +1,164 @@
+"""
+Échelonnement des rachats LPP.
+Un rachat est déduit du revenu imposable de l'année : la déduction porte sur
+les tranches les plus hautes du barème, si bien qu'un gros rachat unique
+économise moins que plusieurs rachats répartis sur des années.
+
+Les économies de chaque (année × montant) sont calculées en un appel au
+moteur fiscal vectorisé (mêmes barèmes compilés), puis réparties par
+programmation dynamique sur une grille de montants.
+"""
+
+import math
+
+import numpy as np
+
+from .parameter_packs import resoudre_annee
+from .swiss_tax import calcul_impot_total_vectorise
+
+PAS_RACHAT = 1_000   # pas de la grille des montants (CHF)
+MAX_PAS_GRILLE = 500  # au-delà, le pas est agrandi
+PENALITE_IRREGULARITE = 0.05  # CHF, départage les répartitions d'économie égale
+
+
+def _grille(capacite: float, pas: float) -> np.ndarray:
+    """Montants 0..capacite en n pas égaux (pas ≤ `pas`, au plus MAX_PAS_GRILLE)."""
+    n = min(max(math.ceil(capacite / pas), 1), MAX_PAS_GRILLE)
+    return np.linspace(0.0, capacite, n + 1)
+
+
+def economies_rachat(
+    revenus_bruts,
+    rachats,
+    canton: str,
+    commune: str | None = None,
+    marie: bool = False,
+    enfants: int = 0,
+    deduction_3a: float = 0,
+    deduction_frais_effectifs: float = 0,
+    annee: int | None = None,
+) -> np.ndarray:
+    """
+    Économie d'impôt sur le revenu pour chaque (revenu, rachat).
+    Retourne un tableau (len(revenus_bruts), len(rachats)).
+    """
+    revenus = np.asarray(revenus_bruts, dtype=float)[:, None]
+    rachats = np.asarray(rachats, dtype=float)[None, :]
+    impots = calcul_impot_total_vectorise(
+        revenus, canton, commune, marie, enfants, deduction_3a=deduction_3a,
+        deduction_rachat_lpp=rachats, deduction_frais_effectifs=deduction_frais_effectifs, annee=annee,
+    )["impot_revenu"]
+    return np.round(impots[:, :1] - impots, 2)
+
+
+def _economies_par_annee(revenus, rachats, annee: int | None, *contexte) -> np.ndarray:
+    """
+    economies_rachat année par année (une ligne par revenu), avec le pack
+    de chaque année ; un seul appel vectorisé si toutes partagent le même pack.
+    """
+    if annee is None:
+        return economies_rachat(revenus, rachats, *contexte)
+    packs = [resoudre_annee(annee + t) for t in range(len(revenus))]
+    if len(set(packs)) == 1:
+        return economies_rachat(revenus, rachats, *contexte, annee=packs[0])
+    return np.vstack([
+        economies_rachat(revenus[t:t + 1], rachats, *contexte, annee=pack) for t, pack in enumerate(packs)
+    ])
+
+
+def optimiser_rachats_lpp(
+    capacite: float,
+    annees: int,
+    revenu_brut: float,
+    canton: str,
+    commune: str | None = None,
+    marie: bool = False,
+    enfants: int = 0,
+    deduction_3a: float = 0,
+    deduction_frais_effectifs: float = 0,
+    croissance_salaire: float = 0.0,
+    taux_actualisation: float = 0.0,
+    pas: float = PAS_RACHAT,
+    annee: int | None = None,
+) -> dict:
+    """
+    Répartition d'un potentiel de rachat LPP sur plusieurs années,
+    maximisant l'économie d'impôt cumulée.
+
+    Args:
+        capacite: Potentiel de rachat total (CHF, selon le certificat LPP)
+        annees: Nombre d'années sur lesquelles répartir les rachats
+        revenu_brut: Revenu brut de la première année, indexé ensuite de
+                     `croissance_salaire` par an
+        taux_actualisation: Les économies des années suivantes sont actualisées
+                            à ce taux (0 = somme nominale)
+        pas: Pas de la grille des montants (agrandi au besoin pour rester
+             sous MAX_PAS_GRILLE pas)
+        annee: Année fiscale de la première année (pack fiscal) ; les années
+               suivantes prennent leur propre pack s'il existe
+
+    Returns:
+        Dict {"plan": [{"annee", "rachat", "economie"}], "rachat_total",
+        "economie_totale", "economie_en_une_fois", "economie_repartie"
+        (montants égaux chaque année), "gain_vs_une_fois", "pas"}
+    """
+    if capacite <= 0 or annees <= 0:
+        return {
+            "plan": [], "rachat_total": 0.0, "economie_totale": 0.0,
+            "economie_en_une_fois": 0.0, "economie_repartie": 0.0,
+            "gain_vs_une_fois": 0.0, "pas": 0.0,
+        }
+
+    montants = _grille(capacite, pas)
+    n = len(montants) - 1
+    revenus = revenu_brut * (1 + croissance_salaire) ** np.arange(annees)
+    economies = _economies_par_annee(
+        revenus, montants, annee, canton, commune, marie, enfants, deduction_3a, deduction_frais_effectifs,
+    )
+    gains = economies / (1 + taux_actualisation) ** np.arange(annees)[:, None]
+
+    # À économie égale (tranches à taux constant), préférer des rachats réguliers
+    k = np.arange(n + 1)[:, None]
+    j = np.arange(n + 1)[None, :]
+    gains = gains - PENALITE_IRREGULARITE * (j / n) ** 2
+
+    # meilleur[k] : gain maximal en ayant utilisé exactement k pas de capacité ;
+    # candidat[k, j] : j pas cette année. Au départ, rien n'est utilisé
+    valide = j <= k
+    precedent = np.where(valide, k - j, 0)
+    meilleur = np.full(n + 1, -np.inf)
+    meilleur[0] = 0.0
+    choix = np.zeros((annees, n + 1), dtype=int)
+    for t in range(annees):
+        candidats = np.where(valide, meilleur[precedent] + gains[t][j], -np.inf)
+        choix[t] = candidats.argmax(axis=1)
+        meilleur = candidats[np.arange(n + 1), choix[t]]
+
+    # Reconstitution depuis la capacité entière : toute la capacité est rachetée,
+    # même au-delà du revenu imposable (économie nulle sur le surplus)
+    plan, reste = [], n
+    for t in range(annees - 1, -1, -1):
+        pas_annee = int(choix[t, reste])
+        plan.append({
+            "annee": t + 1,
+            "rachat": round(float(montants[pas_annee]), 2),
+            "economie": float(economies[t, pas_annee]),
+        })
+        reste -= pas_annee
+    plan.reverse()
+
+    economie_totale = round(sum(p["economie"] for p in plan), 2)
+    economie_en_une_fois = float(economies[0, n])
+    economie_repartie = round(float(_economies_par_annee(
+        revenus, [0.0, capacite / annees], annee, canton, commune, marie, enfants,
+        deduction_3a, deduction_frais_effectifs,
+    )[:, 1].sum()), 2)
+    return {
+        "plan": plan,
+        "rachat_total": round(sum(p["rachat"] for p in plan), 2),
+        "economie_totale": economie_totale,
+        "economie_en_une_fois": economie_en_une_fois,
+        "economie_repartie": economie_repartie,
+        "gain_vs_une_fois": round(economie_totale - economie_en_une_fois, 2),
+        "pas": round(float(montants[1]), 2),
+    }
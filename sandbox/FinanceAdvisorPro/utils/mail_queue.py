@@ -0,0 +1,366 @@
+"""
+File d'envoi des emails (SMTP).
+Les emails sont persistés dans `email_outbox` (PDF stocké une fois par
+empreinte dans `email_attachments`) puis envoyés par des threads de fond
+qui réutilisent chacun une connexion SMTP authentifiée ; les erreurs
+transitoires sont réessayées avec un délai exponentiel. Chaque transition
+est tracée dans `email_logs` : queued → sending → sent | failed.
+
+Configuration SMTP (dict) :
+    host, port, user, password, from_name
+    starttls (défaut True) — False pour un serveur local sans TLS
+    Sans user/password, aucune authentification n'est tentée.
+
+Test local :
+    python -m smtpd -n -c DebuggingServer localhost:1025   (Python ≤ 3.11)
+    python -m aiosmtpd -n -l localhost:1025
+    puis config = {"host": "localhost", "port": 1025, "starttls": False, ...}
+"""
+
+import smtplib
+import ssl
+import threading
+import time
+from datetime import datetime
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from .database import (
+    claim_outbox_emails,
+    complete_outbox_email,
+    enqueue_emails,
+    get_email_attachment,
+    get_outbox_counts,
+    release_outbox_emails,
+)
+
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2.0
+IDLE_TIMEOUT = 30.0            # fermeture de la connexion après inactivité
+MAX_PER_CONNECTION = 100       # reconnexion périodique (limites des serveurs)
+MAX_CONNECTIONS = 2            # workers (connexions SMTP) simultanés par compte
+BATCH_SIZE = 20                # emails réservés par worker à chaque passage
+STALE_AFTER = 600.0            # `sending` depuis plus longtemps = worker interrompu
+POLL_INTERVAL = 1.0
+
+# Erreurs pour lesquelles un nouvel essai a un sens (réseau, 4xx)
+_TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+# ════════════════════════════════════════════════════════════
+# MESSAGES
+# ════════════════════════════════════════════════════════════
+
+def _build_email_html(client_name: str, module_name: str, advisor_name: str) -> str:
+    """Construit le corps HTML de l'email."""
+    return f"""
+    <html>
+    <body style="font-family: 'Segoe UI', Arial, sans-serif; background: #0E1117; color: #fff; padding: 20px;">
+        <div style="max-width: 600px; margin: 0 auto; background: #1E2130; border-radius: 12px; overflow: hidden;">
+            <div style="background: linear-gradient(135deg, #6C63FF, #3B82F6); padding: 30px; text-align: center;">
+                <h1 style="margin: 0; font-size: 24px; color: white;">Finance Advisor Pro</h1>
+                <p style="margin: 5px 0 0; color: rgba(255,255,255,0.8); font-size: 14px;">Rapport de simulation</p>
+            </div>
+            <div style="padding: 30px;">
+                <p style="color: #A0A3B1; font-size: 14px;">Bonjour {client_name},</p>
+                <p style="color: #fff; font-size: 14px;">
+                    Veuillez trouver ci-joint votre rapport <b>{module_name}</b>
+                    généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}.
+                </p>
+                <div style="background: rgba(108, 99, 255, 0.1); border: 1px solid rgba(108, 99, 255, 0.3);
+                    border-radius: 8px; padding: 15px; margin: 20px 0;">
+                    <p style="color: #6C63FF; font-weight: 700; margin: 0;"> {module_name}</p>
+                    <p style="color: #A0A3B1; font-size: 12px; margin: 5px 0 0;">
+                        Le rapport PDF est en pièce jointe de cet email.
+                    </p>
+                </div>
+                <p style="color: #A0A3B1; font-size: 13px;">
+                    N'hésitez pas à me contacter pour toute question concernant ce rapport.
+                </p>
+                <p style="color: #fff; font-size: 14px; margin-top: 20px;">
+                    Cordialement,<br>
+                    <b>{advisor_name}</b>
+                </p>
+            </div>
+            <div style="background: #0E1117; padding: 15px; text-align: center;">
+                <p style="color: #A0A3B1; font-size: 11px; margin: 0;">
+                    Ce rapport est fourni à titre indicatif et ne constitue pas un conseil financier.<br>
+                    Finance Advisor Pro · Suisse Romande
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def report_subject(client_name: str, module_name: str) -> str:
+    return f"Rapport {module_name} — {client_name} — Finance Advisor Pro"
+
+
+def build_report_message(
+    config: dict,
+    to_email: str,
+    client_name: str,
+    module_name: str,
+    pdf_bytes: bytes,
+    advisor_name: str = "",
+) -> MIMEMultipart:
+    """Construit l'email d'un rapport PDF (corps HTML + pièce jointe)."""
+    msg = MIMEMultipart("mixed")
+    sender = config.get("user") or config.get("from_email", "noreply@localhost")
+    msg["From"] = f"{config.get('from_name', 'Finance Advisor Pro')} <{sender}>"
+    msg["To"] = to_email
+    msg["Subject"] = report_subject(client_name, module_name)
+
+    # HTML body
+    html_body = _build_email_html(client_name, module_name, advisor_name)
+    msg.attach(MIMEText(html_body, "html", "utf-8"))
+
+    # PDF attachment
+    filename = f"Rapport_{module_name}_{client_name}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    filename = filename.replace(" ", "_")
+    pdf_part = MIMEApplication(pdf_bytes, _subtype="pdf")
+    pdf_part.add_header("Content-Disposition", "attachment", filename=filename)
+    msg.attach(pdf_part)
+    return msg
+
+
+# ════════════════════════════════════════════════════════════
+# CONNEXION SMTP
+# ════════════════════════════════════════════════════════════
+
+def open_smtp(config: dict, timeout: float = 30.0) -> smtplib.SMTP:
+    """Ouvre une connexion SMTP (STARTTLS et login selon la configuration)."""
+    server = smtplib.SMTP(config["host"], int(config["port"]), timeout=timeout)
+    try:
+        if config.get("starttls", True):
+            server.starttls(context=ssl.create_default_context())
+        if config.get("user") and config.get("password"):
+            server.login(config["user"], config["password"])
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _is_transient(error: Exception) -> bool:
+    """Erreurs réseau et réponses 4xx : un nouvel essai peut réussir."""
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return True
+    code = getattr(error, "smtp_code", None)
+    return isinstance(code, int) and 400 <= code < 500
+
+
+class SMTPSession:
+    """
+    Connexion SMTP réutilisée entre plusieurs envois. Reconnecte après
+    MAX_PER_CONNECTION messages, après une déconnexion du serveur, ou
+    paresseusement après une fermeture pour inactivité.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self._server: smtplib.SMTP | None = None
+        self._sent_on_connection = 0
+
+    def send(self, msg):
+        if self._server is None or self._sent_on_connection >= MAX_PER_CONNECTION:
+            self.close()
+            self._server = open_smtp(self.config)
+            self._sent_on_connection = 0
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._server = None
+            raise
+        self._sent_on_connection += 1
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+
+def send_with_retry(session: SMTPSession, msg, max_retries: int | None = None, backoff: float | None = None):
+    """Envoie un message ; les erreurs transitoires sont réessayées (délai exponentiel)."""
+    max_retries = MAX_RETRIES if max_retries is None else max_retries
+    backoff = BACKOFF_SECONDS if backoff is None else backoff
+    for attempt in range(max_retries + 1):
+        try:
+            session.send(msg)
+            return
+        except Exception as e:
+            if not _is_transient(e) or attempt == max_retries:
+                raise
+            session.close()
+            time.sleep(backoff * 2 ** attempt)
+
+
+# ════════════════════════════════════════════════════════════
+# FILE D'ENVOI
+# ════════════════════════════════════════════════════════════
+
+def smtp_key(config: dict) -> str:
+    """Identifiant du compte SMTP d'une file (les emails en base y sont rattachés)."""
+    return f"{config['host']}:{int(config['port'])}:{config.get('user', '')}"
+
+
+class MailQueue:
+    """
+    File d'envoi persistée (table `email_outbox`), vidée par au plus
+    `concurrency` threads ayant chacun sa connexion SMTP réutilisée.
+    Les emails survivent aux reruns et aux redémarrages : les envois en
+    attente sont repris, ceux interrompus en `sending` depuis plus de
+    STALE_AFTER secondes sont réservés à nouveau.
+    """
+
+    def __init__(self, config: dict, concurrency: int = MAX_CONNECTIONS):
+        self.config = config
+        self.smtp_key = smtp_key(config)
+        self.concurrency = concurrency
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def enqueue_report(
+        self,
+        to_email: str,
+        client_name: str,
+        module_name: str,
+        pdf_bytes: bytes,
+        advisor_name: str = "",
+        client_id: str | None = None,
+        advisor_id: str = "",
+    ) -> str:
+        """Ajoute un rapport à la file. Retourne l'ID (`email_outbox` / `email_logs`)."""
+        return self.enqueue_reports([{
+            "to_email": to_email, "client_name": client_name, "module_name": module_name,
+            "pdf_bytes": pdf_bytes, "advisor_name": advisor_name,
+            "client_id": client_id, "advisor_id": advisor_id,
+        }])[0]
+
+    def enqueue_reports(self, emails: list[dict]) -> list[str]:
+        """Ajoute un lot de rapports (mêmes clés que `enqueue_report`) en une transaction."""
+        ids = enqueue_emails(self.smtp_key, [
+            {**email, "subject": report_subject(email["client_name"], email["module_name"])}
+            for email in emails
+        ])
+        self.start()
+        return ids
+
+    def start(self):
+        """Démarre les workers manquants et les réveille (sans effet une fois arrêtée)."""
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.concurrency:
+                thread = threading.Thread(target=self._run, name="fap-mail", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._wakeup.set()
+
+    def stop(self, timeout: float | None = 5.0):
+        """
+        Arrête les workers : l'email en cours d'envoi est terminé, les autres
+        emails réservés sont rendus à la file sans compter de tentative. Les
+        connexions SMTP sont fermées.
+        """
+        with self._lock:
+            self._stopped.set()
+            self._wakeup.set()
+            threads = list(self._threads)
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def pending(self) -> int:
+        """Nombre d'emails en attente ou en cours d'envoi."""
+        counts = get_outbox_counts(self.smtp_key)
+        return counts.get("queued", 0) + counts.get("sending", 0)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Attend que la file soit vide (retries compris). Retourne False si `timeout` expire."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def _run(self):
+        session = SMTPSession(self.config)
+        idle_since = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                batch = claim_outbox_emails(self.smtp_key, BATCH_SIZE, STALE_AFTER)
+                if batch:
+                    for email in batch:
+                        if self._stopped.is_set():
+                            release_outbox_emails(email["claim_token"])
+                            break
+                        self._deliver(session, email)
+                    idle_since = time.monotonic()
+                    continue
+                if time.monotonic() - idle_since > IDLE_TIMEOUT:
+                    # Inactif : libère la connexion (relancé par `start`)
+                    with self._lock:
+                        if not self._wakeup.is_set():
+                            self._threads.remove(threading.current_thread())
+                            return
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+        finally:
+            session.close()
+            with self._lock:
+                if threading.current_thread() in self._threads:
+                    self._threads.remove(threading.current_thread())
+
+    def _deliver(self, session: SMTPSession, email: dict):
+        pdf_bytes = get_email_attachment(email["attachment_hash"])
+        if pdf_bytes is None:
+            complete_outbox_email(email["id"], email["claim_token"], "failed", "Pièce jointe introuvable")
+            return
+        msg = build_report_message(
+            self.config, email["to_email"], email["client_name"],
+            email["module_name"], pdf_bytes, email["advisor_name"],
+        )
+        try:
+            # Un seul nouvel essai immédiat : reconnexion si la connexion réutilisée a expiré
+            send_with_retry(session, msg, max_retries=1, backoff=0)
+        except Exception as e:
+            attempts = email["attempts"] + 1
+            if _is_transient(e) and attempts <= MAX_RETRIES:
+                complete_outbox_email(email["id"], email["claim_token"], "queued", str(e), retry_in=BACKOFF_SECONDS * 2 ** (attempts - 1))
+            else:
+                complete_outbox_email(email["id"], email["claim_token"], "failed", str(e))
+        else:
+            complete_outbox_email(email["id"], email["claim_token"], "sent")
+
+
+_queues: dict[str, MailQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_mail_queue(config: dict) -> MailQueue:
+    """
+    File partagée par serveur/compte SMTP. À la première utilisation dans
+    le processus, les emails restés en base (crash, redémarrage) sont repris.
+    Si la configuration du compte change (mot de passe, TLS...), l'ancienne
+    file est arrêtée avant que la nouvelle ne reprenne ses emails.
+    """
+    key = smtp_key(config)
+    with _queues_lock:
+        mail_queue = _queues.get(key)
+        if mail_queue is None or mail_queue.config != config:
+            if mail_queue is not None:
+                mail_queue.stop()
+            mail_queue = _queues[key] = MailQueue(config)
+            mail_queue.start()
+        return mail_queue
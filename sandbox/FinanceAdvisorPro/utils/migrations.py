@@ -0,0 +1,255 @@
+"""
+Migrations versionnées du schéma de la base de données.
+Chaque étape est appliquée une seule fois, dans l'ordre, et enregistrée dans
+la table `schema_version`. Pour faire évoluer le schéma, ajouter une fonction
+à la fin de MIGRATIONS — ne jamais modifier une migration déjà publiée.
+"""
+
+from datetime import datetime
+
+
+def _ensure_column(conn, backend, table: str, column: str, definition: str):
+    """Ajoute une colonne si elle est absente (bases créées avant les migrations)."""
+    if column not in backend.column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _m001_initial_schema(conn, backend):
+    """Schéma initial (idempotent pour les bases existantes)."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS clients (
+            id TEXT PRIMARY KEY,
+            advisor_id TEXT NOT NULL,
+            nom TEXT NOT NULL,
+            prenom TEXT NOT NULL,
+            email TEXT DEFAULT '',
+            telephone TEXT DEFAULT '',
+            date_naissance TEXT DEFAULT '',
+            age INTEGER DEFAULT 30,
+            situation_familiale TEXT DEFAULT 'Célibataire',
+            enfants INTEGER DEFAULT 0,
+            canton TEXT DEFAULT 'Vaud (VD)',
+            commune TEXT DEFAULT '',
+            salaire_annuel REAL DEFAULT 0,
+            capital_lpp REAL DEFAULT 0,
+            capital_3a REAL DEFAULT 0,
+            statut TEXT DEFAULT 'prospect',
+            tags TEXT DEFAULT '[]',
+            notes TEXT DEFAULT '',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS simulations (
+            id TEXT PRIMARY KEY,
+            client_id TEXT NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+            advisor_id TEXT NOT NULL,
+            module TEXT NOT NULL,
+            nom TEXT NOT NULL,
+            parametres TEXT DEFAULT '{}',
+            resultats TEXT DEFAULT '{}',
+            created_at TEXT NOT NULL,
+            version INTEGER DEFAULT 1
+        );
+
+        CREATE TABLE IF NOT EXISTS advisor_settings (
+            advisor_id TEXT PRIMARY KEY,
+            logo_path TEXT DEFAULT '',
+            primary_color TEXT DEFAULT '#6C63FF',
+            secondary_color TEXT DEFAULT '#00D4AA',
+            cabinet_name TEXT DEFAULT '',
+            cabinet_address TEXT DEFAULT '',
+            cabinet_phone TEXT DEFAULT '',
+            cabinet_email TEXT DEFAULT '',
+            cabinet_website TEXT DEFAULT '',
+            updated_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS email_logs (
+            id TEXT PRIMARY KEY,
+            client_id TEXT REFERENCES clients(id),
+            advisor_id TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            status TEXT DEFAULT 'sent'
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_clients_advisor ON clients(advisor_id);
+        CREATE INDEX IF NOT EXISTS idx_clients_statut ON clients(statut);
+        CREATE INDEX IF NOT EXISTS idx_simulations_client ON simulations(client_id);
+        CREATE INDEX IF NOT EXISTS idx_simulations_module ON simulations(module);
+    """)
+
+
+def _m002_payload_codec(conn, backend):
+    """Colonne `codec` des payloads binaires compressés."""
+    _ensure_column(conn, backend, "simulations", "codec", "INTEGER DEFAULT 0")
+
+
+def _m003_payload_dedup(conn, backend):
+    """Table des payloads partagés, indexés par empreinte de contenu."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS simulation_payloads (
+            hash TEXT PRIMARY KEY,
+            codec INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        );
+    """)
+    _ensure_column(conn, backend, "simulations", "params_hash", "TEXT")
+    _ensure_column(conn, backend, "simulations", "payload_hash", "TEXT")
+    backend.executescript(conn, """
+        CREATE INDEX IF NOT EXISTS idx_simulations_params ON simulations(module, params_hash);
+        CREATE INDEX IF NOT EXISTS idx_simulations_payload ON simulations(payload_hash);
+    """)
+
+
+def _m004_load_indexes(conn, backend):
+    """Index composites pour l'historique, la liste des clients et les emails."""
+    backend.executescript(conn, """
+        CREATE INDEX IF NOT EXISTS idx_simulations_client_module
+            ON simulations(client_id, module, created_at);
+        CREATE INDEX IF NOT EXISTS idx_clients_advisor_updated
+            ON clients(advisor_id, updated_at);
+        CREATE INDEX IF NOT EXISTS idx_email_logs_client ON email_logs(client_id);
+    """)
+
+
+def _m005_users(conn, backend):
+    """Comptes conseillers en base (alternative au fichier credentials.yaml)."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT DEFAULT '',
+            password TEXT NOT NULL,
+            role TEXT DEFAULT 'conseiller',
+            cabinet TEXT DEFAULT '',
+            created_at TEXT NOT NULL
+        );
+    """)
+
+
+def _m006_sessions(conn, backend):
+    """Sessions persistées (tokens signés, FAP_PERSIST_SESSIONS=1)."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            user_json TEXT NOT NULL,
+            expires_at INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions(username);
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+    """)
+
+
+def _m007_email_outbox(conn, backend):
+    """File d'envoi persistée des emails et pièces jointes partagées par empreinte."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS email_attachments (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id TEXT PRIMARY KEY,
+            smtp_key TEXT NOT NULL,
+            client_id TEXT,
+            advisor_id TEXT NOT NULL,
+            to_email TEXT NOT NULL,
+            client_name TEXT NOT NULL,
+            module_name TEXT NOT NULL,
+            advisor_name TEXT DEFAULT '',
+            attachment_hash TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT DEFAULT '',
+            claim_token TEXT,
+            locked_at TEXT,
+            next_attempt_at TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_outbox_pending
+            ON email_outbox(smtp_key, status, next_attempt_at);
+        CREATE INDEX IF NOT EXISTS idx_outbox_claim ON email_outbox(claim_token);
+        CREATE INDEX IF NOT EXISTS idx_outbox_attachment ON email_outbox(attachment_hash);
+    """)
+
+
+def _m008_binary_parametres(conn, backend):
+    """
+    `simulations.parametres` en binaire : les paramètres sont encodés par
+    payload_codec depuis la migration 2. SQLite stocke déjà les octets tels
+    quels dans une colonne TEXT ; PostgreSQL refuse du bytea dans du text.
+    Les lignes historiques (JSON texte) sont converties en UTF-8.
+    """
+    if backend.name != "postgresql":
+        return
+    conn.execute("ALTER TABLE simulations ALTER COLUMN parametres DROP DEFAULT")
+    conn.execute(
+        "ALTER TABLE simulations ALTER COLUMN parametres TYPE BYTEA USING convert_to(parametres, 'UTF8')"
+    )
+
+
+def _m009_params_lookup_index(conn, backend):
+    """Recherche d'une version par paramètres, toujours filtrée par client et module."""
+    backend.executescript(conn, """
+        DROP INDEX IF EXISTS idx_simulations_params;
+        CREATE INDEX IF NOT EXISTS idx_simulations_client_params
+            ON simulations(client_id, module, params_hash);
+    """)
+
+
+# Ordre d'application : (version, description, fonction)
+MIGRATIONS = [
+    (1, "Schéma initial", _m001_initial_schema),
+    (2, "Codec des payloads de simulation", _m002_payload_codec),
+    (3, "Déduplication des résultats de simulation", _m003_payload_dedup),
+    (4, "Index composites de charge", _m004_load_indexes),
+    (5, "Table des utilisateurs", _m005_users),
+    (6, "Sessions persistées", _m006_sessions),
+    (7, "File d'envoi des emails", _m007_email_outbox),
+    (8, "Paramètres de simulation binaires", _m008_binary_parametres),
+    (9, "Index de recherche par paramètres", _m009_params_lookup_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn, backend) -> int:
+    """Retourne la version de schéma appliquée (0 pour une base vierge)."""
+    backend.executescript(conn, """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        );
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def run_migrations(conn, backend) -> list[int]:
+    """
+    Applique les migrations en attente. Retourne les versions appliquées.
+    Tout se fait dans une transaction prise sous le verrou de migration du
+    backend : si plusieurs processus démarrent ensemble, le premier migre,
+    les autres attendent puis relisent la version (plus rien à appliquer).
+    """
+    applied = []
+    backend.lock_migrations(conn)
+    version = current_version(conn, backend)
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        migrate(conn, backend)
+        conn.execute(
+            """INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)
+               ON CONFLICT (version) DO NOTHING""",
+            (number, description, datetime.now().isoformat()),
+        )
+        applied.append(number)
+    conn.commit()
+    return applied
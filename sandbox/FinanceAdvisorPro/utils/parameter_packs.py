@@ -0,0 +1,164 @@
+"""
+Paramètres fiscaux et sociaux par année (« packs »).
+Un fichier par année fiscale, data/tax_packs/<année>.json : plafonds 3a,
+rentes AVS, seuils LPP, déductions forfaitaires, barèmes fédéraux,
+coefficients cantonaux et communaux, barèmes de fortune et de retrait en
+capital, hypothèses de marché par classe d'actifs (rendement, volatilité,
+frais annuels, corrélations dans l'ordre des classes). Dans un barème, un seuil null marque la dernière tranche (ouverte).
+
+Chaque pack est lu et validé une seule fois par processus. Les moteurs en
+compilent les tableaux NumPy dans leurs propres caches, indexés par année :
+plusieurs années peuvent être simulées dans le même processus, et aucun
+calcul ne relit ni ne recompile un pack.
+"""
+
+import bisect
+import json
+from functools import lru_cache
+from pathlib import Path
+
+PACKS_DIR = Path(__file__).parent.parent / "data" / "tax_packs"
+
+SECTIONS = ("pilier_3a", "avs", "lpp", "deductions", "bareme_federal", "cantons", "fortune", "retrait_capital", "marches")
+
+
+@lru_cache(maxsize=None)
+def annees_disponibles() -> tuple[int, ...]:
+    """Années pour lesquelles un pack existe, en ordre croissant."""
+    return tuple(sorted(int(p.stem) for p in PACKS_DIR.glob("*.json") if p.stem.isdigit()))
+
+
+@lru_cache(maxsize=64)
+def resoudre_annee(annee: int | None = None) -> int:
+    """
+    Année du pack applicable : celui de l'année demandée, sinon le plus récent
+    qui la précède (le plus ancien pour une année antérieure à tous les packs).
+    None = pack le plus récent.
+    """
+    annees = annees_disponibles()
+    if not annees:
+        raise FileNotFoundError(f"Aucun pack fiscal dans {PACKS_DIR}")
+    if annee is None:
+        return annees[-1]
+    return annees[max(bisect.bisect_right(annees, int(annee)) - 1, 0)]
+
+
+def charger_pack(annee: int | None = None) -> dict:
+    """
+    Pack validé de l'année (voir resoudre_annee). Le dict est partagé par
+    le cache : ne pas le modifier.
+    """
+    return _charger(resoudre_annee(annee))
+
+
+# ════════════════════════════════════════════════════════════
+# LECTURE ET VALIDATION
+# ════════════════════════════════════════════════════════════
+
+def _est_nombre(valeur) -> bool:
+    return isinstance(valeur, (int, float)) and not isinstance(valeur, bool)
+
+
+def _valider_bareme(nom: str, bareme, erreurs: list[str]) -> None:
+    """Tranches [seuil, taux] à seuils croissants ; seule la dernière est ouverte (null)."""
+    if not isinstance(bareme, list) or not bareme:
+        erreurs.append(f"{nom} : barème vide")
+        return
+    precedent = 0
+    for k, tranche in enumerate(bareme):
+        if not (isinstance(tranche, list) and len(tranche) == 2 and _est_nombre(tranche[1])):
+            erreurs.append(f"{nom} : tranche {k} mal formée")
+            return
+        seuil, taux = tranche
+        derniere = k == len(bareme) - 1
+        if seuil is None and not derniere:
+            erreurs.append(f"{nom} : seule la dernière tranche peut être ouverte")
+        elif seuil is not None and (not _est_nombre(seuil) or seuil <= precedent):
+            erreurs.append(f"{nom} : seuils non croissants (tranche {k})")
+        if not 0 <= taux <= 1:
+            erreurs.append(f"{nom} : taux hors de [0, 1] (tranche {k})")
+        precedent = seuil if _est_nombre(seuil) else precedent
+    if bareme[-1][0] is not None:
+        erreurs.append(f"{nom} : la dernière tranche doit être ouverte (seuil null)")
+
+
+def _valider(pack: dict, annee: int) -> None:
+    erreurs = [f"section « {s} » manquante" for s in SECTIONS if s not in pack]
+    if erreurs:
+        raise ValueError(f"Pack fiscal {annee} invalide : " + "; ".join(erreurs))
+    if pack.get("annee") != annee:
+        erreurs.append(f"année {pack.get('annee')!r} différente du nom de fichier")
+
+    for section in ("pilier_3a", "avs", "deductions"):
+        for cle, valeur in pack[section].items():
+            if not _est_nombre(valeur) or valeur < 0:
+                erreurs.append(f"{section}.{cle} : nombre positif attendu")
+
+    lpp = pack["lpp"]
+    for cle in ("seuil_entree", "deduction_coordination", "salaire_max", "taux_conversion", "taux_interet_minimal"):
+        if not _est_nombre(lpp.get(cle)) or lpp[cle] < 0:
+            erreurs.append(f"lpp.{cle} : nombre positif attendu")
+    tranches_age = sorted(lpp.get("taux_par_age", []))
+    for (_, fin, _), (debut, _, _) in zip(tranches_age, tranches_age[1:]):
+        if debut <= fin:
+            erreurs.append("lpp.taux_par_age : tranches d'âge qui se chevauchent")
+
+    for etat in ("seul", "marie"):
+        _valider_bareme(f"bareme_federal.{etat}", pack["bareme_federal"].get(etat), erreurs)
+
+    cantons = pack["cantons"]
+    for canton, info in cantons.items():
+        for cle in ("coefficient_cantonal", "coefficient_communal_moyen"):
+            if not _est_nombre(info.get(cle)):
+                erreurs.append(f"cantons.{canton}.{cle} : nombre attendu")
+        if not all(_est_nombre(v) for v in info.get("communes", {}).values()):
+            erreurs.append(f"cantons.{canton}.communes : coefficients numériques attendus")
+
+    for canton, info in pack["fortune"].items():
+        if canton not in cantons:
+            erreurs.append(f"fortune.{canton} : canton inconnu")
+        _valider_bareme(f"fortune.{canton}", info.get("bareme"), erreurs)
+    for canton, bareme in pack["retrait_capital"].get("baremes", {}).items():
+        if canton not in cantons:
+            erreurs.append(f"retrait_capital.{canton} : canton inconnu")
+        _valider_bareme(f"retrait_capital.{canton}", bareme, erreurs)
+
+    classes = pack["marches"].get("classes", {})
+    for classe, info in classes.items():
+        if not _est_nombre(info.get("rendement")):
+            erreurs.append(f"marches.{classe}.rendement : nombre attendu")
+        for cle in ("volatilite", "frais"):
+            if not _est_nombre(info.get(cle)) or info[cle] < 0:
+                erreurs.append(f"marches.{classe}.{cle} : nombre positif attendu")
+    correlations = pack["marches"].get("correlations", [])
+    n = len(classes)
+    if len(correlations) != n or any(not isinstance(l, list) or len(l) != n for l in correlations):
+        erreurs.append(f"marches.correlations : matrice {n}×{n} attendue (ordre des classes)")
+    elif not all(_est_nombre(c) and -1 <= c <= 1 for l in correlations for c in l):
+        erreurs.append("marches.correlations : coefficients dans [-1, 1] attendus")
+    elif any(correlations[i][i] != 1 or correlations[i][j] != correlations[j][i] for i in range(n) for j in range(n)):
+        erreurs.append("marches.correlations : matrice symétrique à diagonale 1 attendue")
+
+    if erreurs:
+        raise ValueError(f"Pack fiscal {annee} invalide : " + "; ".join(erreurs))
+
+
+def _tranches(bareme: list) -> list[tuple[float, float]]:
+    return [(float("inf") if seuil is None else seuil, taux) for seuil, taux in bareme]
+
+
+@lru_cache(maxsize=None)
+def _charger(annee: int) -> dict:
+    """Lit, valide et met en forme le pack (barèmes en tuples, seuil ouvert = inf)."""
+    with open(PACKS_DIR / f"{annee}.json", encoding="utf-8") as f:
+        pack = json.load(f)
+    _valider(pack, annee)
+
+    pack["lpp"]["taux_par_age"] = {(debut, fin): taux for debut, fin, taux in pack["lpp"]["taux_par_age"]}
+    pack["bareme_federal"] = {etat: _tranches(b) for etat, b in pack["bareme_federal"].items()}
+    for info in pack["fortune"].values():
+        info["bareme"] = _tranches(info["bareme"])
+    pack["retrait_capital"]["baremes"] = {
+        canton: _tranches(b) for canton, b in pack["retrait_capital"]["baremes"].items()
+    }
+    return pack
@@ -0,0 +1,112 @@
+"""
+Hachage des mots de passe (scrypt / PBKDF2 via hashlib).
+Chaque hash embarque son schéma et ses paramètres de coût, ce qui permet
+d'augmenter le coût plus tard : les anciens hash restent vérifiables et
+sont recalculés à la connexion suivante (`needs_rehash`).
+
+Formats stockés :
+    scrypt$<n>$<r>$<p>$<sel>$<hash>
+    pbkdf2_sha256$<iterations>$<sel>$<hash>
+    <64 caractères hex>   (SHA-256 non salé historique)
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Paramètres de coût (surcharge possible par variables d'environnement)
+DEFAULT_SCHEME = os.environ.get("FAP_PASSWORD_SCHEME", "scrypt")
+SCRYPT_N = int(os.environ.get("FAP_SCRYPT_N", 2**14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = int(os.environ.get("FAP_PBKDF2_ITERATIONS", 600_000))
+_SALT_BYTES = 16
+_DKLEN = 32
+
+# Les KDF relâchent le GIL : le rehash paresseux tourne hors du thread de la page
+_kdf_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fap-kdf")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text.encode("ascii"))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2), dklen=_DKLEN,
+    )
+
+
+def hash_password(password: str, scheme: str | None = None) -> str:
+    """Hash un mot de passe avec le schéma demandé (défaut : DEFAULT_SCHEME)."""
+    scheme = scheme or DEFAULT_SCHEME
+    salt = secrets.token_bytes(_SALT_BYTES)
+    if scheme == "scrypt":
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    if scheme == "pbkdf2_sha256":
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS, _DKLEN)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+    raise ValueError(f"Schéma de hachage inconnu : {scheme}")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Vérifie un mot de passe contre un hash stocké (tous formats)."""
+    if not stored:
+        return False
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            digest = _scrypt(password, _unb64(parts[4]), n, r, p)
+            return hmac.compare_digest(digest, _unb64(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            digest = hashlib.pbkdf2_hmac(
+                "sha256", password.encode(), _unb64(parts[2]), int(parts[1]), _DKLEN
+            )
+            return hmac.compare_digest(digest, _unb64(parts[3]))
+    except (ValueError, TypeError):
+        return False
+    if len(stored) == 64:
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+    return False
+
+
+def needs_rehash(stored: str) -> bool:
+    """True si le hash utilise un schéma historique ou des paramètres plus faibles."""
+    parts = stored.split("$")
+    if parts[0] != DEFAULT_SCHEME:
+        return True
+    if parts[0] == "scrypt":
+        return int(parts[1]) < SCRYPT_N
+    if parts[0] == "pbkdf2_sha256":
+        return int(parts[1]) < PBKDF2_ITERATIONS
+    return True
+
+
+def hash_password_async(password: str, scheme: str | None = None):
+    """Lance le hachage dans le pool KDF. Retourne un Future[str]."""
+    return _kdf_executor.submit(hash_password, password, scheme)
+
+
+def calibrer_scrypt(cible_ms: float = 100.0, n_max: int = 2**20) -> int:
+    """Retourne le plus grand N (puissance de 2) dont le coût reste sous `cible_ms` sur cette machine."""
+    n = 2**12
+    salt = secrets.token_bytes(_SALT_BYTES)
+    while n < n_max:
+        start = time.perf_counter()
+        _scrypt("calibration", salt, n * 2, SCRYPT_R, SCRYPT_P)
+        if (time.perf_counter() - start) * 1000 > cible_ms:
+            break
+        n *= 2
+    return n
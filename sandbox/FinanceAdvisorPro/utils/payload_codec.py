@@ -0,0 +1,170 @@
+"""
+Codecs de sérialisation des paramètres et résultats de simulation.
+Les payloads sont stockés en binaire compressé (JSON + zlib par défaut) ;
+les tableaux NumPy sont conservés comme buffers bruts.
+Les lignes historiques (JSON texte, codec 0) restent lisibles telles quelles.
+
+msgpack (FAP_PAYLOAD_CODEC=2) n'est utilisé en écriture que sur demande
+explicite : toutes les instances qui lisent la base doivent alors l'avoir
+installé, sinon elles ne peuvent pas décoder ces lignes.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # Dépendance optionnelle
+    msgpack = None
+
+CODEC_JSON = 0           # Texte JSON brut (lignes historiques)
+CODEC_JSON_ZLIB = 1      # En-tête JSON + buffers NumPy, compressé zlib
+CODEC_MSGPACK_ZLIB = 2   # msgpack + buffers NumPy, compressé zlib
+
+_ZLIB_LEVEL = 6
+_NDARRAY_KEY = "__ndarray__"
+_HEADER = struct.Struct("<I")
+
+
+def _pack_tree(obj, buffers: list):
+    """Remplace les tableaux NumPy par des références vers `buffers`."""
+    if isinstance(obj, dict):
+        return {str(k): _pack_tree(v, buffers) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_pack_tree(v, buffers) for v in obj]
+    if type(obj).__module__ == "numpy":
+        if hasattr(obj, "shape") and obj.shape != ():
+            buffers.append(obj.tobytes(order="C"))
+            return {
+                _NDARRAY_KEY: len(buffers) - 1,
+                "dtype": obj.dtype.str,
+                "shape": list(obj.shape),
+            }
+        return obj.item()  # Scalaires NumPy (np.float64, np.int64...)
+    return obj
+
+
+def _unpack_tree(obj, buffers: list):
+    """Reconstruit les tableaux NumPy référencés dans l'arbre décodé."""
+    if isinstance(obj, dict):
+        if _NDARRAY_KEY in obj:
+            import numpy as np
+
+            raw = buffers[obj[_NDARRAY_KEY]]
+            return np.frombuffer(raw, dtype=np.dtype(obj["dtype"])).reshape(obj["shape"]).copy()
+        return {k: _unpack_tree(v, buffers) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_unpack_tree(v, buffers) for v in obj]
+    return obj
+
+
+def _frame(head: bytes, buffers: list[bytes]) -> bytes:
+    """Concatène l'en-tête et les buffers bruts avec leurs longueurs."""
+    parts = [_HEADER.pack(len(buffers)), _HEADER.pack(len(head)), head]
+    for buf in buffers:
+        parts.append(_HEADER.pack(len(buf)))
+        parts.append(buf)
+    return zlib.compress(b"".join(parts), _ZLIB_LEVEL)
+
+
+def _unframe(blob: bytes) -> tuple[bytes, list[bytes]]:
+    """Opération inverse de `_frame`."""
+    data = zlib.decompress(blob)
+    n_buffers = _HEADER.unpack_from(data, 0)[0]
+    head_len = _HEADER.unpack_from(data, 4)[0]
+    offset = 8
+    head = data[offset:offset + head_len]
+    offset += head_len
+    buffers = []
+    for _ in range(n_buffers):
+        size = _HEADER.unpack_from(data, offset)[0]
+        offset += 4
+        buffers.append(data[offset:offset + size])
+        offset += size
+    return head, buffers
+
+
+def _encode_json_zlib(obj) -> bytes:
+    buffers = []
+    tree = _pack_tree(obj, buffers)
+    head = json.dumps(tree, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _frame(head, buffers)
+
+
+def _decode_json_zlib(blob: bytes):
+    head, buffers = _unframe(blob)
+    return _unpack_tree(json.loads(head.decode("utf-8")), buffers)
+
+
+def _encode_msgpack_zlib(obj) -> bytes:
+    buffers = []
+    tree = _pack_tree(obj, buffers)
+    return _frame(msgpack.packb(tree, use_bin_type=True), buffers)
+
+
+def _decode_msgpack_zlib(blob: bytes):
+    head, buffers = _unframe(blob)
+    return _unpack_tree(msgpack.unpackb(head, raw=False, strict_map_key=False), buffers)
+
+
+def _json_default(obj):
+    """Conversion des types NumPy pour le codec texte."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type non sérialisable : {type(obj).__name__}")
+
+
+def _encode_json(obj) -> str:
+    return json.dumps(obj, default=_json_default)
+
+
+def _decode_json(blob):
+    if isinstance(blob, (bytes, bytearray, memoryview)):
+        blob = bytes(blob).decode("utf-8")
+    return json.loads(blob or "{}")
+
+
+# Map codec id → (encode, decode)
+_CODECS = {
+    CODEC_JSON: (_encode_json, _decode_json),
+    CODEC_JSON_ZLIB: (_encode_json_zlib, _decode_json_zlib),
+}
+if msgpack is not None:
+    _CODECS[CODEC_MSGPACK_ZLIB] = (_encode_msgpack_zlib, _decode_msgpack_zlib)
+
+DEFAULT_CODEC = int(os.environ.get("FAP_PAYLOAD_CODEC", CODEC_JSON_ZLIB))
+if DEFAULT_CODEC not in _CODECS:
+    raise ValueError(f"FAP_PAYLOAD_CODEC={DEFAULT_CODEC} : codec indisponible (msgpack installé ?)")
+
+
+def register_codec(codec_id: int, encode, decode):
+    """Enregistre un codec supplémentaire (ex. zstd) sous un identifiant stable."""
+    _CODECS[codec_id] = (encode, decode)
+
+
+def encode_payload(obj, codec: int = DEFAULT_CODEC):
+    """Sérialise un payload avec le codec demandé."""
+    if codec not in _CODECS:
+        raise ValueError(f"Codec inconnu : {codec}")
+    return _CODECS[codec][0](obj)
+
+
+def content_hash(obj) -> str:
+    """Empreinte SHA-256 de la forme canonique (clés triées) d'un payload."""
+    canonical = json.dumps(
+        obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def decode_payload(blob, codec: int | None = CODEC_JSON):
+    """Désérialise un payload. `codec` NULL/0 = ligne historique en JSON texte."""
+    if blob is None:
+        return {}
+    codec = codec or CODEC_JSON
+    if codec not in _CODECS:
+        raise ValueError(f"Codec inconnu : {codec}")
+    return _CODECS[codec][1](blob)
@@ -0,0 +1,258 @@
+"""
+Graphiques vectoriels pour les rapports PDF.
+Les courbes, bandes de percentiles et barres sont tracées avec les
+primitives FPDF (polylignes, polygones, rectangles) à partir des séries
+numériques des moteurs — pas de navigateur headless ni de kaleido.
+
+La géométrie d'un graphique (liste d'opérations de dessin en coordonnées
+page) est mise en cache par empreinte des données et position : un même
+résultat réexporté ne refait que la sérialisation PDF.
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+
+from .payload_codec import content_hash
+
+CHART_COLORS = {
+    "axis": (160, 163, 177),
+    "grid": (40, 44, 58),
+    "text": (255, 255, 255),
+    "primary": (108, 99, 255),
+    "accent": (0, 212, 170),
+    "warning": (255, 179, 71),
+    "danger": (255, 107, 107),
+}
+
+_CACHE_SIZE = 512
+_geometry_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+_measure_pdf = None  # document de mesure des libellés (protégé par _cache_lock)
+
+
+def _align_texts(ops: list) -> tuple:
+    """Convertit les textes alignés (R/C) en positions absolues, une fois à la construction."""
+    global _measure_pdf
+    if _measure_pdf is None:
+        from fpdf import FPDF
+        _measure_pdf = FPDF()
+    resolved = []
+    for op in ops:
+        if op[0] == "font":
+            _measure_pdf.set_font("Helvetica", op[3] if len(op) > 3 else "", op[1])
+        elif op[0] == "text":
+            _, x, y, text, align = op
+            width = _measure_pdf.get_string_width(text)
+            if align == "R":
+                x -= width
+            elif align == "C":
+                x -= width / 2
+            op = ("text", float(x), float(y), text)
+        resolved.append(op)
+    return tuple(resolved)
+
+
+def _cached_geometry(kind: str, spec: dict, box: tuple, build) -> tuple:
+    """Retourne la géométrie en cache pour (type, empreinte des données, position)."""
+    key = (kind, content_hash(spec), box)
+    with _cache_lock:
+        ops = _geometry_cache.get(key)
+        if ops is not None:
+            _geometry_cache.move_to_end(key)
+            return ops
+        ops = _align_texts(build(spec, box))
+        _geometry_cache[key] = ops
+        if len(_geometry_cache) > _CACHE_SIZE:
+            _geometry_cache.popitem(last=False)
+    return ops
+
+
+def _nice_ticks(vmin: float, vmax: float, count: int = 4) -> list[float]:
+    """Graduations « rondes » couvrant [vmin, vmax]."""
+    if vmax <= vmin:
+        vmax = vmin + 1
+    raw = (vmax - vmin) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    start = math.floor(vmin / step) * step
+    return [start + i * step for i in range(int(math.ceil((vmax - start) / step)) + 1)]
+
+
+def _fmt_axis(value: float) -> str:
+    """Libellé compact d'axe (CHF 250k, CHF 1.2M)."""
+    if abs(value) >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M"
+    if abs(value) >= 1_000:
+        return f"{value / 1_000:.0f}k"
+    return f"{value:.0f}"
+
+
+def _axes_ops(box: tuple, ticks: list[float], scale_y, x_labels: list[tuple[float, str]]) -> list:
+    """Grille horizontale, libellés des axes."""
+    x0, y0, x1, y1 = box
+    ops = [("draw", CHART_COLORS["grid"]), ("width", 0.2)]
+    for tick in ticks:
+        y = scale_y(tick)
+        ops.append(("line", x0, y, x1, y))
+    ops.append(("font", 6, CHART_COLORS["axis"]))
+    for tick in ticks:
+        ops.append(("text", x0 - 1, scale_y(tick) + 1, _fmt_axis(tick), "R"))
+    for x, label in x_labels:
+        ops.append(("text", x, y1 + 4, label, "C"))
+    return ops
+
+
+def _legend_ops(box: tuple, entries: list[tuple[str, tuple]]) -> list:
+    x0, y0, _, _ = box
+    ops = [("font", 7, CHART_COLORS["axis"])]
+    x = x0
+    for label, color in entries:
+        ops += [("fill", color), ("rect", x, y0 - 5, 3, 2)]
+        ops.append(("text", x + 4, y0 - 3.2, label, "L"))
+        x += 6 + 1.6 * len(label)
+    return ops
+
+
+def _build_line_chart(spec: dict, box: tuple) -> list:
+    import numpy as np  # à la construction seulement : un graphique en cache n'en a pas besoin
+
+    x0, y0, x1, y1 = box
+    x = np.asarray(spec["x"], dtype=float)
+    series = [(label, tuple(color), np.asarray(values, dtype=float)) for label, color, values in spec["series"]]
+    bands = [(tuple(color), np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)) for color, lo, hi in spec["bands"]]
+
+    all_values = [v for _, _, v in series] + [b for _, lo, hi in bands for b in (lo, hi)]
+    vmin = min(0.0, min(float(v.min()) for v in all_values))
+    vmax = max(float(v.max()) for v in all_values)
+    ticks = _nice_ticks(vmin, vmax)
+    lo_t, hi_t = ticks[0], ticks[-1]
+
+    span_x = float(x[-1] - x[0]) or 1.0
+    px = x0 + (x - x[0]) / span_x * (x1 - x0)
+
+    def scale_y(v):
+        return y1 - (v - lo_t) / (hi_t - lo_t) * (y1 - y0)
+
+    step = max(1, len(x) // 8)
+    x_labels = [(float(px[i]), f"{x[i]:g}") for i in range(0, len(x), step)]
+    ops = _axes_ops(box, ticks, scale_y, x_labels)
+
+    for color, lo, hi in bands:
+        points = list(zip(px, scale_y(hi))) + list(zip(px[::-1], scale_y(lo)[::-1]))
+        ops += [("fill", color), ("polygon", tuple((float(a), float(b)) for a, b in points), 0.25)]
+
+    ops.append(("width", 0.6))
+    for _, color, values in series:
+        points = tuple((float(a), float(b)) for a, b in zip(px, scale_y(values)))
+        ops += [("draw", color), ("polyline", points)]
+
+    ops += _legend_ops(box, [(label, color) for label, color, _ in series])
+    return ops
+
+
+def _canton_code(name: str) -> str:
+    match = re.search(r"\(([A-Z]{2})\)", name)
+    return match.group(1) if match else name[:6]
+
+
+def _build_bar_chart(spec: dict, box: tuple) -> list:
+    import numpy as np
+
+    x0, y0, x1, y1 = box
+    values = np.asarray(spec["values"], dtype=float)
+    ticks = _nice_ticks(0.0, float(values.max()) if len(values) else 1.0)
+    hi_t = ticks[-1]
+
+    def scale_y(v):
+        return y1 - (v - ticks[0]) / (hi_t - ticks[0]) * (y1 - y0)
+
+    slot = (x1 - x0) / max(len(values), 1)
+    width = slot * 0.6
+    centers = x0 + slot * (np.arange(len(values)) + 0.5)
+    ops = _axes_ops(box, ticks, scale_y, [(float(c), _canton_code(lbl)) for c, lbl in zip(centers, spec["labels"])])
+
+    tops = scale_y(values)
+    for center, top, label in zip(centers, tops, spec["labels"]):
+        color = CHART_COLORS["accent"] if label == spec.get("highlight") else CHART_COLORS["primary"]
+        ops += [("fill", color), ("rect", float(center - width / 2), float(top), float(width), float(y1 - top))]
+
+    ops.append(("font", 6, CHART_COLORS["text"]))
+    for center, top, value in zip(centers, tops, values):
+        ops.append(("text", float(center), float(top) - 1, _fmt_axis(value), "C"))
+    return ops
+
+
+def _render(pdf, ops: tuple):
+    """Exécute une liste d'opérations de dessin."""
+    for op in ops:
+        kind = op[0]
+        if kind == "draw":
+            pdf.set_draw_color(*op[1])
+        elif kind == "fill":
+            pdf.set_fill_color(*op[1])
+        elif kind == "width":
+            pdf.set_line_width(op[1])
+        elif kind == "line":
+            pdf.line(*op[1:])
+        elif kind == "rect":
+            pdf.rect(*op[1:], "F")
+        elif kind == "polyline":
+            pdf.polyline(op[1])
+        elif kind == "polygon":
+            with pdf.local_context(fill_opacity=op[2]):
+                pdf.polygon(op[1], style="F")
+        elif kind == "font":
+            pdf.set_font("Helvetica", op[3] if len(op) > 3 else "", op[1])
+            pdf.set_text_color(*op[2])
+        elif kind == "text":
+            pdf.text(op[1], op[2], op[3])
+
+
+def record_drawing(ops: list) -> tuple:
+    """
+    Fige une suite d'opérations de dessin (mêmes opérations que les graphiques,
+    ("font", taille, couleur[, style]) compris) pour la rejouer avec `replay_drawing`.
+    """
+    with _cache_lock:
+        return _align_texts(ops)
+
+
+def replay_drawing(pdf, ops: tuple):
+    """Rejoue des opérations figées par `record_drawing` sur la page courante."""
+    _render(pdf, ops)
+
+
+def _reserve(pdf, height: float) -> tuple:
+    """Réserve la hauteur du graphique (saut de page si nécessaire). Retourne la zone de tracé."""
+    if pdf.get_y() + height > pdf.page_break_trigger:
+        pdf.add_page()
+    top = pdf.get_y()
+    pdf.set_y(top + height + 4)
+    return (22.0, round(top + 8, 2), 198.0, round(top + height - 6, 2))
+
+
+def draw_line_chart(pdf, x: list, series: list, bands: list | None = None, height: float = 70):
+    """
+    Trace des courbes (et bandes optionnelles) sous la position courante.
+
+    Args:
+        x: Abscisses (âges, années)
+        series: [(libellé, couleur RGB, valeurs)]
+        bands: [(couleur RGB, bornes basses, bornes hautes)] tracées en transparence
+    """
+    if len(x) < 2:
+        return
+    spec = {"x": list(x), "series": [list(s) for s in series], "bands": [list(b) for b in bands or []]}
+    box = _reserve(pdf, height)
+    _render(pdf, _cached_geometry("line", spec, box, _build_line_chart))
+
+
+def draw_bar_chart(pdf, labels: list[str], values: list[float], highlight: str | None = None, height: float = 70):
+    """Trace un histogramme (la barre `highlight` est mise en évidence)."""
+    if not values:
+        return
+    spec = {"labels": list(labels), "values": list(values), "highlight": highlight}
+    box = _reserve(pdf, height)
+    _render(pdf, _cached_geometry("bar", spec, box, _build_bar_chart))
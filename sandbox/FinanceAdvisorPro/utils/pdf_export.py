@@ -4,12 +4,14 @@ Genere des PDF pour chaque module de simulation avec couverture,
 KPIs, tableaux et conseils.
 """
 
-import io
-import os
 import re
+import threading
 from datetime import datetime
+from functools import lru_cache
 from fpdf import FPDF
 
+from .pdf_charts import draw_line_chart, draw_bar_chart, record_drawing, replay_drawing
+
 
 # ─── Couleurs ────────────────────────────────────────────────
 COLORS = {
@@ -24,24 +26,52 @@ COLORS = {
 }
 
 
+# Emojis et symboles non supportes par Helvetica/latin-1 (compile une seule fois)
+_SYMBOL_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002702-\U000027B0"  # dingbats
+    "\U000024C2-\U0001F251"
+    "\U0001f900-\U0001f9FF"  # supplemental symbols
+    "\U00002600-\U000026FF"  # misc symbols
+    "\U0000FE00-\U0000FE0F"  # variation selectors
+    "\U0000200D"             # ZWJ
+    "]+",
+    flags=re.UNICODE,
+)
+
+_DISCLAIMER = (
+    "Ce rapport est fourni a titre indicatif et ne constitue pas un conseil financier. "
+    "Les projections sont basees sur des hypotheses simplifiees. "
+    "Consultez un professionnel certifie pour toute decision financiere."
+)
+
+
+@lru_cache(maxsize=4096)
 def _clean_text(text: str) -> str:
     """Remove characters not supported by Helvetica/latin-1 (e.g. emojis)."""
-    symbol_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002702-\U000027B0"  # dingbats
-        "\U000024C2-\U0001F251"
-        "\U0001f900-\U0001f9FF"  # supplemental symbols
-        "\U00002600-\U000026FF"  # misc symbols
-        "\U0000FE00-\U0000FE0F"  # variation selectors
-        "\U0000200D"             # ZWJ
-        "]+",
-        flags=re.UNICODE,
-    )
-    return symbol_pattern.sub("", text).strip()
+    return _SYMBOL_PATTERN.sub("", text).strip()
+
+
+# Document de mesure partage pour le calcul des retours a la ligne : son etat
+# de police est modifie a chaque mesure, d'ou le verrou (sessions = threads)
+_measure_pdf = None
+_measure_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2048)
+def _wrap_lines(text: str, width: float, style: str, size: int) -> tuple[str, ...]:
+    """Decoupe un texte en lignes pour une largeur donnee (resultat mis en cache)."""
+    global _measure_pdf
+    with _measure_lock:
+        if _measure_pdf is None:
+            _measure_pdf = FPDF()
+            _measure_pdf.add_page()
+        _measure_pdf.set_font("Helvetica", style, size)
+        return tuple(_measure_pdf.multi_cell(width, 4, text, dry_run=True, output="LINES"))
 
 
 class FinanceAdvisorPDF(FPDF):
@@ -53,6 +83,8 @@ class FinanceAdvisorPDF(FPDF):
         self.client_name = client_name
         self.module_name = module
         self.set_auto_page_break(auto=True, margin=20)
+        # Fond sombre applique a chaque page (y compris les sauts automatiques)
+        self.set_page_background(COLORS["dark"])
 
     def header(self):
         if self.page_no() == 1:
@@ -72,55 +104,82 @@ class FinanceAdvisorPDF(FPDF):
         self.set_text_color(*COLORS["muted"])
         self.cell(0, 10, f"Finance Advisor Pro - Rapport confidentiel - Page {self.page_no()}/{{nb}}", align="C")
 
+    def write_lines(self, lines: tuple[str, ...], height: float, align: str = "L", x: float | None = None, width: float = 0):
+        """Ecrit des lignes deja decoupees (evite le line-breaking de multi_cell)."""
+        for line in lines:
+            if x is not None:
+                self.set_x(x)
+            self.cell(width, height, line, align=align, new_x="LMARGIN", new_y="NEXT")
+
+
+def _centered_text(y: float, height: float, size: int, text: str) -> tuple:
+    """Texte centre sur la page, a la ligne de base d'une cellule (y, height)."""
+    return ("text", 105, y + 0.5 * height + 0.3 * size * 25.4 / 72, text, "C")
+
+
+class CoverTemplate:
+    """
+    Page de couverture d'un conseiller, enregistree une fois par
+    (theme, conseiller, titre de module) : barres, textes fixes et mentions
+    legales sont figes en operations de dessin (voir pdf_charts), puis
+    rejoues sur chaque rapport. Seuls le client et la date sont ecrits a
+    chaque export.
+    """
+
+    def __init__(self, advisor_name: str, module_title: str, theme: tuple):
+        colors = dict(theme)
+        disclaimer = _wrap_lines(_DISCLAIMER, 190, "I", 7)
+        ops = [
+            # Primary accent bar
+            ("fill", colors["primary"]), ("rect", 0, 80, 210, 4),
+            # Title
+            ("font", 28, colors["text"], "B"), _centered_text(100, 15, 28, _clean_text(module_title)),
+            # Subtitle
+            ("font", 14, colors["muted"]), _centered_text(115, 10, 14, "Rapport de simulation personnalise"),
+            # Accent bar
+            ("fill", colors["accent"]), ("rect", 80, 130, 50, 2),
+            # Advisor
+            ("font", 10, colors["muted"]), _centered_text(168, 8, 10, _clean_text(f"Conseiller : {advisor_name}")),
+            # Disclaimer
+            ("font", 7, colors["muted"], "I"),
+        ]
+        ops += [_centered_text(250 + 4 * i, 4, 7, line) for i, line in enumerate(disclaimer)]
+        self.ops = record_drawing(ops)
+        self.colors = colors
+
+    def draw(self, pdf: FinanceAdvisorPDF):
+        pdf.add_page()
+        replay_drawing(pdf, self.ops)
+
+        # Client & date
+        pdf.set_y(160)
+        pdf.set_font("Helvetica", "", 12)
+        pdf.set_text_color(*self.colors["text"])
+        pdf.cell(0, 8, _clean_text(f"Client : {pdf.client_name}"), align="C", new_x="LMARGIN", new_y="NEXT")
+
+        pdf.set_y(176)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.set_text_color(*self.colors["muted"])
+        pdf.cell(0, 8, f"Date : {datetime.now().strftime('%d/%m/%Y %H:%M')}", align="C", new_x="LMARGIN", new_y="NEXT")
+
+
+@lru_cache(maxsize=256)
+def _cover_template(advisor_name: str, module_title: str, theme: tuple) -> CoverTemplate:
+    return CoverTemplate(advisor_name, module_title, theme)
+
 
 def _add_cover_page(pdf: FinanceAdvisorPDF, module_title: str):
     """Ajoute une page de couverture professionnelle."""
-    pdf.add_page()
-
-    # Background
-    pdf.set_fill_color(*COLORS["dark"])
-    pdf.rect(0, 0, 210, 297, "F")
-
-    # Primary accent bar
-    pdf.set_fill_color(*COLORS["primary"])
-    pdf.rect(0, 80, 210, 4, "F")
-
-    # Title
-    pdf.set_y(100)
-    pdf.set_font("Helvetica", "B", 28)
-    pdf.set_text_color(*COLORS["text"])
-    pdf.cell(0, 15, module_title, align="C", new_x="LMARGIN", new_y="NEXT")
+    _cover_template(pdf.advisor_name, module_title, tuple(COLORS.items())).draw(pdf)
 
-    # Subtitle
-    pdf.set_font("Helvetica", "", 14)
-    pdf.set_text_color(*COLORS["muted"])
-    pdf.cell(0, 10, "Rapport de simulation personnalise", align="C", new_x="LMARGIN", new_y="NEXT")
 
-    # Accent bar
-    pdf.set_fill_color(*COLORS["accent"])
-    pdf.rect(80, pdf.get_y() + 5, 50, 2, "F")
-
-    # Client & advisor info
-    pdf.set_y(160)
-    pdf.set_font("Helvetica", "", 12)
-    pdf.set_text_color(*COLORS["text"])
-    pdf.cell(0, 8, f"Client : {pdf.client_name}", align="C", new_x="LMARGIN", new_y="NEXT")
-
-    pdf.set_font("Helvetica", "", 10)
-    pdf.set_text_color(*COLORS["muted"])
-    pdf.cell(0, 8, f"Conseiller : {pdf.advisor_name}", align="C", new_x="LMARGIN", new_y="NEXT")
-    pdf.cell(0, 8, f"Date : {datetime.now().strftime('%d/%m/%Y %H:%M')}", align="C", new_x="LMARGIN", new_y="NEXT")
-
-    # Disclaimer
-    pdf.set_y(250)
-    pdf.set_font("Helvetica", "I", 7)
-    pdf.set_text_color(*COLORS["muted"])
-    pdf.multi_cell(0, 4,
-        "Ce rapport est fourni a titre indicatif et ne constitue pas un conseil financier. "
-        "Les projections sont basees sur des hypotheses simplifiees. "
-        "Consultez un professionnel certifie pour toute decision financiere.",
-        align="C",
-    )
+def _new_report(advisor_name: str, client_name: str, module: str, title: str) -> FinanceAdvisorPDF:
+    """Cree un rapport avec sa couverture et ouvre la premiere page de contenu."""
+    pdf = FinanceAdvisorPDF(advisor_name, client_name, module)
+    pdf.alias_nb_pages()
+    _add_cover_page(pdf, title)
+    pdf.add_page()
+    return pdf
 
 
 def _add_section_title(pdf: FinanceAdvisorPDF, title: str):
@@ -176,13 +235,13 @@ def _add_table(pdf: FinanceAdvisorPDF, headers: list[str], rows: list[list[str]]
 
     # Rows
     pdf.set_font("Helvetica", "", 9)
+    pdf.set_text_color(*COLORS["text"])
     for i, row in enumerate(rows):
         if i % 2 == 0:
             pdf.set_fill_color(*COLORS["bg_card"])
         else:
             pdf.set_fill_color(20, 23, 35)
 
-        pdf.set_text_color(*COLORS["text"])
         for cell in row:
             pdf.cell(col_width, 7, _clean_text(str(cell)), border=0, fill=True, align="C")
         pdf.ln()
@@ -213,7 +272,7 @@ def _add_advice(pdf: FinanceAdvisorPDF, advices: list[tuple[str, str]]):
         pdf.set_xy(16, y + 8)
         pdf.set_font("Helvetica", "", 8)
         pdf.set_text_color(*COLORS["muted"])
-        pdf.multi_cell(178, 4, _clean_text(desc))
+        pdf.write_lines(_wrap_lines(_clean_text(desc), 178, "", 8), 4, x=16, width=178)
 
         pdf.set_y(y + 22)
 
@@ -229,22 +288,17 @@ def export_budget_pdf(
     results: dict,
 ) -> bytes:
     """Genere un rapport PDF pour le module Budget."""
-    pdf = FinanceAdvisorPDF(advisor_name, client_name, "Module Budget")
-    pdf.alias_nb_pages()
-
-    _add_cover_page(pdf, "Gestion Budgetaire")
+    from .budget import analyse_budget  # moteur numpy, seulement pour ce rapport
 
-    # Page 2 -- Resultats
-    pdf.add_page()
-    pdf.set_fill_color(*COLORS["dark"])
-    pdf.rect(0, 0, 210, 297, "F")
+    pdf = _new_report(advisor_name, client_name, "Module Budget", "Gestion Budgetaire")
+    analyse = analyse_budget(params)
 
     _add_section_title(pdf, "Bilan mensuel")
     _add_kpi_row(pdf, [
-        ("Revenus totaux", f"CHF {results.get('revenu_total', 0):,}"),
-        ("Depenses totales", f"CHF {results.get('total_depenses', 0):,}"),
-        ("Solde disponible", f"CHF {results.get('solde', 0):,}"),
-        ("Taux d'epargne", f"{results.get('taux_epargne', 0)}%"),
+        ("Revenus totaux", f"CHF {analyse['revenu_total']:,}"),
+        ("Depenses totales", f"CHF {analyse['total_depenses']:,}"),
+        ("Solde disponible", f"CHF {analyse['solde']:,}"),
+        ("Taux d'epargne", f"{analyse['taux_epargne']}%"),
     ])
 
     # Detail revenus
@@ -291,14 +345,15 @@ def export_budget_pdf(
 
     # Conseils
     advices = []
-    rev = results.get("revenu_total", 1)
-    if rev > 0 and params.get("loyer", 0) / rev * 100 > 33:
-        advices.append(("Logement eleve", f"Le loyer represente {params['loyer']/rev*100:.1f}% du revenu (recommande : max 33%)."))
-    if results.get("taux_epargne", 0) < 10:
+    alertes = analyse["alertes"]
+    if alertes["logement"]:
+        pct_logement = analyse["comparaison"]["Logement"]["client_pct"]
+        advices.append(("Logement eleve", f"Le loyer represente {pct_logement:.1f}% du revenu (recommande : max 33%)."))
+    if alertes["epargne_faible"]:
         advices.append(("Taux d'epargne insuffisant", "L'ideal suisse est 15-20%. Identifiez les depenses a reduire."))
-    elif results.get("taux_epargne", 0) >= 20:
+    elif alertes["epargne_excellente"]:
         advices.append(("Excellent taux d'epargne", "Vous epargnez plus de 20%. Pensez a investir le surplus."))
-    if params.get("prevoyance_3a", 0) < 588:
+    if alertes["pilier_3a"]:
         advices.append(("Optimisez votre 3eme pilier", f"Vous versez CHF {params.get('prevoyance_3a', 0)}/mois. Le max est CHF 588/mois."))
 
     if advices:
@@ -315,14 +370,7 @@ def export_fiscalite_pdf(
     results: dict,
 ) -> bytes:
     """Genere un rapport PDF pour le module Fiscalite."""
-    pdf = FinanceAdvisorPDF(advisor_name, client_name, "Module Fiscalite")
-    pdf.alias_nb_pages()
-
-    _add_cover_page(pdf, "Simulateur Fiscal")
-
-    pdf.add_page()
-    pdf.set_fill_color(*COLORS["dark"])
-    pdf.rect(0, 0, 210, 297, "F")
+    pdf = _new_report(advisor_name, client_name, "Module Fiscalite", "Simulateur Fiscal")
 
     _add_section_title(pdf, "Resultats de la simulation")
     _add_kpi_row(pdf, [
@@ -344,18 +392,24 @@ def export_fiscalite_pdf(
             ["Enfants", str(params.get("enfants", 0))],
             ["Deduction 3a", f"CHF {params.get('deduction_3a', 0):,}"],
             ["Rachat LPP", f"CHF {params.get('rachat_lpp', 0):,}"],
+            ["Fortune nette", f"CHF {params.get('fortune', 0):,}"],
         ],
     )
 
     _add_section_title(pdf, "Decomposition de l'impot")
-    _add_table(pdf,
-        ["Niveau", "Montant"],
-        [
-            ["Federal", f"CHF {results.get('impot_federal', 0):,.0f}"],
-            ["Cantonal", f"CHF {results.get('impot_cantonal', 0):,.0f}"],
-            ["Communal", f"CHF {results.get('impot_communal', 0):,.0f}"],
-        ],
-    )
+    niveaux = [
+        ["Federal", f"CHF {results.get('impot_federal', 0):,.0f}"],
+        ["Cantonal", f"CHF {results.get('impot_cantonal', 0):,.0f}"],
+        ["Communal", f"CHF {results.get('impot_communal', 0):,.0f}"],
+    ]
+    if results.get("impot_fortune"):
+        niveaux.append(["Fortune", f"CHF {results['impot_fortune']:,.0f}"])
+    _add_table(pdf, ["Niveau", "Montant"], niveaux)
+
+    comparaison = results.get("comparaison_cantons")
+    if comparaison and comparaison.get("cantons"):
+        _add_section_title(pdf, "Comparaison inter-cantonale")
+        draw_bar_chart(pdf, comparaison["cantons"], comparaison["impots"], highlight=params.get("canton"))
 
     return bytes(pdf.output())
 
@@ -367,14 +421,7 @@ def export_prevoyance_pdf(
     results: dict,
 ) -> bytes:
     """Genere un rapport PDF pour le module Prevoyance."""
-    pdf = FinanceAdvisorPDF(advisor_name, client_name, "Module Prevoyance")
-    pdf.alias_nb_pages()
-
-    _add_cover_page(pdf, "Prevoyance Retraite")
-
-    pdf.add_page()
-    pdf.set_fill_color(*COLORS["dark"])
-    pdf.rect(0, 0, 210, 297, "F")
+    pdf = _new_report(advisor_name, client_name, "Module Prevoyance", "Prevoyance Retraite")
 
     _add_section_title(pdf, "Projection globale")
     _add_kpi_row(pdf, [
@@ -406,6 +453,19 @@ def export_prevoyance_pdf(
         ],
     )
 
+    evolution_lpp = results.get("evolution_lpp")
+    if evolution_lpp and evolution_lpp.get("ages"):
+        _add_section_title(pdf, "Projection du capital LPP")
+        draw_line_chart(pdf, evolution_lpp["ages"], [("Capital LPP", COLORS["primary"], evolution_lpp["capital"])])
+
+    evolution_3a = results.get("evolution_3a")
+    if evolution_3a and evolution_3a.get("annees"):
+        _add_section_title(pdf, "Projection du capital 3a")
+        draw_line_chart(pdf, evolution_3a["annees"], [
+            ("Capital total", COLORS["accent"], evolution_3a["capital"]),
+            ("Montant verse", COLORS["muted"], evolution_3a["verse"]),
+        ])
+
     # Gap analysis advice
     gap = results.get("gap_mensuel", 0)
     taux = results.get("taux_remplacement", 0)
@@ -428,14 +488,7 @@ def export_investissements_pdf(
     results: dict,
 ) -> bytes:
     """Genere un rapport PDF pour le module Investissements."""
-    pdf = FinanceAdvisorPDF(advisor_name, client_name, "Module Investissements")
-    pdf.alias_nb_pages()
-
-    _add_cover_page(pdf, "Simulateur d'Investissement")
-
-    pdf.add_page()
-    pdf.set_fill_color(*COLORS["dark"])
-    pdf.rect(0, 0, 210, 297, "F")
+    pdf = _new_report(advisor_name, client_name, "Module Investissements", "Simulateur d'Investissement")
 
     _add_section_title(pdf, "Resultats de la simulation")
     _add_kpi_row(pdf, [
@@ -458,6 +511,26 @@ def export_investissements_pdf(
         ],
     )
 
+    evolution = results.get("evolution")
+    if evolution and evolution.get("annees"):
+        _add_section_title(pdf, "Evolution du capital")
+        draw_line_chart(pdf, evolution["annees"], [
+            ("Capital total", COLORS["primary"], evolution["capital"]),
+            ("Montant verse", COLORS["muted"], evolution["verse"]),
+        ])
+
+    mc = results.get("monte_carlo")
+    if mc and mc.get("annees"):
+        _add_section_title(pdf, f"Simulation Monte Carlo - profil {mc.get('profil', '')}")
+        draw_line_chart(
+            pdf, mc["annees"],
+            [("Mediane", COLORS["accent"], mc["p50"])],
+            bands=[
+                (COLORS["primary"], mc["p5"], mc["p95"]),
+                (COLORS["primary"], mc["p25"], mc["p75"]),
+            ],
+        )
+
     # Power of compound interest
     total_verse = results.get("total_verse", 0)
     total_interets = results.get("total_interets", 0)
@@ -471,3 +544,12 @@ def export_investissements_pdf(
         ])
 
     return bytes(pdf.output())
+
+
+# Module de simulation → (libelle, fonction d'export)
+REPORT_EXPORTS = {
+    "budget": ("Budget", export_budget_pdf),
+    "fiscalite": ("Fiscalité", export_fiscalite_pdf),
+    "prevoyance": ("Prévoyance", export_prevoyance_pdf),
+    "investissements": ("Investissements", export_investissements_pdf),
+}
@@ -1,44 +1,40 @@
 """
 Calculs de prévoyance suisse — 3 piliers.
+Rentes AVS, seuils LPP et plafond 3a viennent du pack fiscal de l'année
+`annee` (None = pack le plus récent).
 """
 
 import numpy as np
 
 from .constants import (
-    RENTE_AVS_MAX_MENSUELLE,
-    RENTE_AVS_MIN_MENSUELLE,
-    SALAIRE_AVS_MAX_POUR_RENTE,
-    SEUIL_ENTREE_LPP,
-    DEDUCTION_COORDINATION,
-    SALAIRE_MAX_LPP,
-    TAUX_CONVERSION_LPP,
-    TAUX_LPP_PAR_AGE,
-    TAUX_INTERET_LPP,
     TAUX_INTERET_3A_MOYEN,
     TAUX_INTERET_3A_FONDS,
     PILIER_3A_SALARIE,
     AGE_RETRAITE_HOMMES,
 )
+from .parameter_packs import charger_pack
 
 
-def estimation_rente_avs(salaire_annuel_moyen: float, annees_cotisation: int = 44) -> dict:
+def estimation_rente_avs(salaire_annuel_moyen: float, annees_cotisation: int = 44, annee: int | None = None) -> dict:
     """
     Estime la rente AVS mensuelle basée sur le salaire moyen et les années de cotisation.
     Échelle complète = 44 ans de cotisation.
     """
+    avs = charger_pack(annee)["avs"]
+
     # Fraction de la rente complète
     fraction = min(annees_cotisation / 44, 1.0)
 
     # Calcul proportionnel au salaire (simplifié)
-    if salaire_annuel_moyen >= SALAIRE_AVS_MAX_POUR_RENTE:
-        rente_base = RENTE_AVS_MAX_MENSUELLE
+    if salaire_annuel_moyen >= avs["salaire_max_pour_rente"]:
+        rente_base = avs["rente_max_mensuelle"]
     elif salaire_annuel_moyen <= 0:
         rente_base = 0
     else:
-        ratio = salaire_annuel_moyen / SALAIRE_AVS_MAX_POUR_RENTE
+        ratio = salaire_annuel_moyen / avs["salaire_max_pour_rente"]
         # Formule simplifiée avec effet dégressif
-        rente_base = RENTE_AVS_MIN_MENSUELLE + (
-            (RENTE_AVS_MAX_MENSUELLE - RENTE_AVS_MIN_MENSUELLE) * ratio
+        rente_base = avs["rente_min_mensuelle"] + (
+            (avs["rente_max_mensuelle"] - avs["rente_min_mensuelle"]) * ratio
         )
 
     rente_mensuelle = round(rente_base * fraction, 2)
@@ -57,20 +53,24 @@ def projection_lpp(
     age_actuel: int,
     capital_actuel_lpp: float = 0,
     age_retraite: int = AGE_RETRAITE_HOMMES,
+    annee: int | None = None,
 ) -> dict:
     """
     Projette le capital LPP à la retraite.
     """
-    if salaire_annuel < SEUIL_ENTREE_LPP:
+    lpp = charger_pack(annee)["lpp"]
+    taux_conversion = lpp["taux_conversion"]
+
+    if salaire_annuel < lpp["seuil_entree"]:
         return {
             "capital_projete": capital_actuel_lpp,
-            "rente_annuelle": round(capital_actuel_lpp * TAUX_CONVERSION_LPP, 2),
-            "rente_mensuelle": round(capital_actuel_lpp * TAUX_CONVERSION_LPP / 12, 2),
+            "rente_annuelle": round(capital_actuel_lpp * taux_conversion, 2),
+            "rente_mensuelle": round(capital_actuel_lpp * taux_conversion / 12, 2),
             "message": "Salaire inférieur au seuil d'entrée LPP.",
             "evolution": [],
         }
 
-    salaire_coordonne = min(salaire_annuel, SALAIRE_MAX_LPP) - DEDUCTION_COORDINATION
+    salaire_coordonne = min(salaire_annuel, lpp["salaire_max"]) - lpp["deduction_coordination"]
     salaire_coordonne = max(salaire_coordonne, 0)
 
     capital = capital_actuel_lpp
@@ -79,17 +79,17 @@ def projection_lpp(
     for age in range(age_actuel, age_retraite):
         # Trouver le taux de cotisation selon l'âge
         taux = 0
-        for (age_min, age_max), t in TAUX_LPP_PAR_AGE.items():
+        for (age_min, age_max), t in lpp["taux_par_age"].items():
             if age_min <= age <= age_max:
                 taux = t * 2  # Total (employeur + employé)
                 break
 
         cotisation_annuelle = salaire_coordonne * taux
-        interests = capital * TAUX_INTERET_LPP
+        interests = capital * lpp["taux_interet_minimal"]
         capital += cotisation_annuelle + interests
         evolution.append({"age": age + 1, "capital": round(capital, 2)})
 
-    rente_annuelle = round(capital * TAUX_CONVERSION_LPP, 2)
+    rente_annuelle = round(capital * taux_conversion, 2)
 
     return {
         "capital_projete": round(capital, 2),
@@ -105,11 +105,12 @@ def simulation_3a(
     annees: int = 30,
     taux_rendement: float = TAUX_INTERET_3A_MOYEN,
     capital_initial: float = 0,
+    annee: int | None = None,
 ) -> dict:
     """
     Simule l'épargne 3ème pilier a avec intérêts composés.
     """
-    versement_annuel = min(versement_annuel, PILIER_3A_SALARIE)
+    versement_annuel = min(versement_annuel, charger_pack(annee)["pilier_3a"]["salarie"])
     capital = capital_initial
     total_verse = capital_initial
     evolution = [{"annee": 0, "capital": round(capital, 2), "verse": round(total_verse, 2)}]
@@ -142,6 +143,7 @@ def projection_retraite_globale(
     taux_rendement_3a: float = TAUX_INTERET_3A_MOYEN,
     annees_cotisation_avs: int = 44,
     age_retraite: int = AGE_RETRAITE_HOMMES,
+    annee: int | None = None,
 ) -> dict:
     """
     Projection combinée des 3 piliers pour estimer le revenu de retraite.
@@ -149,13 +151,13 @@ def projection_retraite_globale(
     annees_restantes = max(0, age_retraite - age_actuel)
 
     # 1er pilier — AVS
-    avs = estimation_rente_avs(salaire_annuel, annees_cotisation_avs)
+    avs = estimation_rente_avs(salaire_annuel, annees_cotisation_avs, annee)
 
     # 2ème pilier — LPP
-    lpp = projection_lpp(salaire_annuel, age_actuel, capital_lpp_actuel, age_retraite)
+    lpp = projection_lpp(salaire_annuel, age_actuel, capital_lpp_actuel, age_retraite, annee)
 
     # 3ème pilier — 3a
-    pilier_3a = simulation_3a(versement_3a_annuel, annees_restantes, taux_rendement_3a, capital_3a_actuel)
+    pilier_3a = simulation_3a(versement_3a_annuel, annees_restantes, taux_rendement_3a, capital_3a_actuel, annee)
 
     # Rente totale estimée
     rente_mensuelle_avs = avs["rente_mensuelle"]
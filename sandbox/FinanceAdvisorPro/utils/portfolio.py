@@ -0,0 +1,219 @@
+"""
+Simulation multi-actifs corrélée d'un portefeuille.
+Chaque classe d'actifs de l'allocation évolue avec son propre rendement,
+sa volatilité et ses frais (hypothèses de marché du pack de l'année) ; les
+chocs mensuels sont corrélés par le facteur de Cholesky de la matrice de
+corrélation, calculé une fois par pack. Les profils (PROFILS_INVESTISSEMENT)
+gardent leur rendement et leur volatilité pour le modèle paramétrique.
+
+Toutes les trajectoires (et, pour les balayages, toutes les variantes
+d'allocation ou de rebalancement) avancent ensemble, mois par mois, sur les
+mêmes tirages : les variantes se comparent à aléa égal.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .investment import _resume_simulation
+from .parameter_packs import charger_pack, resoudre_annee
+
+N_SIMULATIONS = 10_000
+REBALANCEMENT_MOIS = 12  # 0 = jamais (les avoirs dérivent avec les marchés)
+
+
+@lru_cache(maxsize=None)
+def _marches(annee: int) -> tuple:
+    """(classes, rendements, volatilités, frais, facteur de Cholesky), tableaux en lecture seule."""
+    marches = charger_pack(annee)["marches"]
+    classes = tuple(marches["classes"])
+    infos = [marches["classes"][c] for c in classes]
+    rendements = np.array([i["rendement"] for i in infos], dtype=float)
+    volatilites = np.array([i["volatilite"] for i in infos], dtype=float)
+    frais = np.array([i["frais"] for i in infos], dtype=float)
+    try:
+        cholesky = np.linalg.cholesky(np.array(marches["correlations"], dtype=float))
+    except np.linalg.LinAlgError:
+        raise ValueError(f"Pack {annee} : matrice de corrélation non définie positive") from None
+    for table in (rendements, volatilites, frais, cholesky):
+        table.flags.writeable = False
+    return classes, rendements, volatilites, frais, cholesky
+
+
+def hypotheses_marches(annee: int | None = None) -> dict:
+    """Hypothèses de marché du pack : {"classes", "rendements", "volatilites", "frais", "correlations"}."""
+    classes, rendements, volatilites, frais, cholesky = _marches(resoudre_annee(annee))
+    return {
+        "classes": classes,
+        "rendements": rendements,
+        "volatilites": volatilites,
+        "frais": frais,
+        "correlations": cholesky @ cholesky.T,
+    }
+
+
+def poids_allocation(allocation: dict, classes: tuple[str, ...]) -> np.ndarray:
+    """Allocation en % → poids normalisés dans l'ordre des classes."""
+    inconnues = [c for c, pct in allocation.items() if pct and c not in classes]
+    if inconnues:
+        raise ValueError(f"Classes d'actifs inconnues : {', '.join(inconnues)}")
+    poids = np.array([allocation.get(c, 0) for c in classes], dtype=float)
+    if poids.min() < 0 or poids.sum() <= 0:
+        raise ValueError("Allocation invalide : poids positifs de somme non nulle attendus")
+    return poids / poids.sum()
+
+
+def _trajectoires(
+    poids: np.ndarray,
+    capital_initial: float,
+    versement_mensuel: float,
+    annees: int,
+    rebalancement: np.ndarray,
+    n_simulations: int,
+    frais: np.ndarray | None,
+    graine: int,
+    annee: int | None,
+    par_actif: bool,
+) -> np.ndarray:
+    """
+    Avoirs en fin d'année pour chaque variante (ligne de `poids`, fréquence
+    de rebalancement associée) : (variantes, simulations, années + 1, classes)
+    si `par_actif`, sinon les totaux (variantes, simulations, années + 1).
+    Les versements sont investis selon l'allocation cible.
+    """
+    _, rendements, volatilites, frais_pack, cholesky = _marches(resoudre_annee(annee))
+    frais = frais_pack if frais is None else frais
+    derive = 1 + rendements / 12
+    echelle = volatilites / np.sqrt(12)
+    net = 1 - frais / 12
+
+    rng = np.random.default_rng(graine)
+    avoirs = np.broadcast_to(capital_initial * poids[:, None, :], (len(poids), n_simulations, poids.shape[1])).copy()
+    versement = versement_mensuel * poids[:, None, :]
+    forme = avoirs.shape[:2] + (annees + 1,) + ((poids.shape[1],) if par_actif else ())
+    annuel = np.empty(forme)
+    annuel[:, :, 0] = avoirs if par_actif else avoirs.sum(axis=-1)
+
+    for m in range(1, annees * 12 + 1):
+        chocs = rng.standard_normal((n_simulations, len(cholesky))) @ cholesky.T
+        croissance = np.maximum(derive + echelle * chocs, 0) * net            # (simulations, classes)
+        avoirs *= croissance
+        avoirs += versement
+        a_rebalancer = (rebalancement > 0) & (m % np.maximum(rebalancement, 1) == 0)
+        if a_rebalancer.any():
+            avoirs[a_rebalancer] = avoirs[a_rebalancer].sum(axis=-1, keepdims=True) * poids[a_rebalancer, None, :]
+        if m % 12 == 0:
+            annuel[:, :, m // 12] = avoirs if par_actif else avoirs.sum(axis=-1)
+    return annuel
+
+
+def _frais(frais: dict | None, classes: tuple[str, ...], annee: int | None) -> np.ndarray | None:
+    """Frais annuels par classe : ceux du pack, remplacés par `frais` là où ils sont fournis."""
+    if not frais:
+        return None
+    inconnues = [c for c in frais if c not in classes]
+    if inconnues:
+        raise ValueError(f"Classes d'actifs inconnues : {', '.join(inconnues)}")
+    defaut = _marches(resoudre_annee(annee))[3]
+    return np.array([frais.get(c, defaut[k]) for k, c in enumerate(classes)], dtype=float)
+
+
+def simuler_portefeuille(
+    capital_initial: float,
+    versement_mensuel: float,
+    allocation: dict,
+    annees: int,
+    rebalancement: int = REBALANCEMENT_MOIS,
+    n_simulations: int = N_SIMULATIONS,
+    frais: dict | None = None,
+    graine: int = 42,
+    annee: int | None = None,
+) -> dict:
+    """
+    Simulation Monte Carlo multi-actifs d'une allocation.
+
+    Args:
+        allocation: {classe: %}, par ex. PROFILS_INVESTISSEMENT[...]["allocation"]
+        rebalancement: Retour à l'allocation cible tous les n mois (0 = jamais)
+        frais: Frais annuels par classe remplaçant ceux du pack (par ex. TER du produit)
+        annee: Année du pack d'hypothèses de marché
+
+    Returns:
+        Même résumé que simulation_monte_carlo, plus "classes", "avoirs"
+        (simulations × années + 1 × classes), "valeurs" (simulations ×
+        années + 1) et "composition_moyenne" (années + 1 × classes, moyenne
+        des avoirs sur les simulations)
+    """
+    classes = _marches(resoudre_annee(annee))[0]
+    poids = poids_allocation(allocation, classes)[None, :]
+    avoirs = _trajectoires(
+        poids, capital_initial, versement_mensuel, annees, np.array([rebalancement]),
+        n_simulations, _frais(frais, classes, annee), graine, annee, par_actif=True,
+    )[0]
+    valeurs = avoirs.sum(axis=-1)
+    return {
+        **_resume_simulation(valeurs, capital_initial, versement_mensuel),
+        "classes": classes,
+        "avoirs": avoirs,
+        "valeurs": valeurs,
+        "composition_moyenne": avoirs.mean(axis=0),
+    }
+
+
+def _comparer(poids, rebalancements, libelles, cle, capital_initial, versement_mensuel, annees, n_simulations, frais, graine, annee) -> list[dict]:
+    classes = _marches(resoudre_annee(annee))[0]
+    valeurs = _trajectoires(
+        poids, capital_initial, versement_mensuel, annees, rebalancements,
+        n_simulations, _frais(frais, classes, annee), graine, annee, par_actif=False,
+    )
+    return [
+        {cle: libelle, **_resume_simulation(v, capital_initial, versement_mensuel)}
+        for libelle, v in zip(libelles, valeurs)
+    ]
+
+
+def comparer_rebalancements(
+    capital_initial: float,
+    versement_mensuel: float,
+    allocation: dict,
+    annees: int,
+    frequences: tuple[int, ...] = (0, 1, 3, 12),
+    n_simulations: int = N_SIMULATIONS,
+    frais: dict | None = None,
+    graine: int = 42,
+    annee: int | None = None,
+) -> list[dict]:
+    """
+    Même allocation, plusieurs fréquences de rebalancement (en mois, 0 = jamais),
+    simulées ensemble sur les mêmes tirages.
+    Retourne [{"rebalancement", ...résumé de simulation_monte_carlo}].
+    """
+    classes = _marches(resoudre_annee(annee))[0]
+    poids = np.repeat(poids_allocation(allocation, classes)[None, :], len(frequences), axis=0)
+    return _comparer(
+        poids, np.array(frequences), frequences, "rebalancement",
+        capital_initial, versement_mensuel, annees, n_simulations, frais, graine, annee,
+    )
+
+
+def balayer_allocations(
+    capital_initial: float,
+    versement_mensuel: float,
+    allocations: dict[str, dict],
+    annees: int,
+    rebalancement: int = REBALANCEMENT_MOIS,
+    n_simulations: int = N_SIMULATIONS,
+    frais: dict | None = None,
+    graine: int = 42,
+    annee: int | None = None,
+) -> list[dict]:
+    """
+    Plusieurs allocations ({nom: {classe: %}}) simulées ensemble sur les mêmes tirages.
+    Retourne [{"allocation", ...résumé de simulation_monte_carlo}] dans l'ordre reçu.
+    """
+    classes = _marches(resoudre_annee(annee))[0]
+    poids = np.array([poids_allocation(a, classes) for a in allocations.values()])
+    return _comparer(
+        poids, np.full(len(poids), rebalancement), list(allocations), "allocation",
+        capital_initial, versement_mensuel, annees, n_simulations, frais, graine, annee,
+    )
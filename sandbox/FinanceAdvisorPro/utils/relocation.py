@@ -0,0 +1,147 @@
+"""
+Classement des communes de domicile par charge fiscale (revenu + fortune).
+Couvre les communes du pack fiscal de l'année et, s'il existe, le fichier
+data/communes.csv qui complète ou corrige la liste :
+
+    canton,commune,coefficient_communal
+    VD,Lutry,0.68
+    Genève (GE),Chêne-Bougeries,0.35
+
+Le canton est le nom complet du pack fiscal ou son abréviation. La table
+des communes est compilée une fois par année (tant que le fichier ne change pas) ;
+un classement ne calcule l'impôt fédéral qu'une fois et applique les
+coefficients de toutes les communes en une opération.
+"""
+
+import csv
+import heapq
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .parameter_packs import charger_pack, resoudre_annee
+from .swiss_tax import (
+    _tables_fortune,
+    calcul_impot_federal_vectorise,
+    calcul_impot_fortune_vectorise,
+    revenu_imposable_vectorise,
+)
+
+COMMUNES_CSV = Path(__file__).parent.parent / "data" / "communes.csv"
+
+
+def _lire_csv(chemin: Path, cantons: dict) -> dict[tuple[str, str], float]:
+    """Lignes valides du CSV ; les cantons inconnus et coefficients illisibles sont ignorés."""
+    abreviations = {
+        m.group(1): canton for canton in cantons if (m := re.search(r"\((\w{2})\)", canton))
+    }
+    communes = {}
+    with open(chemin, newline="", encoding="utf-8") as f:
+        for ligne in csv.DictReader(f):
+            canton = (ligne.get("canton") or "").strip()
+            canton = abreviations.get(canton.upper(), canton)
+            nom = (ligne.get("commune") or "").strip()
+            try:
+                coefficient = float(ligne.get("coefficient_communal") or "")
+            except ValueError:
+                continue
+            if canton in cantons and nom:
+                communes[(canton, nom)] = coefficient
+    return communes
+
+
+@lru_cache(maxsize=8)
+def _table_communes(chemin: str | None, mtime: float | None, annee: int) -> tuple:
+    """(cantons, communes, coefficient cantonal, coefficient communal, ligne du barème de fortune)."""
+    infos = charger_pack(annee)["cantons"]
+    communes = {
+        (canton, nom): coefficient
+        for canton, info in infos.items()
+        for nom, coefficient in info.get("communes", {}).items()
+    }
+    if chemin is not None:
+        communes.update(_lire_csv(Path(chemin), infos))
+
+    cles = sorted(communes)
+    index_fortune = _tables_fortune(annee)[1]
+    cantons = tuple(c for c, _ in cles)
+    noms = tuple(n for _, n in cles)
+    coeff_cantonal = np.array([infos[c]["coefficient_cantonal"] for c in cantons])
+    coeff_communal = np.array([communes[k] for k in cles])
+    ligne_fortune = np.array([index_fortune.get(c, -1) for c in cantons], dtype=int)
+    for table in (coeff_cantonal, coeff_communal, ligne_fortune):
+        table.flags.writeable = False
+    return cantons, noms, coeff_cantonal, coeff_communal, ligne_fortune
+
+
+def table_communes(chemin: Path | None = COMMUNES_CSV, annee: int | None = None) -> tuple:
+    """Table compilée des communes (relue seulement si le CSV a changé)."""
+    annee = resoudre_annee(annee)
+    if chemin is not None and Path(chemin).exists():
+        return _table_communes(str(chemin), Path(chemin).stat().st_mtime, annee)
+    return _table_communes(None, None, annee)
+
+
+def classement_communes(
+    revenu_brut: float,
+    marie: bool = False,
+    enfants: int = 0,
+    deduction_3a: float = 0,
+    deduction_rachat_lpp: float = 0,
+    deduction_frais_effectifs: float = 0,
+    fortune: float = 0,
+    top: int = 10,
+    cantons: list[str] | None = None,
+    chemin: Path | None = COMMUNES_CSV,
+    annee: int | None = None,
+) -> dict:
+    """
+    Classe les communes par impôt total (revenu + fortune) croissant.
+
+    Args:
+        top: Nombre de communes retournées
+        cantons: Restreindre le classement à ces cantons (None = tous)
+        chemin: CSV de communes supplémentaires (ignoré s'il n'existe pas)
+
+    Returns:
+        Dict {"classement": [{"rang", "canton", "commune", "impot_revenu",
+        "impot_fortune", "impot_total", "taux_effectif"}], "nb_communes"}
+    """
+    noms_cantons, noms, coeff_cantonal, coeff_communal, ligne_fortune = table_communes(chemin, annee)
+
+    _, revenu_imposable = revenu_imposable_vectorise(
+        revenu_brut, enfants, deduction_3a, deduction_rachat_lpp, deduction_frais_effectifs, annee,
+    )
+    federal = calcul_impot_federal_vectorise(revenu_imposable, marie, annee)
+    impot_revenu = federal + np.round(federal * coeff_cantonal, 2) + np.round(federal * coeff_communal, 2)
+
+    impot_fortune = np.zeros_like(impot_revenu)
+    if fortune > 0:
+        _, par_canton = calcul_impot_fortune_vectorise(fortune, None, marie, enfants, annee)
+        connu = ligne_fortune >= 0
+        impot_fortune[connu] = par_canton[ligne_fortune[connu]]
+    impot_total = np.round(impot_revenu + impot_fortune, 2)
+
+    candidats = range(len(noms))
+    if cantons is not None:
+        retenus = set(cantons)
+        candidats = [i for i in candidats if noms_cantons[i] in retenus]
+    meilleurs = heapq.nsmallest(top, candidats, key=lambda i: (impot_total[i], noms[i]))
+
+    return {
+        "classement": [
+            {
+                "rang": rang,
+                "canton": noms_cantons[i],
+                "commune": noms[i],
+                "impot_revenu": round(float(impot_revenu[i]), 2),
+                "impot_fortune": float(impot_fortune[i]),
+                "impot_total": float(impot_total[i]),
+                "taux_effectif": round(float(impot_total[i]) / revenu_brut * 100, 2) if revenu_brut > 0 else 0,
+            }
+            for rang, i in enumerate(meilleurs, start=1)
+        ],
+        "nb_communes": len(candidats),
+    }
@@ -0,0 +1,200 @@
+"""
+Tokens de session signés (HMAC-SHA256) avec expiration.
+Un token se vérifie sans lire le stockage des comptes : la signature prouve
+l'identité, la table de sessions en mémoire fournit le profil utilisateur.
+Les sessions expirées sont évincées périodiquement ; la persistance en base
+(table `sessions`) est optionnelle (FAP_PERSIST_SESSIONS=1) pour survivre aux
+redémarrages et être partagée entre réplicas.
+
+Sans persistance, sessions et révocations ne vivent que dans ce processus :
+après un redémarrage, ou sur un autre réplica, un token déconnecté mais
+encore signé et non expiré est de nouveau accepté. Ce mode est réservé à
+une instance unique ; tout déploiement multi-réplicas doit activer
+FAP_PERSIST_SESSIONS=1 (une session supprimée de la table est refusée).
+
+Format : <session_id>.<username (base64url)>.<expiration unix>.<signature>
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SECRET_FILE = Path(__file__).parent.parent / "data" / "session_secret"
+SESSION_TTL = int(os.environ.get("FAP_SESSION_TTL", 7 * 24 * 3600))  # 7 jours
+PERSIST_SESSIONS = os.environ.get("FAP_PERSIST_SESSIONS", "0") == "1"
+_EVICTION_INTERVAL = 60  # secondes entre deux balayages des sessions expirées
+
+_sessions: dict[str, tuple[dict, float]] = {}  # session_id → (user, expiration)
+_revoked: dict[str, float] = {}                # session_id → expiration
+_lock = threading.Lock()
+_last_eviction = 0.0
+_secret: bytes | None = None
+
+
+def _load_secret() -> bytes:
+    """Clé HMAC : FAP_SESSION_SECRET, sinon fichier local généré au premier appel."""
+    global _secret
+    if _secret is None:
+        env_secret = os.environ.get("FAP_SESSION_SECRET")
+        if env_secret:
+            _secret = env_secret.encode()
+        else:
+            if not SECRET_FILE.exists():
+                _create_secret_file()
+            _secret = SECRET_FILE.read_text().strip().encode()
+        if not _secret:
+            raise ValueError(f"Clé de session vide ({SECRET_FILE}) : supprimer le fichier pour la régénérer")
+    return _secret
+
+
+def _create_secret_file():
+    """
+    Écrit une clé complète dans un fichier temporaire, puis la publie par un
+    lien dur : la création échoue si un autre processus a publié la sienne
+    entre-temps (c'est alors celle-ci qui est lue), et aucun lecteur ne voit
+    de fichier partiellement écrit.
+    """
+    SECRET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=SECRET_FILE.parent, prefix=".session_secret-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+            f.flush()
+            os.fsync(f.fileno())
+        os.link(tmp_path, SECRET_FILE)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp_path)
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def _unb64(text: str) -> str:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)).decode()
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(_load_secret(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:24]).decode().rstrip("=")
+
+
+def _evict_expired(now: float):
+    """Retire les sessions et révocations expirées (au plus une fois par intervalle)."""
+    global _last_eviction
+    if now - _last_eviction < _EVICTION_INTERVAL:
+        return
+    _last_eviction = now
+    for sid in [sid for sid, (_, exp) in _sessions.items() if exp <= now]:
+        del _sessions[sid]
+    for sid in [sid for sid, exp in _revoked.items() if exp <= now]:
+        del _revoked[sid]
+
+
+def issue_token(user: dict, ttl: int = SESSION_TTL) -> str:
+    """Crée une session pour `user` et retourne son token signé."""
+    now = time.time()
+    sid = secrets.token_urlsafe(12)
+    expires = int(now + ttl)
+    payload = f"{sid}.{_b64(user['username'])}.{expires}"
+    with _lock:
+        _evict_expired(now)
+        _sessions[sid] = (dict(user), expires)
+    if PERSIST_SESSIONS:
+        from utils.database import save_session
+        save_session(sid, user["username"], json.dumps(user), expires)
+    return f"{payload}.{_sign(payload)}"
+
+
+def _parse(token: str) -> tuple[str, str, int] | None:
+    """Vérifie signature et expiration. Retourne (session_id, username, expiration)."""
+    try:
+        sid, user_b64, expires, signature = token.split(".")
+        payload = f"{sid}.{user_b64}.{expires}"
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        expires = int(expires)
+        if expires <= time.time():
+            return None
+        return sid, _unb64(user_b64), expires
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def verify_token(token: str, username: str | None = None) -> dict | None:
+    """
+    Retourne le profil de la session si le token est valide, None sinon.
+    Si la session n'est plus en mémoire (redémarrage), elle est rechargée
+    depuis la base si la persistance est active.
+    """
+    parsed = _parse(token)
+    if not parsed:
+        return None
+    sid, token_user, expires = parsed
+    if username is not None and username != token_user:
+        return None
+
+    with _lock:
+        if sid in _revoked:
+            return None
+        session = _sessions.get(sid)
+    if session:
+        return dict(session[0])
+
+    if PERSIST_SESSIONS:
+        from utils.database import get_session
+        row = get_session(sid)
+        if row and row["expires_at"] > time.time():
+            user = json.loads(row["user_json"])
+            with _lock:
+                _sessions[sid] = (user, row["expires_at"])
+            return dict(user)
+        return None
+
+    # Session inconnue mais signature valide (processus redémarré) :
+    # l'appelant recharge le profil depuis le stockage des comptes.
+    return {"username": token_user, "_reload": True}
+
+
+def remember_session(token: str, user: dict):
+    """Réenregistre en mémoire une session dont le profil vient d'être rechargé."""
+    parsed = _parse(token)
+    if parsed:
+        with _lock:
+            _sessions[parsed[0]] = (dict(user), parsed[2])
+
+
+def revoke_token(token: str):
+    """
+    Invalide une session (déconnexion). Sans FAP_PERSIST_SESSIONS=1, la
+    révocation n'est connue que de ce processus (voir l'en-tête du module).
+    """
+    parsed = _parse(token)
+    if not parsed:
+        return
+    sid, _, expires = parsed
+    with _lock:
+        _sessions.pop(sid, None)
+        _revoked[sid] = expires
+    if PERSIST_SESSIONS:
+        from utils.database import delete_session
+        delete_session(sid)
+
+
+def revoke_user_sessions(username: str):
+    """Invalide toutes les sessions en mémoire d'un utilisateur."""
+    with _lock:
+        for sid in [sid for sid, (user, _) in _sessions.items() if user.get("username") == username]:
+            _revoked[sid] = _sessions.pop(sid)[1]
+    if PERSIST_SESSIONS:
+        from utils.database import delete_user_sessions
+        delete_user_sessions(username)
@@ -6,24 +6,9 @@ Intègre aussi l'export PDF et l'envoi par email.
 
 import streamlit as st
 from datetime import datetime
-from utils.database import save_simulation, get_simulations, delete_simulation
+from utils.database import save_simulation, get_simulations, delete_simulation, find_simulation_by_params
+from utils.payload_codec import content_hash
 from utils.auth import get_current_user
-from utils.pdf_export import (
-    export_budget_pdf,
-    export_fiscalite_pdf,
-    export_prevoyance_pdf,
-    export_investissements_pdf,
-)
-from utils.email_sender import email_send_section
-
-# Map module name → export function
-_EXPORT_MAP = {
-    "budget": ("Budget", export_budget_pdf),
-    "fiscalite": ("Fiscalité", export_fiscalite_pdf),
-    "prevoyance": ("Prévoyance", export_prevoyance_pdf),
-    "investissements": ("Investissements", export_investissements_pdf),
-}
-
 
 def simulation_save_section(module: str, parametres: dict, resultats: dict):
     """
@@ -61,20 +46,28 @@ def simulation_save_section(module: str, parametres: dict, resultats: dict):
         )
     with col_save:
         if st.button(" Sauvegarder", key=f"save_sim_{module}", use_container_width=True):
-            sim_id = save_simulation(
-                client_id=client_id,
-                advisor_id=advisor_id,
-                module=module,
-                nom=sim_name,
-                parametres=parametres,
-                resultats=resultats,
-            )
-            st.success(f" Simulation sauvegardée (v{_get_latest_version(client_id, module)})")
-            st.rerun()
+            # Mêmes paramètres et mêmes résultats (moteurs et pack inchangés) : pas de nouvelle version
+            existing = find_simulation_by_params(client_id, module, parametres)
+            if existing and existing.get("payload_hash") == content_hash(resultats):
+                st.info(f" Simulation identique déjà sauvegardée (v{existing.get('version', '?')})")
+            else:
+                sim_id = save_simulation(
+                    client_id=client_id,
+                    advisor_id=advisor_id,
+                    module=module,
+                    nom=sim_name,
+                    parametres=parametres,
+                    resultats=resultats,
+                )
+                st.success(f" Simulation sauvegardée (v{_get_latest_version(client_id, module)})")
+                st.rerun()
+
+    # PDF Export (fpdf n'est chargé qu'ici, après le rendu de la page)
+    from utils.pdf_export import REPORT_EXPORTS
+    from utils.email_sender import email_send_section
 
-    # PDF Export 
     with col_pdf:
-        module_label, export_fn = _EXPORT_MAP.get(module, ("Rapport", None))
+        module_label, export_fn = REPORT_EXPORTS.get(module, ("Rapport", None))
         if export_fn:
             pdf_bytes = export_fn(
                 advisor_name=advisor_name,
@@ -93,14 +86,8 @@ def simulation_save_section(module: str, parametres: dict, resultats: dict):
                 use_container_width=True,
             )
 
-    # Email section 
+    # Email section (réutilise le PDF généré pour le téléchargement)
     if export_fn:
-        pdf_bytes = export_fn(
-            advisor_name=advisor_name,
-            client_name=nom_client,
-            params=parametres,
-            results=resultats,
-        )
         email_send_section(module_label, pdf_bytes, client, advisor_name)
 
     # History section 
@@ -1,19 +1,20 @@
 """
 Moteur de calcul fiscal suisse simplifié.
 Couvre l'impôt fédéral direct et une estimation cantonale/communale.
+Les barèmes, déductions et coefficients viennent du pack fiscal de l'année
+`annee` (None = pack le plus récent, voir utils.parameter_packs).
 """
 
-from .constants import (
-    BAREME_FEDERAL_SEUL,
-    BAREME_FEDERAL_MARIE,
-    CANTONS_ROMANDS,
-    PILIER_3A_SALARIE,
-)
+from functools import lru_cache
 
+import numpy as np
 
-def calcul_impot_federal(revenu_imposable: float, marie: bool = False) -> float:
+from .parameter_packs import charger_pack, resoudre_annee
+
+
+def calcul_impot_federal(revenu_imposable: float, marie: bool = False, annee: int | None = None) -> float:
     """Calcul de l'impôt fédéral direct (IFD) selon le barème progressif."""
-    bareme = BAREME_FEDERAL_MARIE if marie else BAREME_FEDERAL_SEUL
+    bareme = charger_pack(annee)["bareme_federal"]["marie" if marie else "seul"]
     impot = 0.0
     revenu_precedent = 0.0
 
@@ -33,17 +34,19 @@ def calcul_impot_cantonal(
     canton: str,
     commune: str | None = None,
     marie: bool = False,
+    annee: int | None = None,
 ) -> dict:
     """
     Estimation de l'impôt cantonal et communal.
     Utilise le barème fédéral comme base, multiplié par les coefficients cantonaux/communaux.
     C'est une simplification — en réalité, chaque canton a son propre barème.
     """
-    if canton not in CANTONS_ROMANDS:
+    cantons = charger_pack(annee)["cantons"]
+    if canton not in cantons:
         return {"cantonal": 0, "communal": 0, "total": 0}
 
-    info = CANTONS_ROMANDS[canton]
-    base_impot = calcul_impot_federal(revenu_imposable, marie)
+    info = cantons[canton]
+    base_impot = calcul_impot_federal(revenu_imposable, marie, annee)
 
     coeff_cantonal = info["coefficient_cantonal"]
     coeff_communal = info["coefficient_communal_moyen"]
@@ -61,6 +64,125 @@ def calcul_impot_cantonal(
     }
 
 
+# ════════════════════════════════════════════════════════════
+# IMPÔT SUR LA FORTUNE
+# ════════════════════════════════════════════════════════════
+
+def compiler_baremes(baremes: dict[str, list[tuple[float, float]]]) -> tuple:
+    """
+    Compile des barèmes progressifs {clé: [(seuil, taux marginal), ...]} en
+    matrices (clé × tranche) : (clés, index par clé, bornes basses, largeurs, taux).
+    Les barèmes plus courts sont complétés par des tranches vides.
+    """
+    cles = tuple(baremes)
+    n_tranches = max(len(b) for b in baremes.values())
+    basses = np.zeros((len(cles), n_tranches))
+    largeurs = np.zeros((len(cles), n_tranches))
+    taux = np.zeros((len(cles), n_tranches))
+    for i, cle in enumerate(cles):
+        precedent = 0.0
+        for k, (seuil, t) in enumerate(baremes[cle]):
+            basses[i, k], largeurs[i, k], taux[i, k] = precedent, seuil - precedent, t
+            precedent = seuil
+    for table in (basses, largeurs, taux):
+        table.flags.writeable = False
+    return cles, {c: i for i, c in enumerate(cles)}, basses, largeurs, taux
+
+
+def appliquer_baremes(montants, basses: np.ndarray, largeurs: np.ndarray, taux: np.ndarray) -> np.ndarray:
+    """
+    Applique des barèmes compilés (lignes × tranches) à des montants de forme
+    (lignes, ...) ou (1, ...) — même montant pour toutes les lignes.
+    Retourne l'impôt de forme (lignes, ...), arrondi au centime.
+    """
+    montants = np.asarray(montants, dtype=float)
+    if montants.ndim == 0:
+        montants = montants.reshape(1)
+    extra = (1,) * (montants.ndim - 1)
+    forme = basses.shape + extra
+    dans_tranche = np.clip(montants[:, None] - basses.reshape(forme), 0, largeurs.reshape(forme))
+    return np.round((dans_tranche * taux.reshape(forme)).sum(axis=1), 2)
+
+
+@lru_cache(maxsize=None)
+def _tables_fortune(annee: int) -> tuple:
+    """Barèmes de fortune compilés et franchises (canton × [seul, marié, par enfant])."""
+    baremes = charger_pack(annee)["fortune"]
+    cantons, index, basses, largeurs, taux = compiler_baremes(
+        {canton: info["bareme"] for canton, info in baremes.items()}
+    )
+    franchises = np.array([
+        (info["franchise_seul"], info["franchise_marie"], info["deduction_enfant"])
+        for info in baremes.values()
+    ], dtype=float)
+    franchises.flags.writeable = False
+    return cantons, index, basses, largeurs, taux, franchises
+
+
+def calcul_impot_fortune_vectorise(
+    fortunes,
+    canton: str | None = None,
+    marie: bool = False,
+    enfants: int = 0,
+    annee: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Impôt sur la fortune (canton + commune) pour un tableau de fortunes nettes.
+
+    Args:
+        canton: Canton, ou None pour tous les cantons du barème de fortune en
+                une passe (axe 0 supplémentaire, dans l'ordre du pack)
+
+    Returns:
+        (fortune imposable, impôt) — tableaux de la forme de `fortunes`
+        (précédée de l'axe des cantons si canton=None). Canton inconnu : 0.
+    """
+    cantons, index, basses, largeurs, taux, franchises = _tables_fortune(resoudre_annee(annee))
+    fortunes = np.asarray(fortunes, dtype=float)
+    if canton is None:
+        lignes = slice(None)
+    elif canton in index:
+        lignes = [index[canton]]
+    else:
+        zeros = np.zeros_like(fortunes)
+        return zeros, zeros
+
+    franchise = franchises[lignes, 1 if marie else 0] + enfants * franchises[lignes, 2]
+    imposable = np.maximum(fortunes[None] - franchise.reshape(-1, *(1,) * fortunes.ndim), 0)
+    impot = appliquer_baremes(imposable, basses[lignes], largeurs[lignes], taux[lignes])
+    if canton is not None:
+        return imposable[0], impot[0]
+    return imposable, impot
+
+
+def calcul_impot_fortune(
+    fortune: float,
+    canton: str,
+    marie: bool = False,
+    enfants: int = 0,
+    annee: int | None = None,
+) -> dict:
+    """Impôt sur la fortune nette d'un contribuable (franchises et barème du canton)."""
+    imposable, impot = calcul_impot_fortune_vectorise(fortune, canton, marie, enfants, annee)
+    return {
+        "fortune_imposable": round(float(imposable), 2),
+        "impot_fortune": float(impot),
+        "taux_effectif": round(float(impot) / fortune * 100, 3) if fortune > 0 else 0,
+    }
+
+
+def _avec_impot_fortune(result: dict, fortune_imposable: float, impot_fortune: float) -> dict:
+    """Ajoute l'impôt sur la fortune à un résultat de calcul_impot_total."""
+    impot_total = round(result["impot_revenu"] + impot_fortune, 2)
+    result.update(
+        fortune_imposable=round(fortune_imposable, 2),
+        impot_fortune=round(impot_fortune, 2),
+        impot_total=impot_total,
+        taux_effectif=round((impot_total / result["revenu_brut"]) * 100, 2) if result["revenu_brut"] > 0 else 0,
+    )
+    return result
+
+
 def calcul_impot_total(
     revenu_brut: float,
     canton: str,
@@ -70,19 +192,28 @@ def calcul_impot_total(
     deduction_3a: float = 0,
     deduction_rachat_lpp: float = 0,
     deduction_frais_effectifs: float = 0,
+    fortune: float = 0,
+    annee: int | None = None,
 ) -> dict:
-    """Calcul complet de l'impôt (fédéral + cantonal + communal) avec déductions."""
+    """
+    Calcul complet de l'impôt (fédéral + cantonal + communal) avec déductions.
+    `impot_total` inclut l'impôt sur la fortune nette (`fortune`) ;
+    `impot_revenu` est la part sur le revenu seul.
+    """
+
+    pack = charger_pack(annee)
+    forfaits = pack["deductions"]
 
     # Déductions forfaitaires
-    deduction_professionnelle = min(revenu_brut * 0.03, 4_000)
-    deduction_avs_ai = revenu_brut * 0.0535  # Part employé AVS/AI/APG/AC
-    deduction_lpp_estimee = revenu_brut * 0.05  # Estimation cotisation LPP
+    deduction_professionnelle = min(revenu_brut * forfaits["frais_professionnels_taux"], forfaits["frais_professionnels_max"])
+    deduction_avs_ai = revenu_brut * forfaits["cotisations_sociales_taux"]  # Part employé AVS/AI/APG/AC
+    deduction_lpp_estimee = revenu_brut * forfaits["lpp_estimee_taux"]  # Estimation cotisation LPP
 
     # Déduction enfants
-    deduction_enfants = enfants * 6_600 if not marie else enfants * 6_600
+    deduction_enfants = enfants * forfaits["enfant"]
 
     # Plafond 3a
-    deduction_3a = min(deduction_3a, PILIER_3A_SALARIE)
+    deduction_3a = min(deduction_3a, pack["pilier_3a"]["salarie"])
 
     total_deductions = (
         deduction_professionnelle
@@ -96,20 +227,19 @@ def calcul_impot_total(
 
     revenu_imposable = max(0, revenu_brut - total_deductions)
 
-    impot_federal = calcul_impot_federal(revenu_imposable, marie)
-    impots_cantonaux = calcul_impot_cantonal(revenu_imposable, canton, commune, marie)
+    impot_federal = calcul_impot_federal(revenu_imposable, marie, annee)
+    impots_cantonaux = calcul_impot_cantonal(revenu_imposable, canton, commune, marie, annee)
 
-    impot_total = round(impot_federal + impots_cantonaux["total"], 2)
+    impot_revenu = round(impot_federal + impots_cantonaux["total"], 2)
 
-    return {
+    result = {
         "revenu_brut": revenu_brut,
         "total_deductions": round(total_deductions, 2),
         "revenu_imposable": round(revenu_imposable, 2),
         "impot_federal": impot_federal,
         "impot_cantonal": impots_cantonaux["cantonal"],
         "impot_communal": impots_cantonaux["communal"],
-        "impot_total": impot_total,
-        "taux_effectif": round((impot_total / revenu_brut) * 100, 2) if revenu_brut > 0 else 0,
+        "impot_revenu": impot_revenu,
         "detail_deductions": {
             "Frais professionnels": round(deduction_professionnelle, 2),
             "Cotisations sociales (AVS/AI/AC)": round(deduction_avs_ai, 2),
@@ -120,6 +250,130 @@ def calcul_impot_total(
             "Frais effectifs": round(deduction_frais_effectifs, 2),
         },
     }
+    fortune_imposable, impot_fortune = (
+        calcul_impot_fortune_vectorise(fortune, canton, marie, enfants, annee) if fortune > 0 else (0.0, 0.0)
+    )
+    return _avec_impot_fortune(result, float(fortune_imposable), float(impot_fortune))
+
+
+# ════════════════════════════════════════════════════════════
+# VERSIONS VECTORISÉES (projections, scénarios, portefeuille)
+# ════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=None)
+def _tables_bareme(marie: bool, annee: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Bornes basses, bornes hautes, taux et impôt cumulé au début de chaque tranche."""
+    bareme = charger_pack(annee)["bareme_federal"]["marie" if marie else "seul"]
+    hautes = np.array([seuil for seuil, _ in bareme], dtype=float)
+    taux = np.array([t for _, t in bareme], dtype=float)
+    basses = np.concatenate(([0.0], hautes[:-1]))
+    cumul = np.concatenate(([0.0], np.cumsum((hautes[:-1] - basses[:-1]) * taux[:-1])))
+    tables = (basses, hautes, taux, cumul)
+    for table in tables:
+        table.flags.writeable = False
+    return tables
+
+
+def calcul_impot_federal_vectorise(revenus_imposables, marie: bool = False, annee: int | None = None) -> np.ndarray:
+    """Impôt fédéral direct pour un tableau de revenus imposables (mêmes tranches que calcul_impot_federal)."""
+    basses, hautes, taux, cumul = _tables_bareme(bool(marie), resoudre_annee(annee))
+    revenus = np.asarray(revenus_imposables, dtype=float)
+    tranche = np.searchsorted(hautes, revenus, side="left")
+    return np.round(cumul[tranche] + (revenus - basses[tranche]) * taux[tranche], 2)
+
+
+def calcul_impot_revenu_vectorise(
+    revenus_imposables,
+    canton: str,
+    commune: str | None = None,
+    marie: bool = False,
+    annee: int | None = None,
+) -> dict:
+    """
+    Impôts fédéral, cantonal et communal sur des revenus imposables.
+    Retourne {"federal", "cantonal", "communal", "total"} (tableaux NumPy).
+    """
+    federal = calcul_impot_federal_vectorise(revenus_imposables, marie, annee)
+    info = charger_pack(annee)["cantons"].get(canton)
+    if info is None:
+        cantonal = communal = np.zeros_like(federal)
+    else:
+        coeff_communal = info.get("communes", {}).get(commune, info["coefficient_communal_moyen"])
+        cantonal = np.round(federal * info["coefficient_cantonal"], 2)
+        communal = np.round(federal * coeff_communal, 2)
+    return {
+        "federal": federal,
+        "cantonal": cantonal,
+        "communal": communal,
+        "total": np.round(federal + cantonal + communal, 2),
+    }
+
+
+def revenu_imposable_vectorise(
+    revenu_brut,
+    enfants: int = 0,
+    deduction_3a=0,
+    deduction_rachat_lpp=0,
+    deduction_frais_effectifs=0,
+    annee: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Déductions (mêmes forfaits que calcul_impot_total) et revenu imposable : (total_deductions, revenu_imposable)."""
+    pack = charger_pack(annee)
+    forfaits = pack["deductions"]
+    revenu_brut = np.asarray(revenu_brut, dtype=float)
+    total_deductions = (
+        np.minimum(revenu_brut * forfaits["frais_professionnels_taux"], forfaits["frais_professionnels_max"])
+        + revenu_brut * forfaits["cotisations_sociales_taux"]
+        + revenu_brut * forfaits["lpp_estimee_taux"]
+        + enfants * forfaits["enfant"]
+        + np.minimum(deduction_3a, pack["pilier_3a"]["salarie"])
+        + deduction_rachat_lpp
+        + deduction_frais_effectifs
+    )
+    return total_deductions, np.maximum(0, revenu_brut - total_deductions)
+
+
+def calcul_impot_total_vectorise(
+    revenu_brut,
+    canton: str,
+    commune: str | None = None,
+    marie: bool = False,
+    enfants: int = 0,
+    deduction_3a=0,
+    deduction_rachat_lpp=0,
+    deduction_frais_effectifs=0,
+    fortune=0,
+    annee: int | None = None,
+) -> dict:
+    """
+    Version vectorisée de calcul_impot_total : les montants peuvent être des
+    tableaux (diffusés entre eux). Retourne les tableaux total_deductions,
+    revenu_imposable, impot_federal, impot_cantonal, impot_communal,
+    impot_revenu, fortune_imposable, impot_fortune, impot_total et taux_effectif.
+    """
+    revenu_brut = np.asarray(revenu_brut, dtype=float)
+    total_deductions, revenu_imposable = revenu_imposable_vectorise(
+        revenu_brut, enfants, deduction_3a, deduction_rachat_lpp, deduction_frais_effectifs, annee,
+    )
+    impots = calcul_impot_revenu_vectorise(revenu_imposable, canton, commune, marie, annee)
+    fortune_imposable, impot_fortune = calcul_impot_fortune_vectorise(fortune, canton, marie, enfants, annee)
+    impot_total = np.round(impots["total"] + impot_fortune, 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taux_effectif = np.where(revenu_brut > 0, np.round(impot_total / revenu_brut * 100, 2), 0.0)
+
+    return {
+        "total_deductions": np.round(total_deductions, 2),
+        "revenu_imposable": np.round(revenu_imposable, 2),
+        "impot_federal": impots["federal"],
+        "impot_cantonal": impots["cantonal"],
+        "impot_communal": impots["communal"],
+        "impot_revenu": impots["total"],
+        "fortune_imposable": fortune_imposable,
+        "impot_fortune": impot_fortune,
+        "impot_total": impot_total,
+        "taux_effectif": taux_effectif,
+    }
 
 
 def comparaison_cantonale(
@@ -127,18 +381,28 @@ def comparaison_cantonale(
     marie: bool = False,
     enfants: int = 0,
     deduction_3a: float = 0,
+    fortune: float = 0,
+    annee: int | None = None,
 ) -> dict:
-    """Compare l'imposition entre tous les cantons romands."""
+    """Compare l'imposition entre tous les cantons romands (revenu et fortune)."""
+    # Impôt sur la fortune de tous les cantons en une passe
+    fortune_par_canton = {}
+    if fortune > 0:
+        imposables, impots = calcul_impot_fortune_vectorise(fortune, None, marie, enfants, annee)
+        cantons = _tables_fortune(resoudre_annee(annee))[0]
+        fortune_par_canton = {c: (float(imposables[i]), float(impots[i])) for i, c in enumerate(cantons)}
+
     resultats = {}
-    for canton in CANTONS_ROMANDS:
+    for canton in charger_pack(annee)["cantons"]:
         result = calcul_impot_total(
             revenu_brut=revenu_brut,
             canton=canton,
             marie=marie,
             enfants=enfants,
             deduction_3a=deduction_3a,
+            annee=annee,
         )
-        resultats[canton] = result
+        resultats[canton] = _avec_impot_fortune(result, *fortune_par_canton.get(canton, (0.0, 0.0)))
     return resultats
 
 
@@ -149,21 +413,23 @@ def suggestions_optimisation(
     canton: str = "Vaud (VD)",
     marie: bool = False,
     enfants: int = 0,
+    annee: int | None = None,
 ) -> list[dict]:
     """Génère des suggestions d'optimisation fiscale personnalisées."""
     suggestions = []
+    plafond_3a = charger_pack(annee)["pilier_3a"]["salarie"]
 
     # Suggestion 3ème pilier
-    if deduction_3a_actuelle < PILIER_3A_SALARIE:
+    if deduction_3a_actuelle < plafond_3a:
         economie_potentielle = calcul_impot_total(
-            revenu_brut, canton, marie=marie, enfants=enfants, deduction_3a=0
+            revenu_brut, canton, marie=marie, enfants=enfants, deduction_3a=0, annee=annee
         )["impot_total"] - calcul_impot_total(
-            revenu_brut, canton, marie=marie, enfants=enfants, deduction_3a=PILIER_3A_SALARIE
+            revenu_brut, canton, marie=marie, enfants=enfants, deduction_3a=plafond_3a, annee=annee
         )["impot_total"]
 
         suggestions.append({
             "titre": "💰 Maximiser le 3ème pilier (3a)",
-            "description": f"Versez le maximum de CHF {PILIER_3A_SALARIE:,.0f} par an dans votre 3ème pilier.",
+            "description": f"Versez le maximum de CHF {plafond_3a:,.0f} par an dans votre 3ème pilier.",
             "economie_estimee": round(economie_potentielle, 0),
             "priorite": "haute",
         })
@@ -173,10 +439,10 @@ def suggestions_optimisation(
         rachat_test = 10_000
         eco_rachat = calcul_impot_total(
             revenu_brut, canton, marie=marie, enfants=enfants,
-            deduction_3a=deduction_3a_actuelle
+            deduction_3a=deduction_3a_actuelle, annee=annee
         )["impot_total"] - calcul_impot_total(
             revenu_brut, canton, marie=marie, enfants=enfants,
-            deduction_3a=deduction_3a_actuelle, deduction_rachat_lpp=rachat_test
+            deduction_3a=deduction_3a_actuelle, deduction_rachat_lpp=rachat_test, annee=annee
         )["impot_total"]
 
         suggestions.append({
@@ -187,7 +453,7 @@ def suggestions_optimisation(
         })
 
     # Suggestion comparaison cantonale
-    comparaison = comparaison_cantonale(revenu_brut, marie, enfants, deduction_3a_actuelle)
+    comparaison = comparaison_cantonale(revenu_brut, marie, enfants, deduction_3a_actuelle, annee=annee)
     canton_moins_cher = min(comparaison, key=lambda c: comparaison[c]["impot_total"])
     impot_actuel = comparaison.get(canton, {}).get("impot_total", 0)
     impot_minimum = comparaison[canton_moins_cher]["impot_total"]
@@ -0,0 +1,253 @@
+"""
+Résultats précalculés des cas types (onboarding instantané).
+Pour chaque profil de CASE_TEMPLATES, les appels moteurs que font les pages
+avec leurs valeurs par défaut (budget, fiscalité, prévoyance, investissements) sont
+calculés une fois — au démarrage ou à la compilation — et stockés dans un
+cache compact (data/template_bundles.bin, JSON + zlib via payload_codec).
+
+Les pages appellent les moteurs via `bundle_call` : si les arguments sont
+exactement ceux d'un bundle, le résultat est servi immédiatement ; dès que
+le conseiller modifie un champ, le calcul se fait normalement.
+
+Compilation (optionnelle) :
+    python -m utils.template_bundles
+"""
+
+import copy
+import hashlib
+import inspect
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from .case_templates import CASE_TEMPLATES
+from .constants import (
+    CANTONS_ROMANDS,
+    PILIER_3A_SALARIE,
+    PROFILS_INVESTISSEMENT,
+    TAUX_INTERET_3A_MOYEN,
+)
+from .parameter_packs import PACKS_DIR
+from .payload_codec import CODEC_JSON_ZLIB, content_hash, decode_payload, encode_payload
+
+BUNDLE_PATH = Path(__file__).parent.parent / "data" / "template_bundles.bin"
+
+# Le cache est invalidé si les cas types, le code des moteurs ou les packs fiscaux changent
+_ENGINE_SOURCES = (
+    "case_templates.py", "constants.py", "parameter_packs.py", "swiss_tax.py", "pillar_calc.py", "investment.py",
+    "budget.py",
+)
+
+_entries: dict[tuple[str, str], object] | None = None
+_lock = threading.Lock()
+_warming = False
+
+
+def _fn_name(fn) -> str:
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+
+@lru_cache(maxsize=None)
+def _signature(fn) -> inspect.Signature:
+    return inspect.signature(fn)
+
+
+def _call_key(fn, args: tuple, kwargs: dict) -> tuple[str, str]:
+    """Clé (fonction, empreinte des arguments normalisés par la signature)."""
+    bound = _signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return _fn_name(fn), content_hash(dict(bound.arguments))
+
+
+def _freeze(obj):
+    """Préserve les clés non textuelles (ex. percentiles {5: ...}) à travers JSON."""
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: _freeze(v) for k, v in obj.items()}
+        return {"__items__": [[k, _freeze(v)] for k, v in obj.items()]}
+    if isinstance(obj, (list, tuple)):
+        return [_freeze(v) for v in obj]
+    return obj
+
+
+def _thaw(obj):
+    if isinstance(obj, dict):
+        if set(obj) == {"__items__"}:
+            return {k: _thaw(v) for k, v in obj["__items__"]}
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256()
+    base = Path(__file__).parent
+    for name in _ENGINE_SOURCES:
+        digest.update((base / name).read_bytes())
+    for pack in sorted(PACKS_DIR.glob("*.json")):
+        digest.update(pack.read_bytes())
+    return digest.hexdigest()
+
+
+# ════════════════════════════════════════════════════════════
+# APPELS PAR DÉFAUT DES PAGES
+# ════════════════════════════════════════════════════════════
+
+def _template_calls(template: dict) -> list[tuple]:
+    """
+    Appels moteurs faits par les pages pour un client chargé depuis un cas type,
+    avec les valeurs par défaut des widgets. Retourne [(fonction, args, kwargs)].
+    """
+    from .budget import analyse_budget
+    from .pillar_calc import projection_lpp, projection_retraite_globale, simulation_3a
+    from .swiss_tax import calcul_impot_total, comparaison_cantonale, suggestions_optimisation
+
+    profil = template["profil"]
+    salaire = int(profil["salaire_annuel"])
+    marie = profil["situation_familiale"] == "Marié·e"
+    communes = CANTONS_ROMANDS[profil["canton"]].get("communes", {})
+    commune = profil.get("commune") if profil.get("commune") in communes else None
+    age = profil["age"]
+    age_retraite = 65
+    annees_cotisation = min(age - 20, 44)
+
+    # 1_Budget : impôts estimés du profil, puis postes du cas type complétés par les widgets
+    impots_profil = dict(
+        revenu_brut=profil["salaire_annuel"], canton=profil["canton"], commune=profil.get("commune") or None,
+        marie=marie, enfants=profil["enfants"], deduction_3a=PILIER_3A_SALARIE,
+    )
+    budget = template.get("budget", {})
+    if "impots_mensuels" in budget:
+        impots_mensuels = budget["impots_mensuels"]
+    else:
+        impots_mensuels = round(calcul_impot_total(**impots_profil)["impot_total"] / 12)
+    budget_params = {
+        "salaire_net": budget.get("salaire_net", round(salaire * 0.87 / 12)), "bonus_mensuel": 0,
+        "revenus_annexes": 0, "loyer": budget.get("loyer", 1_800),
+        "assurance_maladie": budget.get("assurance_maladie", 380), "impots_mensuels": impots_mensuels,
+        "transport": budget.get("transport", 300), "assurances_autres": 150, "telecom": 90,
+        "prevoyance_3a": budget.get("prevoyance_3a", 588), "charges_autres": 0,
+        "alimentation": budget.get("alimentation", 600), "restaurants": 200,
+        "loisirs": budget.get("loisirs", 150), "habillement": 100, "sante": 50, "cadeaux": 50,
+        "vacances": 200, "depenses_autres": 100,
+    }
+
+    return [
+        # 1_Budget
+        (calcul_impot_total, (), impots_profil),
+        (analyse_budget, (budget_params,), {}),
+        # 2_Fiscalite
+        (calcul_impot_total, (), dict(
+            revenu_brut=salaire, canton=profil["canton"], commune=commune, marie=marie,
+            enfants=profil["enfants"], deduction_3a=PILIER_3A_SALARIE,
+            deduction_rachat_lpp=0, deduction_frais_effectifs=0,
+        )),
+        (comparaison_cantonale, (salaire, marie, profil["enfants"], PILIER_3A_SALARIE), {}),
+        (suggestions_optimisation, (), dict(
+            revenu_brut=salaire, deduction_3a_actuelle=PILIER_3A_SALARIE, rachat_lpp_actuel=0,
+            canton=profil["canton"], marie=marie, enfants=profil["enfants"],
+        )),
+        # 3_Prevoyance
+        (projection_lpp, (salaire, age, int(profil["capital_lpp"]), age_retraite), {}),
+        (simulation_3a, (PILIER_3A_SALARIE, max(0, age_retraite - age), TAUX_INTERET_3A_MOYEN, int(profil["capital_3a"])), {}),
+        (projection_retraite_globale, (), dict(
+            salaire_annuel=salaire, age_actuel=age,
+            capital_lpp_actuel=int(profil["capital_lpp"]), capital_3a_actuel=int(profil["capital_3a"]),
+            versement_3a_annuel=PILIER_3A_SALARIE, taux_rendement_3a=TAUX_INTERET_3A_MOYEN,
+            annees_cotisation_avs=annees_cotisation, age_retraite=age_retraite,
+        )),
+    ]
+
+
+def _default_calls() -> list[tuple]:
+    """Appels de 4_Investissements avec ses valeurs par défaut (indépendants du client)."""
+    from .investment import comparer_scenarios, interets_composes, simulation_monte_carlo
+
+    profil_mc = PROFILS_INVESTISSEMENT[list(PROFILS_INVESTISSEMENT)[1]]
+    return [
+        (interets_composes, (10_000, 500, 6.0 / 100, 20), {}),
+        (comparer_scenarios, (10_000, 500, 20, PROFILS_INVESTISSEMENT), {}),
+        (simulation_monte_carlo, (20_000, 500, profil_mc["rendement_moyen"], profil_mc["volatilite"], 20), {}),
+    ]
+
+
+# ════════════════════════════════════════════════════════════
+# CONSTRUCTION / CHARGEMENT
+# ════════════════════════════════════════════════════════════
+
+def build_bundles() -> dict[tuple[str, str], object]:
+    """Calcule les résultats de tous les cas types (appels identiques dédupliqués)."""
+    entries = {}
+    calls = _default_calls()
+    for template in CASE_TEMPLATES.values():
+        calls += _template_calls(template)
+    for fn, args, kwargs in calls:
+        key = _call_key(fn, args, kwargs)
+        if key not in entries:
+            entries[key] = fn(*args, **kwargs)
+    return entries
+
+
+def save_bundles(entries: dict, path: Path = BUNDLE_PATH):
+    payload = {
+        "fingerprint": _fingerprint(),
+        "entries": [[name, params, _freeze(result)] for (name, params), result in entries.items()],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(encode_payload(payload, CODEC_JSON_ZLIB))
+    tmp.replace(path)
+
+
+def _load_file(path: Path) -> dict | None:
+    try:
+        payload = decode_payload(path.read_bytes(), CODEC_JSON_ZLIB)
+    except (OSError, ValueError):
+        return None
+    if payload.get("fingerprint") != _fingerprint():
+        return None
+    return {(name, params): _thaw(result) for name, params, result in payload["entries"]}
+
+
+def load_bundles() -> dict:
+    """Charge le cache (le reconstruit s'il est absent ou périmé)."""
+    global _entries
+    with _lock:
+        if _entries is None:
+            entries = _load_file(BUNDLE_PATH)
+            if entries is None:
+                entries = build_bundles()
+                save_bundles(entries)
+            _entries = entries
+        return _entries
+
+
+def warm_bundles():
+    """Charge ou construit le cache en arrière-plan (appelé au démarrage de l'app)."""
+    global _warming
+    if _entries is None and not _warming:
+        _warming = True
+        threading.Thread(target=load_bundles, name="fap-bundles", daemon=True).start()
+
+
+def bundle_call(fn, *args, **kwargs):
+    """
+    Appelle un moteur, ou sert son résultat précalculé si les arguments
+    correspondent à un cas type. Le cache n'est jamais attendu : tant qu'il
+    n'est pas prêt, le calcul se fait normalement.
+    """
+    entries = _entries
+    if entries is None:
+        warm_bundles()
+    else:
+        result = entries.get(_call_key(fn, args, kwargs))
+        if result is not None:
+            return copy.deepcopy(result)
+    return fn(*args, **kwargs)
+
+
+if __name__ == "__main__":
+    built = build_bundles()
+    save_bundles(built)
+    print(f"{len(built)} résultats précalculés → {BUNDLE_PATH}")